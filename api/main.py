@@ -14,6 +14,7 @@ sys.path.append(str(Path(__file__).parent.parent / "src"))
 from lead_collector import LeadCollector
 from lead_qualifier import LeadQualifier
 from config import Config
+from http_client import get_http_metrics
 
 # Configuração da API
 app = FastAPI(
@@ -507,6 +508,28 @@ async def health_check():
             "timestamp": datetime.now().isoformat()
         }
 
+@app.get("/api/metrics/http")
+async def get_http_metrics_endpoint():
+    """
+    Latência, erros e concorrência atual por host externo (Places, ReceitaWS...)
+    """
+    return {
+        "success": True,
+        "data": get_http_metrics(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.get("/api/metrics/qualification")
+async def get_qualification_metrics_endpoint():
+    """
+    Regras de qualificação em uso: acertos e tempo por critério, arquivo e recargas
+    """
+    return {
+        "success": True,
+        "data": qualifier.rules.get_stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compara a verificação de CNAE pela varredura da lista com o índice de prefixos
+
+Uso:
+    python scripts/benchmark_cnae_index.py --leads 1000000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório src ao path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from cnae_index import CNAEIndex
+from config import Config
+
+def linear_match(cnae: str) -> bool:
+    """Verificação anterior: normaliza e compara com cada CNAE da lista"""
+    cnae_clean = re.sub(r'[^\d]', '', cnae)
+    for cnae_alto in Config.CNAES_ALTO_CONSUMO:
+        cnae_alto_clean = re.sub(r'[^\d]', '', cnae_alto)
+        if cnae_clean.startswith(cnae_alto_clean[:4]):
+            return True
+    return False
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Benchmark da verificação de CNAE')
+    parser.add_argument('--leads', type=int, default=1_000_000, help='Quantidade de CNAEs verificados')
+    parser.add_argument('--seed', type=int, default=42, help='Semente dos CNAEs gerados')
+    args = parser.parse_args()
+    
+    # Metade dos CNAEs vem da lista, metade é aleatória (a maioria fora dela)
+    rng = random.Random(args.seed)
+    cnaes = [
+        rng.choice(Config.CNAES_ALTO_CONSUMO) if rng.random() < 0.5
+        else f"{rng.randint(100, 9999):04d}-{rng.randint(0, 9)}/{rng.randint(0, 99):02d}"
+        for _ in range(args.leads)
+    ]
+    print(f"🚀 Verificando {len(cnaes)} CNAEs contra {len(Config.CNAES_ALTO_CONSUMO)} de alto consumo")
+    
+    inicio = time.perf_counter()
+    linear = [linear_match(cnae) for cnae in cnaes]
+    tempo_linear = time.perf_counter() - inicio
+    print(f"⏱️ Varredura da lista: {tempo_linear:.2f}s")
+    
+    inicio = time.perf_counter()
+    index = CNAEIndex(Config.CNAES_ALTO_CONSUMO)
+    indexed = [index.matches(cnae) for cnae in cnaes]
+    tempo_indice = time.perf_counter() - inicio
+    print(f"⏱️ Índice de prefixos: {tempo_indice:.2f}s (inclui a montagem)")
+    
+    if linear != indexed:
+        print("❌ Resultados diferentes entre a varredura e o índice")
+        sys.exit(1)
+    
+    print(f"✅ Mesmos resultados ({sum(indexed)} compatíveis); {tempo_linear / tempo_indice:.0f}x mais rápido")
+
+if __name__ == "__main__":
+    main()
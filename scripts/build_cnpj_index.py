@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Monta o índice offline de CNPJs a partir dos dados abertos da Receita Federal
+
+Uso:
+    python scripts/build_cnpj_index.py \
+        --estabelecimentos dados/Estabelecimentos*.zip \
+        --empresas dados/Empresas*.zip \
+        --municipios dados/Municipios.zip --cnaes dados/Cnaes.zip
+
+Depois defina CNPJ_BACKEND=offline no .env para usar o índice no enriquecimento.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adicionar o diretório src ao path
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from cnpj_index import CNPJIndex
+from config import Config
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description='Monta o índice offline de CNPJs')
+    parser.add_argument('--estabelecimentos', nargs='+', required=True, help='Arquivos Estabelecimentos (CSV ou .zip)')
+    parser.add_argument('--empresas', nargs='+', required=True, help='Arquivos Empresas (CSV ou .zip)')
+    parser.add_argument('--municipios', nargs='+', help='Tabela de municípios (opcional)')
+    parser.add_argument('--cnaes', nargs='+', help='Tabela de CNAEs (opcional)')
+    parser.add_argument('--saida', default=Config.CNPJ_INDEX_DIR, help='Diretório do índice')
+    
+    args = parser.parse_args()
+    
+    print(f"🚀 Montando índice de CNPJs em {args.saida}")
+    inicio = time.time()
+    
+    try:
+        totais = CNPJIndex.build(args.saida, args.estabelecimentos, args.empresas, args.municipios, args.cnaes)
+    except Exception as e:
+        print(f"❌ Erro ao montar o índice: {e}")
+        sys.exit(1)
+    
+    for nome, total in totais.items():
+        print(f"✅ {nome}: {total}")
+    print(f"⏱️ Concluído em {time.time() - inicio:.1f}s")
+
+if __name__ == "__main__":
+    main()
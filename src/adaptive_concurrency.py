@@ -0,0 +1,127 @@
+"""
+Controle adaptativo de concorrência por host (AIMD): sobe aos poucos enquanto
+a fonte responde bem e corta pela metade em 429, OVER_QUERY_LIMIT ou latência
+em alta
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class AIMDLimiter:
+    """
+    Limite de requisições simultâneas que se ajusta ao upstream.
+    
+    A cada "janela" de respostas boas (tantas quanto o limite atual) o
+    limite sobe `increase`; um sinal de congestionamento
+    multiplica o limite por `decrease_factor`. Cortes ficam espaçados por
+    `cooldown` segundos para que uma rajada de 429 das requisições já em
+    voo conte como um único corte.
+    
+    A latência é acompanhada por média móvel (EWMA); passar de
+    `latency_tolerance` vezes a referência conta como congestionamento. A
+    referência é a menor média já vista, que sobe `baseline_drift` (fração)
+    por resposta para acompanhar uma mudança duradoura do upstream. Médias
+    abaixo de `min_latency` segundos são consideradas ruído de medição e
+    nunca cortam o limite.
+    """
+    
+    def __init__(self, initial: int = 2, min_limit: int = 1, max_limit: int = 10,
+                 increase: float = 1.0, decrease_factor: float = 0.5, latency_tolerance: float = 2.0,
+                 cooldown: float = 1.0, ewma_alpha: float = 0.2, min_latency: float = 0.05,
+                 baseline_drift: float = 0.001, clock: Callable[[], float] = time.monotonic):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self.ewma_alpha = ewma_alpha
+        self.min_latency = min_latency
+        self.baseline_drift = baseline_drift
+        self._clock = clock
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._successes = 0
+        self._latency_ewma = None
+        self._latency_baseline = None
+        self._last_decrease = float('-inf')
+        self._condition = threading.Condition()
+        self.decreases = 0
+    
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+    
+    def acquire(self):
+        """Bloqueia até haver vaga dentro do limite atual"""
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+    
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+    
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def on_success(self, latency: float):
+        """Resposta boa: aumento aditivo, a menos que a latência indique fila no upstream"""
+        with self._condition:
+            self._latency_ewma = latency if self._latency_ewma is None else (
+                self.ewma_alpha * latency + (1 - self.ewma_alpha) * self._latency_ewma
+            )
+            if self._latency_baseline is None:
+                self._latency_baseline = self._latency_ewma
+            else:
+                # Mínimo que decai devagar: cortes não movem a referência para o nível congestionado
+                self._latency_baseline = min(self._latency_ewma,
+                                             self._latency_baseline * (1 + self.baseline_drift))
+            
+            if self._latency_ewma > max(self._latency_baseline * self.latency_tolerance, self.min_latency):
+                self._decrease('latência em alta')
+                return
+            
+            self._successes += 1
+            if self._successes >= self.limit:
+                self._successes = 0
+                self._limit = min(self.max_limit, self._limit + self.increase)
+                self._condition.notify_all()
+    
+    def on_congestion(self, reason: str = 'congestionamento'):
+        """429, OVER_QUERY_LIMIT e afins: corte multiplicativo"""
+        with self._condition:
+            self._decrease(reason)
+    
+    def _decrease(self, reason: str):
+        now = self._clock()
+        if now - self._last_decrease < self.cooldown:
+            return
+        
+        previous = self.limit
+        self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+        self._last_decrease = now
+        self._successes = 0
+        self.decreases += 1
+        if self.limit != previous:
+            logger.info(f"Concorrência reduzida de {previous} para {self.limit} ({reason})")
+    
+    def snapshot(self) -> Dict:
+        with self._condition:
+            return {
+                'limite': int(self._limit),
+                'em_andamento': self._in_flight,
+                'latencia_ewma_ms': round((self._latency_ewma or 0) * 1000, 1),
+                'reducoes': self.decreases,
+            }
@@ -0,0 +1,133 @@
+"""
+Diário (checkpoint) de campanhas de coleta para retomar execuções interrompidas
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+def atomic_write_json(path: Path, data) -> None:
+    """Grava JSON de forma atômica: arquivo temporário + fsync + rename"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class CampaignJournal:
+    """
+    Diário em disco de uma campanha.
+    
+    Guarda um manifesto com os parâmetros da campanha e um arquivo por célula
+    keyword × cidade concluída (com os seus leads). Cada gravação é atômica,
+    então uma interrupção nunca deixa uma célula pela metade.
+    """
+    
+    def __init__(self, campaign_id: str = None, base_dir: str = None):
+        # Sufixo aleatório para que campanhas iniciadas no mesmo segundo não dividam o diário
+        self.campaign_id = campaign_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.directory = Path(base_dir or Config.CAMPAIGN_JOURNAL_DIR) / self.campaign_id
+        self.cells_dir = self.directory / 'cells'
+        self.manifest_path = self.directory / 'manifest.json'
+        self.manifest: Dict = {}
+        
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+    
+    @classmethod
+    def resume(cls, campaign_id: str, base_dir: str = None) -> 'CampaignJournal':
+        """Abre o diário de uma campanha existente"""
+        journal = cls(campaign_id, base_dir)
+        if not journal.manifest:
+            raise FileNotFoundError(f"Campanha {campaign_id} não encontrada em {journal.directory}")
+        return journal
+    
+    @property
+    def params(self) -> Dict:
+        """Parâmetros com que a campanha foi iniciada"""
+        return self.manifest.get('parametros', {})
+    
+    def start(self, params: Dict, resume: bool = False) -> None:
+        """
+        Cria o manifesto (mantém o original ao retomar).
+        
+        Uma campanha nova não pode reaproveitar o diário de outra: se o
+        manifesto já existe e resume=False, levanta FileExistsError.
+        """
+        if self.manifest:
+            if not resume:
+                raise FileExistsError(f"Campanha {self.campaign_id} já existe em {self.directory}; use --resume")
+            return
+        
+        self.manifest = {
+            'campaign_id': self.campaign_id,
+            'criada_em': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            'status': 'em_andamento',
+            'parametros': params
+        }
+        atomic_write_json(self.manifest_path, self.manifest)
+        logger.info(f"Diário da campanha {self.campaign_id} criado em {self.directory}")
+    
+    def mark_status(self, status: str) -> None:
+        """Atualiza o status da campanha no manifesto"""
+        self.manifest['status'] = status
+        self.manifest['atualizada_em'] = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        atomic_write_json(self.manifest_path, self.manifest)
+    
+    @staticmethod
+    def _cell_key(keyword: str, city: str) -> str:
+        return hashlib.sha1(f"{keyword}\x1f{city}".encode('utf-8')).hexdigest()[:16]
+    
+    def _cell_path(self, keyword: str, city: str) -> Path:
+        return self.cells_dir / f"{self._cell_key(keyword, city)}.json"
+    
+    def is_done(self, keyword: str, city: str) -> bool:
+        """Verifica se a célula já foi concluída"""
+        return self._cell_path(keyword, city).exists()
+    
+    def record_cell(self, cell: Dict) -> None:
+        """Persiste uma célula concluída; células com erro não são gravadas para serem refeitas"""
+        if cell.get('erro'):
+            return
+        
+        atomic_write_json(self._cell_path(cell['keyword'], cell['cidade']), cell)
+    
+    def completed_cells(self) -> List[Dict]:
+        """Células concluídas, na ordem da grade"""
+        cells = []
+        if not self.cells_dir.exists():
+            return cells
+        
+        for path in self.cells_dir.glob('*.json'):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    cells.append(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Célula ilegível no diário ({path.name}): {e}")
+        
+        return sorted(cells, key=lambda c: c.get('indice', 0))
+    
+    def load_leads(self) -> List[Dict]:
+        """Reconstrói a lista de leads a partir das células concluídas"""
+        leads = []
+        for cell in self.completed_cells():
+            leads.extend(cell.get('leads', []))
+        return leads
@@ -0,0 +1,208 @@
+"""
+Cassete de chamadas externas: grava as respostas HTTP e do navegador em um
+arquivo local e as reproduz depois sem rede (benchmarks e testes reprodutíveis)
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Parâmetros com credenciais nunca vão para o arquivo nem para a chave
+SENSITIVE_PARAMS = {'key', 'api_key', 'apikey', 'token', 'access_token'}
+
+# O corpo é gravado já decodificado, então estes cabeçalhos deixam de valer
+DROPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'set-cookie'}
+
+class CassetteMiss(LookupError):
+    """Chamada sem resposta gravada no cassete (modo replay)"""
+
+def scrub_url(url: str) -> str:
+    """URL sem os parâmetros sensíveis e com a query em ordem estável"""
+    parts = urlsplit(str(url))
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in SENSITIVE_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+class Cassette:
+    """
+    Arquivo JSON Lines com uma interação por linha.
+    
+    Em `record` cada resposta é acrescentada ao arquivo assim que chega; em
+    `replay` as respostas são servidas da memória, na ordem em que foram
+    gravadas para cada chave (a última se repete quando acabam), e chamadas
+    desconhecidas levantam CassetteMiss.
+    """
+    
+    def __init__(self, path: str, mode: str = 'replay'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Modo de cassete inválido: {mode}")
+        
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self.hits = 0
+        self.misses = 0
+        
+        if self.replaying:
+            self._load()
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+    
+    @property
+    def recording(self) -> bool:
+        return self.mode == 'record'
+    
+    @property
+    def replaying(self) -> bool:
+        return self.mode == 'replay'
+    
+    @staticmethod
+    def make_key(kind: str, *parts) -> str:
+        raw = json.dumps([kind, *parts], ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    
+    def _load(self):
+        if not os.path.exists(self.path):
+            logger.warning(f"Cassete {self.path} não encontrado; toda chamada será CassetteMiss")
+            return
+        
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry['chave']].append(entry)
+        
+        logger.info(f"Cassete {self.path} carregado: {sum(map(len, self._entries.values()))} interações")
+    
+    def record(self, key: str, kind: str, request: Dict, response):
+        """Acrescenta uma interação ao arquivo"""
+        entry = {'chave': key, 'tipo': kind, 'requisicao': request, 'resposta': response}
+        line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+    
+    def replay(self, key: str, description: str = ''):
+        """Próxima resposta gravada para a chave"""
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"Sem resposta gravada para {description or key}")
+            
+            index = min(self._cursor[key], len(entries) - 1)
+            self._cursor[key] += 1
+            self.hits += 1
+            return entries[index]['resposta']
+    
+    def call(self, kind: str, key_parts: tuple, fn: Callable):
+        """
+        Resultado de uma chamada que não passa pelo cliente HTTP (ex.: coleta
+        no navegador): gravado em `record`, servido do cassete em `replay`.
+        O resultado precisa ser serializável em JSON.
+        """
+        key = self.make_key(kind, *key_parts)
+        if self.replaying:
+            return self.replay(key, f"{kind} {key_parts}")
+        
+        result = fn()
+        self.record(key, kind, {'parametros': list(key_parts)}, result)
+        return result
+    
+    def transport(self, inner: httpx.BaseTransport = None) -> 'CassetteTransport':
+        return CassetteTransport(self, inner)
+    
+    def get_stats(self) -> Dict:
+        return {'modo': self.mode, 'hits': self.hits, 'misses': self.misses}
+
+class CassetteTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Transporte httpx que grava ou reproduz as respostas pelo cassete"""
+    
+    def __init__(self, cassette: Cassette, inner=None):
+        self.cassette = cassette
+        self.inner = inner
+    
+    def _key(self, request: httpx.Request) -> str:
+        body = request.content.decode('utf-8', errors='replace') if request.content else ''
+        return Cassette.make_key('http', request.method, scrub_url(request.url), body)
+    
+    @staticmethod
+    def _serialize(response: httpx.Response) -> Dict:
+        content = response.content
+        try:
+            body, encoding = content.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode('ascii'), 'base64'
+        headers = [(k, v) for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS]
+        return {'status': response.status_code, 'headers': headers, 'corpo': body, 'codificacao': encoding}
+    
+    @staticmethod
+    def _deserialize(data: Dict, request: httpx.Request) -> httpx.Response:
+        if data['codificacao'] == 'base64':
+            content = base64.b64decode(data['corpo'])
+        else:
+            content = data['corpo'].encode('utf-8')
+        return httpx.Response(data['status'], headers=data['headers'], content=content, request=request)
+    
+    def _replay(self, request: httpx.Request) -> httpx.Response:
+        data = self.cassette.replay(self._key(request), f"{request.method} {scrub_url(request.url)}")
+        return self._deserialize(data, request)
+    
+    def _record(self, request: httpx.Request, response: httpx.Response):
+        self.cassette.record(self._key(request), 'http',
+                             {'metodo': request.method, 'url': scrub_url(request.url)},
+                             self._serialize(response))
+    
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.cassette.replaying:
+            return self._replay(request)
+        
+        response = self.inner.handle_request(request)
+        response.read()
+        self._record(request, response)
+        return self._deserialize(self._serialize(response), request)
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.cassette.replaying:
+            return self._replay(request)
+        
+        response = await self.inner.handle_async_request(request)
+        await response.aread()
+        self._record(request, response)
+        return self._deserialize(self._serialize(response), request)
+    
+    def close(self):
+        if self.inner is not None:
+            self.inner.close()
+    
+    async def aclose(self):
+        if self.inner is not None:
+            await self.inner.aclose()
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+def get_cassette() -> Optional[Cassette]:
+    """Cassete do processo conforme CASSETTE_MODE (None quando desligado)"""
+    global _cassette
+    with _cassette_lock:
+        if Config.CASSETTE_MODE == 'off':
+            return None
+        if _cassette is None or _cassette.mode != Config.CASSETTE_MODE or _cassette.path != Config.CASSETTE_FILE:
+            _cassette = Cassette(Config.CASSETTE_FILE, Config.CASSETTE_MODE)
+        return _cassette
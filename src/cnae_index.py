@@ -0,0 +1,74 @@
+"""
+Índice de prefixos dos CNAEs de alto consumo, montado uma vez e consultado
+em O(1) por lead
+"""
+import logging
+import re
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Quantos dígitos do código (sem pontuação) comparar em cada nível da hierarquia CNAE
+# (classe usa 4 dígitos: o 5º é o verificador e não muda a atividade)
+LEVELS = {
+    'divisao': 2,
+    'grupo': 3,
+    'classe': 4,
+    'subclasse': 7,
+}
+
+_NON_DIGITS = re.compile(r'\D')
+
+def normalize_cnae(cnae: str) -> str:
+    """Só os dígitos do código ('4721-1/02' -> '4721102')"""
+    return _NON_DIGITS.sub('', cnae or '')
+
+class CNAEIndex:
+    """
+    Conjuntos de prefixos normalizados por nível (divisão, grupo, classe e
+    subclasse). Um CNAE é compatível quando o seu prefixo no nível pedido
+    está no conjunto, o mesmo critério de `startswith` da lista original.
+    """
+    
+    def __init__(self, cnaes: Iterable[str], level: str = 'classe'):
+        if level not in LEVELS:
+            raise ValueError(f"Nível de CNAE inválido: {level} (use {', '.join(LEVELS)})")
+        
+        self.level = level
+        self._prefixes: Dict[str, frozenset] = {}
+        codes = [code for code in map(normalize_cnae, cnaes) if code]
+        for name, size in LEVELS.items():
+            self._prefixes[name] = frozenset(code[:size] for code in codes)
+        
+        # Códigos incompletos na lista geram prefixos mais curtos que o nível
+        self._sizes = {
+            name: sorted({len(prefix) for prefix in prefixes})
+            for name, prefixes in self._prefixes.items()
+        }
+        logger.debug(f"Índice de CNAEs montado com {len(codes)} códigos")
+    
+    def __len__(self) -> int:
+        return len(self._prefixes['subclasse'])
+    
+    def prefixes(self, level: Optional[str] = None) -> frozenset:
+        """Prefixos normalizados do nível (para comparações em lote)"""
+        return self._prefixes[level or self.level]
+    
+    def matches(self, cnae: str, level: Optional[str] = None) -> bool:
+        """Indica se o CNAE (com ou sem pontuação) está na lista no nível dado"""
+        level = level or self.level
+        prefixes = self._prefixes[level]
+        code = normalize_cnae(cnae)
+        if not code:
+            return False
+        
+        sizes = self._sizes[level]
+        if len(sizes) == 1:
+            return code[:sizes[0]] in prefixes if len(code) >= sizes[0] else False
+        return any(code[:size] in prefixes for size in sizes if len(code) >= size)
+    
+    def matches_division(self, cnae: str) -> bool:
+        return self.matches(cnae, 'divisao')
+    
+    def matches_group(self, cnae: str) -> bool:
+        return self.matches(cnae, 'grupo')
@@ -0,0 +1,311 @@
+"""
+Índice offline de CNPJs montado a partir dos dados abertos da Receita Federal
+"""
+import csv
+import heapq
+import io
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Colunas dos arquivos "Estabelecimentos" (sem cabeçalho, separados por ';')
+EST_CNPJ_BASICO, EST_CNPJ_ORDEM, EST_CNPJ_DV = 0, 1, 2
+EST_FANTASIA, EST_SITUACAO, EST_DATA_INICIO = 4, 5, 10
+EST_CNAE_PRINCIPAL, EST_CNAE_SECUNDARIA = 11, 12
+EST_TIPO_LOGRADOURO, EST_LOGRADOURO, EST_NUMERO, EST_COMPLEMENTO = 13, 14, 15, 16
+EST_BAIRRO, EST_CEP, EST_UF, EST_MUNICIPIO = 17, 18, 19, 20
+EST_DDD1, EST_TELEFONE1, EST_EMAIL = 21, 22, 27
+
+# Colunas dos arquivos "Empresas"
+EMP_CNPJ_BASICO, EMP_RAZAO_SOCIAL, EMP_CAPITAL_SOCIAL, EMP_PORTE = 0, 1, 4, 5
+
+SITUACOES = {'01': 'NULA', '02': 'ATIVA', '03': 'SUSPENSA', '04': 'INAPTA', '08': 'BAIXADA'}
+PORTES = {'00': 'NÃO INFORMADO', '01': 'MICRO EMPRESA', '03': 'EMPRESA DE PEQUENO PORTE', '05': 'DEMAIS'}
+
+def read_dump(path: str) -> Iterator[List[str]]:
+    """Lê um arquivo da Receita (CSV latin-1 separado por ';'), compactado em .zip ou não"""
+    if str(path).lower().endswith('.zip'):
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                with archive.open(name) as raw:
+                    yield from csv.reader(io.TextIOWrapper(raw, encoding='latin-1', newline=''), delimiter=';')
+    else:
+        with open(path, 'r', encoding='latin-1', newline='') as f:
+            yield from csv.reader(f, delimiter=';')
+
+class SortedIndex:
+    """
+    Par de arquivos chave → registro consultado por busca binária.
+    
+    `<prefixo>.idx` guarda registros de largura fixa (chave, offset, tamanho)
+    ordenados pela chave; `<prefixo>.dat` guarda os registros em JSON. Os
+    dois são abertos com mmap, então a consulta não carrega nada em memória.
+    """
+    
+    def __init__(self, prefix: str, key_width: int):
+        self.prefix = str(prefix)
+        self.key_width = key_width
+        self.record = struct.Struct(f'<{key_width}sQI')
+        self._idx_file = open(f"{self.prefix}.idx", 'rb')
+        self._dat_file = open(f"{self.prefix}.dat", 'rb')
+        self._idx = self._map(self._idx_file)
+        self._dat = self._map(self._dat_file)
+        self.count = len(self._idx) // self.record.size if self._idx else 0
+    
+    @staticmethod
+    def _map(f):
+        # mmap não aceita arquivos vazios
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    
+    def get(self, key: str) -> Optional[list]:
+        """Registro da chave, ou None"""
+        target = key.encode('ascii')
+        if len(target) != self.key_width:
+            return None
+        
+        size = self.record.size
+        low, high = 0, self.count
+        while low < high:
+            mid = (low + high) // 2
+            start = mid * size
+            current = self._idx[start:start + self.key_width]
+            if current < target:
+                low = mid + 1
+            elif current > target:
+                high = mid
+            else:
+                _, offset, length = self.record.unpack_from(self._idx, start)
+                return json.loads(self._dat[offset:offset + length])
+        return None
+    
+    def items(self) -> Iterator[Tuple[str, list]]:
+        """Percorre todos os pares (chave, registro) na ordem das chaves"""
+        for key, offset, length in self.record.iter_unpack(self._idx):
+            yield key.decode('ascii'), json.loads(self._dat[offset:offset + length])
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def close(self):
+        for mapped in (self._idx, self._dat):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        self._idx_file.close()
+        self._dat_file.close()
+    
+    @classmethod
+    def build(cls, prefix: str, key_width: int, rows: Iterable[Tuple[str, list]],
+              chunk_size: int = 1000000) -> int:
+        """
+        Grava o índice a partir de pares (chave, registro) em qualquer ordem.
+        
+        Ordenação externa: os registros vão direto para o .dat e as chaves são
+        ordenadas em blocos de chunk_size gravados em arquivos temporários,
+        depois intercalados com heapq.merge. Chaves repetidas mantêm a primeira.
+        """
+        record = struct.Struct(f'<{key_width}sQI')
+        directory = os.path.dirname(prefix) or '.'
+        os.makedirs(directory, exist_ok=True)
+        runs = []
+        
+        def flush(chunk):
+            chunk.sort()
+            run = tempfile.TemporaryFile(dir=directory)
+            run.write(b''.join(record.pack(*entry) for entry in chunk))
+            run.seek(0)
+            runs.append(run)
+        
+        def read_run(run):
+            while True:
+                block = run.read(record.size * 4096)
+                if not block:
+                    return
+                yield from record.iter_unpack(block)
+        
+        try:
+            chunk = []
+            with open(f"{prefix}.dat", 'wb') as dat:
+                offset = 0
+                for key, values in rows:
+                    payload = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                    dat.write(payload + b'\n')
+                    chunk.append((key.encode('ascii'), offset, len(payload)))
+                    offset += len(payload) + 1
+                    
+                    if len(chunk) >= chunk_size:
+                        flush(chunk)
+                        chunk = []
+            if chunk:
+                flush(chunk)
+            
+            total = 0
+            previous = None
+            with open(f"{prefix}.idx", 'wb') as idx:
+                for key, offset, length in heapq.merge(*(read_run(run) for run in runs)):
+                    if key == previous:
+                        continue
+                    idx.write(record.pack(key, offset, length))
+                    previous = key
+                    total += 1
+        finally:
+            for run in runs:
+                run.close()
+        
+        logger.info(f"Índice {prefix}: {total} chaves em {len(runs)} blocos ordenados")
+        return total
+
+class CNPJIndex:
+    """
+    Consulta offline de CNPJ com a mesma interface do serviço da ReceitaWS
+    (lookup / lookup_batch) e respostas no mesmo formato.
+    
+    O diretório do índice contém estabelecimentos (chave: CNPJ de 14 dígitos),
+    empresas (chave: CNPJ básico de 8 dígitos) e, opcionalmente, as tabelas
+    de municípios e CNAEs para traduzir os códigos.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.estabelecimentos = SortedIndex(self.directory / 'estabelecimentos', 14)
+        self.empresas = SortedIndex(self.directory / 'empresas', 8)
+        self.municipios = self._load_table('municipios.json')
+        self.cnaes = self._load_table('cnaes.json')
+    
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        """Verifica se há um índice montado no diretório"""
+        directory = Path(directory)
+        return all((directory / name).exists() for name in
+                   ('estabelecimentos.idx', 'estabelecimentos.dat', 'empresas.idx', 'empresas.dat'))
+    
+    def _load_table(self, name: str) -> Dict[str, str]:
+        path = self.directory / name
+        if not path.exists():
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    def lookup(self, cnpj: str) -> Optional[Dict]:
+        """Dados do CNPJ no formato da ReceitaWS, ou None se não estiver no índice"""
+        cnpj = ''.join(filter(str.isdigit, cnpj or ''))
+        estabelecimento = self.estabelecimentos.get(cnpj) if len(cnpj) == 14 else None
+        if estabelecimento is None:
+            return None
+        
+        empresa = self.empresas.get(cnpj[:8]) or ['', '', '']
+        return self._to_receitaws(cnpj, estabelecimento, empresa)
+    
+    def lookup_batch(self, cnpjs: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """Consulta vários CNPJs; retorna {cnpj_somente_digitos: dados ou None}"""
+        results = {}
+        for cnpj in cnpjs:
+            digits = ''.join(filter(str.isdigit, cnpj or ''))
+            if digits and digits not in results:
+                results[digits] = self.lookup(digits)
+        return results
+    
+    def iter_companies(self, ufs: Iterable[str] = None, active_only: bool = True) -> Iterator[Tuple[str, str, str, str]]:
+        """Percorre os estabelecimentos como (cnpj, razão social, nome fantasia, cep)"""
+        ufs = {uf.upper() for uf in ufs} if ufs else None
+        for cnpj, estabelecimento in self.estabelecimentos.items():
+            fantasia, situacao, cep, uf = estabelecimento[0], estabelecimento[1], estabelecimento[10], estabelecimento[11]
+            if active_only and situacao != '02':
+                continue
+            if ufs and uf not in ufs:
+                continue
+            empresa = self.empresas.get(cnpj[:8]) or ['']
+            yield cnpj, empresa[0], fantasia, cep
+    
+    def close(self):
+        self.estabelecimentos.close()
+        self.empresas.close()
+    
+    def _activity(self, code: str) -> Dict:
+        formatted = f"{code[:2]}.{code[2:4]}-{code[4:5]}-{code[5:]}" if len(code) == 7 else code
+        return {'code': formatted, 'text': self.cnaes.get(code, '')}
+    
+    def _to_receitaws(self, cnpj: str, estabelecimento: list, empresa: list) -> Dict:
+        (fantasia, situacao, inicio, cnae, secundarias, tipo_logradouro, logradouro,
+         numero, complemento, bairro, cep, uf, municipio, ddd, telefone, email) = estabelecimento
+        razao_social, capital_social, porte = empresa
+        
+        return {
+            'status': 'OK',
+            'cnpj': f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}",
+            'nome': razao_social,
+            'fantasia': fantasia,
+            'situacao': SITUACOES.get(situacao, situacao),
+            'abertura': f"{inicio[6:8]}/{inicio[4:6]}/{inicio[:4]}" if len(inicio) == 8 else inicio,
+            'atividade_principal': [self._activity(cnae)],
+            'atividades_secundarias': [self._activity(code) for code in secundarias.split(',') if code],
+            'logradouro': f"{tipo_logradouro} {logradouro}".strip(),
+            'numero': numero,
+            'complemento': complemento,
+            'bairro': bairro,
+            'cep': f"{cep[:2]}.{cep[2:5]}-{cep[5:]}" if len(cep) == 8 else cep,
+            'municipio': self.municipios.get(municipio, municipio),
+            'uf': uf,
+            'telefone': f"({ddd}) {telefone}" if ddd and telefone else telefone,
+            'email': email.lower(),
+            'porte': PORTES.get(porte, porte),
+            'capital_social': capital_social.replace(',', '.'),
+            'qsa': [],
+            'fonte': 'Receita Federal (dados abertos)'
+        }
+    
+    @classmethod
+    def build(cls, directory: str, estabelecimentos: List[str], empresas: List[str],
+              municipios: List[str] = None, cnaes: List[str] = None) -> Dict[str, int]:
+        """Monta o índice a partir dos arquivos (CSV ou .zip) baixados da Receita"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        
+        def estabelecimento_rows():
+            for path in estabelecimentos:
+                for row in read_dump(path):
+                    if len(row) <= EST_EMAIL:
+                        continue
+                    cnpj = row[EST_CNPJ_BASICO] + row[EST_CNPJ_ORDEM] + row[EST_CNPJ_DV]
+                    if len(cnpj) != 14 or not cnpj.isdigit():
+                        continue
+                    yield cnpj, [row[i].strip() for i in (
+                        EST_FANTASIA, EST_SITUACAO, EST_DATA_INICIO, EST_CNAE_PRINCIPAL,
+                        EST_CNAE_SECUNDARIA, EST_TIPO_LOGRADOURO, EST_LOGRADOURO, EST_NUMERO,
+                        EST_COMPLEMENTO, EST_BAIRRO, EST_CEP, EST_UF, EST_MUNICIPIO,
+                        EST_DDD1, EST_TELEFONE1, EST_EMAIL
+                    )]
+        
+        def empresa_rows():
+            for path in empresas:
+                for row in read_dump(path):
+                    if len(row) <= EMP_PORTE or len(row[EMP_CNPJ_BASICO]) != 8:
+                        continue
+                    yield row[EMP_CNPJ_BASICO], [
+                        row[EMP_RAZAO_SOCIAL].strip(), row[EMP_CAPITAL_SOCIAL].strip(), row[EMP_PORTE].strip()
+                    ]
+        
+        totals = {
+            'estabelecimentos': SortedIndex.build(str(directory / 'estabelecimentos'), 14, estabelecimento_rows()),
+            'empresas': SortedIndex.build(str(directory / 'empresas'), 8, empresa_rows()),
+        }
+        
+        # Tabelas auxiliares pequenas (código;descrição) ficam em JSON
+        for name, paths in (('municipios', municipios), ('cnaes', cnaes)):
+            if not paths:
+                continue
+            table = {row[0]: row[1].strip() for path in paths for row in read_dump(path) if len(row) >= 2}
+            with open(directory / f"{name}.json", 'w', encoding='utf-8') as f:
+                json.dump(table, f, ensure_ascii=False)
+            totals[name] = len(table)
+        
+        return totals
@@ -0,0 +1,173 @@
+"""
+Serviço único de consulta de CNPJ (ReceitaWS) com cache local e fila de requisições
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, Optional
+
+from cassette import get_cassette
+from cnpj_index import CNPJIndex
+from config import Config
+from http_client import HttpClient, get_http_client
+from rate_limiter import get_rate_limiter
+from response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+class CNPJLookupService:
+    """
+    Consulta CNPJs na ReceitaWS passando por um cache SQLite.
+    
+    Respostas válidas ficam guardadas por CNPJ_CACHE_TTL e respostas ERROR
+    (CNPJ inexistente/inválido) pelo TTL negativo. O que não está no cache
+    entra numa fila atendida por poucos workers no ritmo do rate limiter;
+    pedidos repetidos do mesmo CNPJ enquanto ele está na fila aguardam a
+    mesma requisição.
+    """
+    
+    ENDPOINT = 'cnpj'
+    URL = "https://receitaws.com.br/v1/cnpj/{cnpj}"
+    
+    def __init__(self, cache: Optional[ResponseCache] = None, session: HttpClient = None,
+                 rate_limiter=None, workers: int = 1, timeout: float = 30):
+        self.cache = cache
+        self.session = session or get_http_client()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.fetches = 0
+        self._queue = queue.Queue()
+        self._pending: Dict[str, Future] = {}
+        self._threads = []
+        self._lock = threading.Lock()
+    
+    def _active_cache(self) -> Optional[ResponseCache]:
+        """Cache em disco, desligado com o cassete para que gravação e replay façam as mesmas consultas"""
+        return None if get_cassette() else self.cache
+    
+    @staticmethod
+    def normalize(cnpj: str) -> str:
+        """Mantém só os dígitos do CNPJ"""
+        return ''.join(filter(str.isdigit, cnpj or ''))
+    
+    def lookup(self, cnpj: str) -> Optional[Dict]:
+        """Dados da ReceitaWS para o CNPJ, ou None se inexistente ou indisponível"""
+        return self.lookup_batch([cnpj]).get(self.normalize(cnpj))
+    
+    def lookup_batch(self, cnpjs: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Consulta vários CNPJs de uma vez: os que estão no cache voltam
+        imediatamente e os demais são enfileirados juntos.
+        
+        Retorna {cnpj_somente_digitos: dados ou None}.
+        """
+        results = {}
+        futures = {}
+        
+        for cnpj in dict.fromkeys(map(self.normalize, cnpjs)):
+            if not cnpj:
+                continue
+            
+            cache = self._active_cache()
+            cached = cache.get(self.ENDPOINT, {'cnpj': cnpj}) if cache else None
+            if cached is not None:
+                results[cnpj] = self._unwrap(cached)
+            else:
+                futures[cnpj] = self._submit(cnpj)
+        
+        if futures:
+            logger.info(f"Consulta de CNPJ: {len(results)} no cache, {len(futures)} na fila")
+        
+        for cnpj, future in futures.items():
+            results[cnpj] = future.result()
+        
+        return results
+    
+    @staticmethod
+    def _unwrap(data: Dict) -> Optional[Dict]:
+        return None if data.get('status') == 'ERROR' else data
+    
+    def _submit(self, cnpj: str) -> Future:
+        with self._lock:
+            future = self._pending.get(cnpj)
+            if future is None:
+                future = Future()
+                self._pending[cnpj] = future
+                self._queue.put(cnpj)
+                self._start_workers()
+            return future
+    
+    def _start_workers(self):
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"cnpj-lookup-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def _worker(self):
+        while True:
+            cnpj = self._queue.get()
+            result = None
+            try:
+                result = self._unwrap(self._fetch(cnpj))
+            except Exception as e:
+                logger.error(f"Erro ao buscar CNPJ {cnpj}: {e}")
+            finally:
+                with self._lock:
+                    future = self._pending.pop(cnpj)
+                future.set_result(result)
+                self._queue.task_done()
+    
+    def _fetch(self, cnpj: str) -> Dict:
+        url = self.URL.format(cnpj=cnpj)
+        
+        self.rate_limiter.acquire(url)
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        self.fetches += 1
+        
+        cache = self._active_cache()
+        if cache:
+            cache.set(self.ENDPOINT, {'cnpj': cnpj}, data)
+        
+        if data.get('status') == 'ERROR':
+            logger.warning(f"CNPJ {cnpj} não encontrado: {data.get('message', '')}")
+        
+        return data
+
+_cnpj_lookup = None
+_cnpj_lock = threading.Lock()
+
+def get_cnpj_lookup():
+    """
+    Serviço de consulta de CNPJ compartilhado pelo processo.
+    
+    Com CNPJ_BACKEND=offline usa o índice local dos dados abertos da Receita
+    (CNPJIndex); sem índice montado, ou com CNPJ_BACKEND=receitaws, usa a API.
+    """
+    global _cnpj_lookup
+    with _cnpj_lock:
+        if _cnpj_lookup is None and Config.CNPJ_BACKEND == 'offline':
+            if CNPJIndex.exists(Config.CNPJ_INDEX_DIR):
+                _cnpj_lookup = CNPJIndex(Config.CNPJ_INDEX_DIR)
+                logger.info(f"Consulta de CNPJ pelo índice offline em {Config.CNPJ_INDEX_DIR}")
+            else:
+                logger.warning(f"Índice de CNPJ não encontrado em {Config.CNPJ_INDEX_DIR}; usando a ReceitaWS")
+        
+        if _cnpj_lookup is None:
+            cache = None
+            if Config.CNPJ_CACHE_ENABLED:
+                cache = ResponseCache(
+                    Config.CNPJ_CACHE_FILE,
+                    ttls={CNPJLookupService.ENDPOINT: Config.CNPJ_CACHE_TTL},
+                    negative_ttl=Config.CNPJ_CACHE_TTL_NEGATIVE,
+                    negative_statuses=('ERROR',)
+                )
+            _cnpj_lookup = CNPJLookupService(
+                cache=cache,
+                workers=Config.CNPJ_LOOKUP_WORKERS,
+                timeout=Config.CNPJ_LOOKUP_TIMEOUT
+            )
+        return _cnpj_lookup
@@ -0,0 +1,199 @@
+"""
+Identificação do CNPJ de um lead pelo nome e CEP (índice invertido de trigramas)
+"""
+import logging
+import os
+import pickle
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cnpj_index import CNPJIndex
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Termos que não ajudam a distinguir empresas
+STOPWORDS = {'ltda', 'me', 'epp', 'eireli', 'sa', 'cia', 'de', 'da', 'do', 'das', 'dos', 'e', 'em'}
+
+CEP_PATTERN = re.compile(r'\b(\d{2})\.?(\d{3})-?(\d{3})\b')
+
+def normalize_name(text: str) -> str:
+    """Minúsculas, sem acentos, pontuação nem termos societários"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    words = re.sub(r'[^a-z0-9]+', ' ', text).split()
+    return ' '.join(word for word in words if word not in STOPWORDS)
+
+def trigrams(text: str) -> set:
+    """Trigramas do texto normalizado, com espaço nas bordas"""
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def extract_cep(text: str) -> Optional[str]:
+    """CEP (só dígitos) encontrado no endereço, ou None"""
+    match = CEP_PATTERN.search(text or '')
+    return ''.join(match.groups()) if match else None
+
+class CNPJMatcher:
+    """
+    Índice invertido de trigramas sobre razão social e nome fantasia, com o
+    CEP como termo extra.
+    
+    A consulta soma os trigramas em comum para escolher os candidatos e
+    depois os ordena pelo coeficiente de Dice entre os nomes; o CEP igual ao
+    do lead soma CEP_BONUS ao score. Trigramas presentes em mais de
+    max_posting nomes são ignorados na escolha dos candidatos.
+    """
+    
+    CEP_BONUS = 0.2
+    CANDIDATES = 50
+    
+    def __init__(self, max_posting: int = 20000):
+        self.max_posting = max_posting
+        self.companies: List[Tuple[str, str, str, str]] = []
+        self._doc_names: List[str] = []
+        self._doc_company = array('I')
+        self._postings: Dict[str, array] = {}
+    
+    def add(self, cnpj: str, razao_social: str, nome_fantasia: str = '', cep: str = ''):
+        """Inclui uma empresa no índice"""
+        company_id = len(self.companies)
+        cep = ''.join(filter(str.isdigit, cep or ''))
+        self.companies.append((cnpj, razao_social, nome_fantasia, cep))
+        
+        names = {normalize_name(razao_social), normalize_name(nome_fantasia)}
+        for name in names:
+            if not name:
+                continue
+            doc_id = len(self._doc_names)
+            self._doc_names.append(name)
+            self._doc_company.append(company_id)
+            for gram in trigrams(name):
+                self._postings.setdefault(gram, array('I')).append(doc_id)
+        
+        if cep:
+            self._postings.setdefault(f"#{cep}", array('I')).append(company_id)
+    
+    def __len__(self) -> int:
+        return len(self.companies)
+    
+    def match(self, nome: str, cep: str = None, limit: int = 5, min_score: float = 0.0) -> List[Dict]:
+        """Candidatos de CNPJ para o nome (e CEP) do lead, do mais provável ao menos provável"""
+        query = normalize_name(nome)
+        if not query:
+            return []
+        
+        query_grams = trigrams(query)
+        hits = Counter()
+        for gram in query_grams:
+            posting = self._postings.get(gram)
+            if posting is not None and len(posting) <= self.max_posting:
+                hits.update(posting)
+        
+        cep = ''.join(filter(str.isdigit, cep or ''))
+        same_cep = set(self._postings.get(f"#{cep}", ())) if cep else set()
+        
+        scores: Dict[int, float] = {}
+        for doc_id, _ in hits.most_common(self.CANDIDATES):
+            name_grams = trigrams(self._doc_names[doc_id])
+            score = 2 * len(query_grams & name_grams) / (len(query_grams) + len(name_grams))
+            company_id = self._doc_company[doc_id]
+            scores[company_id] = max(scores.get(company_id, 0.0), score)
+        
+        # Empresas no mesmo CEP entram como candidatas mesmo com nome diferente
+        for company_id in same_cep:
+            scores.setdefault(company_id, 0.0)
+            scores[company_id] += self.CEP_BONUS
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for company_id, score in ranked:
+            if score < min_score or len(results) >= limit:
+                break
+            cnpj, razao_social, nome_fantasia, company_cep = self.companies[company_id]
+            results.append({
+                'cnpj': cnpj,
+                'razao_social': razao_social,
+                'nome_fantasia': nome_fantasia,
+                'cep': company_cep,
+                'score': round(min(score, 1.0), 3)
+            })
+        return results
+    
+    def match_batch(self, leads: List[Dict], limit: int = 5, min_score: float = 0.0) -> List[List[Dict]]:
+        """Candidatos para cada lead (nome + CEP do endereço), na ordem da lista"""
+        cache = {}
+        results = []
+        for lead in leads:
+            key = (normalize_name(lead.get('nome', '')), extract_cep(lead.get('endereco', '')))
+            if key not in cache:
+                cache[key] = self.match(lead.get('nome', ''), key[1], limit, min_score)
+            results.append(cache[key])
+        return results
+    
+    def save(self, path: str):
+        """Grava o índice em disco para não precisar remontar"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def load(cls, path: str) -> 'CNPJMatcher':
+        """Carrega um índice gravado com save()"""
+        matcher = cls.__new__(cls)
+        with open(path, 'rb') as f:
+            matcher.__dict__.update(pickle.load(f))
+        return matcher
+    
+    @classmethod
+    def from_companies(cls, companies: Iterable[Tuple[str, str, str, str]]) -> 'CNPJMatcher':
+        """Monta o índice a partir de (cnpj, razão social, nome fantasia, cep)"""
+        matcher = cls()
+        for company in companies:
+            matcher.add(*company)
+        logger.info(f"Índice de nomes de empresas montado: {len(matcher)} empresas")
+        return matcher
+
+_cnpj_matcher: Optional[CNPJMatcher] = None
+_matcher_lock = threading.Lock()
+
+def get_cnpj_matcher() -> Optional[CNPJMatcher]:
+    """
+    Índice de nomes compartilhado, montado a partir do índice offline de CNPJs
+    (None se desabilitado ou sem índice de CNPJs).
+    
+    A montagem exige CNPJ_MATCHER_UFS: com o Brasil inteiro o índice não cabe
+    na memória, então sem UFs configuradas só um índice já salvo é usado.
+    """
+    global _cnpj_matcher
+    if not Config.CNPJ_MATCHER_ENABLED:
+        return None
+    
+    if not CNPJIndex.exists(Config.CNPJ_INDEX_DIR):
+        return None
+    
+    with _matcher_lock:
+        if _cnpj_matcher is None:
+            path = Config.CNPJ_MATCHER_FILE
+            index_mtime = os.path.getmtime(os.path.join(Config.CNPJ_INDEX_DIR, 'estabelecimentos.idx'))
+            
+            if os.path.exists(path) and os.path.getmtime(path) >= index_mtime:
+                _cnpj_matcher = CNPJMatcher.load(path)
+            elif not Config.CNPJ_MATCHER_UFS:
+                logger.warning("CNPJ_MATCHER_UFS vazio: índice de nomes não será montado para o Brasil inteiro; "
+                               "configure as UFs (ex.: SP,RJ) para identificar CNPJs pelo nome")
+                return None
+            else:
+                logger.info(f"Montando índice de nomes de CNPJ para as UFs {', '.join(Config.CNPJ_MATCHER_UFS)}")
+                index = CNPJIndex(Config.CNPJ_INDEX_DIR)
+                try:
+                    _cnpj_matcher = CNPJMatcher.from_companies(index.iter_companies(Config.CNPJ_MATCHER_UFS))
+                finally:
+                    index.close()
+                _cnpj_matcher.save(path)
+        return _cnpj_matcher
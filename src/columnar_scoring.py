@@ -0,0 +1,147 @@
+"""
+Qualificação em colunas: aplica as regras de qualificação a um DataFrame
+inteiro com operações vetorizadas do pandas (requalificação da base histórica)
+"""
+import logging
+import re
+import time
+from datetime import datetime
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+from lead_qualifier import LeadQualifier
+from qualification_rules import Rule, RuleEngine
+
+logger = logging.getLogger(__name__)
+
+def _text(frame: pd.DataFrame, column: str) -> pd.Series:
+    """Coluna como texto; coluna ausente ou valor nulo viram '' (como chave ausente no dict)"""
+    if column not in frame:
+        return pd.Series('', index=frame.index, dtype=object)
+    return frame[column].fillna('').astype(str)
+
+def _cased(text: pd.Series, spec: Dict) -> pd.Series:
+    return text.str.lower() if spec.get('ignorar_caixa') else text
+
+# Versões em colunas dos tipos de condição de qualification_rules: cada uma recebe
+# (texto, definição, linhas ainda em aberto, contexto) e devolve uma Series booleana
+
+def _filled(text, spec, pending, ctx):
+    return text != ''
+
+def _min_digits(text, spec, pending, ctx):
+    return text.str.count(r'\d') >= int(spec['valor'])
+
+def _min_length(text, spec, pending, ctx):
+    return text.str.len() >= int(spec['valor'])
+
+def _contains(text, spec, pending, ctx):
+    needle = str(spec['valor'])
+    if spec.get('ignorar_caixa'):
+        needle = needle.lower()
+    return _cased(text, spec).str.contains(needle, regex=False)
+
+def _not_contains(text, spec, pending, ctx):
+    words = [str(word).lower() if spec.get('ignorar_caixa') else str(word) for word in spec['valores']]
+    if not words:
+        return pd.Series(True, index=text.index)
+    return ~_cased(text, spec).str.contains('|'.join(map(re.escape, words)), regex=True)
+
+def _not_numeric(text, spec, pending, ctx):
+    return ~text.str.isdigit()
+
+def _regex(text, spec, pending, ctx):
+    return text.str.contains(spec['padrao'], regex=True)
+
+def _website_alive(text, spec, pending, ctx):
+    # Só verifica os sites das linhas que ainda dependem desta condição
+    qualifier, check_websites = ctx
+    candidates = pending & (text != '')
+    if not check_websites or not candidates.any():
+        return pd.Series(False, index=text.index)
+    
+    alive = qualifier.website_checker.check_many(text[candidates].unique())
+    return candidates & text.map(alive).eq(True)
+
+def _high_consumption_cnae(text, spec, pending, ctx):
+    qualifier, _ = ctx
+    codes = text.str.replace(r'\D', '', regex=True)
+    prefixes = qualifier.cnae_index.prefixes(spec.get('nivel'))
+    lengths = codes.str.len()
+    result = pd.Series(False, index=text.index)
+    for size in sorted({len(prefix) for prefix in prefixes}):
+        result |= (lengths >= size) & codes.str[:size].isin(prefixes)
+    return result
+
+VECTOR_CONDITIONS: Dict[str, Callable] = {
+    'preenchido': _filled,
+    'min_digitos': _min_digits,
+    'min_caracteres': _min_length,
+    'contem': _contains,
+    'nao_contem': _not_contains,
+    'nao_numerico': _not_numeric,
+    'regex': _regex,
+    'site_ativo': _website_alive,
+    'cnae_alto_consumo': _high_consumption_cnae,
+}
+
+def _evaluate_rule(rule: Rule, frame: pd.DataFrame, ctx) -> pd.Series:
+    """Critério inteiro em colunas, com a mesma ordem e curto-circuito de Rule.check"""
+    all_of = rule.mode == 'todas'
+    result = pd.Series(all_of, index=frame.index)
+    for condition in rule.spec[rule.mode]:
+        pending = result if all_of else ~result
+        passed = VECTOR_CONDITIONS[condition['tipo']](_text(frame, condition['campo']), condition, pending, ctx)
+        result = (result & passed) if all_of else (result | passed)
+    return result
+
+def qualify_frame(qualifier: LeadQualifier, data, check_websites: bool = True) -> pd.DataFrame:
+    """
+    Qualifica todos os leads de um DataFrame (ou tabela Arrow) de uma vez.
+    
+    Retorna uma cópia com as colunas score, criterios_atingidos, qualificado,
+    nivel_qualificacao, data_qualificacao e observacoes_qualificacao, com os
+    mesmos valores de qualify_lead. Sites são verificados em lote pelo
+    website_checker do qualificador (check_websites=False pula o critério).
+    """
+    frame = data.to_pandas() if hasattr(data, 'to_pandas') else data
+    frame = frame.copy()
+    if frame.empty:
+        return frame
+    
+    rules: RuleEngine = qualifier.rules.current()
+    ctx = (qualifier, check_websites)
+    
+    columns = []
+    times = []
+    for rule in rules.rules:
+        start = time.perf_counter_ns()
+        columns.append(_evaluate_rule(rule, frame, ctx).to_numpy(dtype=bool))
+        times.append(time.perf_counter_ns() - start)
+    
+    matrix = np.column_stack(columns)
+    weights = np.array([rule.weight for rule in rules.rules])
+    score = matrix @ weights
+    rules.add_counters(len(frame), matrix.sum(axis=0).tolist(), times)
+    
+    # Lista, nível e observação saem de uma tabela montada por combinação de
+    # critérios presente no lote em vez de lead a lead
+    combos, inverse = np.unique(matrix, axis=0, return_inverse=True)
+    described = []
+    for combo in combos:
+        criterios = [rule.name for rule, passed in zip(rules.rules, combo) if passed]
+        combo_score = sum(rule.weight for rule, passed in zip(rules.rules, combo) if passed)
+        described.append((criterios, rules.level_for(combo_score), rules.notes_for(combo_score, criterios)))
+    inverse = inverse.reshape(-1)
+    
+    frame['score'] = score
+    frame['criterios_atingidos'] = [list(described[i][0]) for i in inverse]
+    frame['qualificado'] = score >= rules.qualified_score
+    frame['nivel_qualificacao'] = [described[i][1] for i in inverse]
+    frame['data_qualificacao'] = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+    frame['observacoes_qualificacao'] = [described[i][2] for i in inverse]
+    
+    logger.info(f"Qualificação em colunas concluída: {int(frame['qualificado'].sum())}/{len(frame)} leads qualificados")
+    return frame
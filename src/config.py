@@ -35,6 +35,125 @@ class Config:
     MAX_RESULTS_PER_SEARCH = int(os.getenv('MAX_RESULTS_PER_SEARCH', 100))
     HEADLESS_BROWSER = os.getenv('HEADLESS_BROWSER', 'true').lower() == 'true'
     
+    # Pool de navegadores do Instagram (reciclados após N páginas)
+    INSTAGRAM_DRIVER_POOL_SIZE = int(os.getenv('INSTAGRAM_DRIVER_POOL_SIZE', 2))
+    INSTAGRAM_DRIVER_MAX_PAGES = int(os.getenv('INSTAGRAM_DRIVER_MAX_PAGES', 200))
+    
+    # Instagram - modo rápido: esperas por elemento (timeout em segundos) e
+    # perfil do navegador sem imagens, mídia e scripts de terceiros
+    INSTAGRAM_FAST_MODE = os.getenv('INSTAGRAM_FAST_MODE', 'true').lower() == 'true'
+    INSTAGRAM_WAIT_TIMEOUT = float(os.getenv('INSTAGRAM_WAIT_TIMEOUT', 5))
+    
+    # Google Places - detalhes em paralelo (1 = modo sequencial)
+    PLACES_DETAILS_CONCURRENCY = int(os.getenv('PLACES_DETAILS_CONCURRENCY', 8))
+    
+    # Google Places - paginação (next_page_token leva alguns segundos para ficar válido)
+    PLACES_PAGE_TOKEN_DELAY = float(os.getenv('PLACES_PAGE_TOKEN_DELAY', 2))
+    PLACES_PAGE_TOKEN_RETRIES = int(os.getenv('PLACES_PAGE_TOKEN_RETRIES', 3))
+    
+    # Cliente HTTP compartilhado: timeouts (segundos), pool de conexões e HTTP/2 (requer o pacote h2)
+    HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 30))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 10))
+    HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 100))
+    HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', 20))
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', 10))
+    HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', 'true').lower() == 'true'
+    
+    # Concorrência adaptativa por host (AIMD), de ADAPTIVE_INITIAL_CONCURRENCY até HTTP_MAX_CONNECTIONS_PER_HOST
+    ADAPTIVE_CONCURRENCY_ENABLED = os.getenv('ADAPTIVE_CONCURRENCY_ENABLED', 'true').lower() == 'true'
+    ADAPTIVE_INITIAL_CONCURRENCY = int(os.getenv('ADAPTIVE_INITIAL_CONCURRENCY', 2))
+    ADAPTIVE_LATENCY_TOLERANCE = float(os.getenv('ADAPTIVE_LATENCY_TOLERANCE', 2.0))
+    
+    # Cassete das chamadas externas: off, record (grava) ou replay (reproduz sem rede)
+    CASSETTE_MODE = os.getenv('CASSETTE_MODE', 'off').lower()
+    CASSETTE_FILE = os.getenv('CASSETTE_FILE', 'cassettes/upstream.jsonl')
+    
+    # Resiliência das fontes: novas tentativas com backoff (segundos) e circuit breaker por fonte
+    RETRY_MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', 3))
+    RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', 1))
+    RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', 30))
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5))
+    CIRCUIT_RESET_TIMEOUT = float(os.getenv('CIRCUIT_RESET_TIMEOUT', 60))
+    
+    # Limites de taxa por host (requisições/segundo, rajada)
+    PLACES_RATE_LIMIT = float(os.getenv('PLACES_RATE_LIMIT', 10))
+    PLACES_RATE_BURST = int(os.getenv('PLACES_RATE_BURST', 10))
+    RECEITAWS_RATE_LIMIT = float(os.getenv('RECEITAWS_RATE_LIMIT', 3 / 60))  # API pública: 3/min
+    RECEITAWS_RATE_BURST = int(os.getenv('RECEITAWS_RATE_BURST', 3))
+    INSTAGRAM_RATE_LIMIT = float(os.getenv('INSTAGRAM_RATE_LIMIT', 1 / max(SCRAPING_DELAY, 1)))
+    INSTAGRAM_RATE_BURST = int(os.getenv('INSTAGRAM_RATE_BURST', 1))
+    RATE_LIMITS = {
+        'maps.googleapis.com': (PLACES_RATE_LIMIT, PLACES_RATE_BURST),
+        'receitaws.com.br': (RECEITAWS_RATE_LIMIT, RECEITAWS_RATE_BURST),
+        'instagram.com': (INSTAGRAM_RATE_LIMIT, INSTAGRAM_RATE_BURST),
+    }
+    
+    # Google Places - modo de busca das campanhas: 'text' (até 60 por consulta) ou 'tiled' (cidade inteira)
+    PLACES_SEARCH_MODE = os.getenv('PLACES_SEARCH_MODE', 'text').lower()
+    
+    # Google Places - busca por tiles (grade inicial N × N, subdivisão até a profundidade máxima)
+    GEO_TILE_GRID = int(os.getenv('GEO_TILE_GRID', 2))
+    GEO_TILE_MAX_DEPTH = int(os.getenv('GEO_TILE_MAX_DEPTH', 4))
+    
+    # Cache persistente das respostas do Google Places (TTL em segundos)
+    PLACES_CACHE_ENABLED = os.getenv('PLACES_CACHE_ENABLED', 'true').lower() == 'true'
+    PLACES_CACHE_FILE = os.getenv('PLACES_CACHE_FILE', 'cache/places_cache.sqlite')
+    PLACES_CACHE_TTL_TEXTSEARCH = int(os.getenv('PLACES_CACHE_TTL_TEXTSEARCH', 7 * 86400))
+    PLACES_CACHE_TTL_DETAILS = int(os.getenv('PLACES_CACHE_TTL_DETAILS', 30 * 86400))
+    PLACES_CACHE_TTL_NEGATIVE = int(os.getenv('PLACES_CACHE_TTL_NEGATIVE', 86400))
+    PLACES_CACHE_MAX_MB = int(os.getenv('PLACES_CACHE_MAX_MB', 200))
+    
+    # Consulta de CNPJ: 'receitaws' (API) ou 'offline' (índice local dos dados abertos da Receita)
+    CNPJ_BACKEND = os.getenv('CNPJ_BACKEND', 'receitaws').lower()
+    CNPJ_INDEX_DIR = os.getenv('CNPJ_INDEX_DIR', 'cache/cnpj_index')
+    
+    # Identificação do CNPJ pelo nome/CEP do lead (requer o índice offline de CNPJs)
+    # UFs vazias = todas; score mínimo de 0 a 1 para ser candidato; o melhor só vira
+    # o CNPJ do lead com o mesmo CEP ou com essa vantagem de score sobre o segundo
+    CNPJ_MATCHER_ENABLED = os.getenv('CNPJ_MATCHER_ENABLED', 'true').lower() == 'true'
+    CNPJ_MATCHER_FILE = os.getenv('CNPJ_MATCHER_FILE', 'cache/cnpj_matcher.pkl')
+    CNPJ_MATCHER_UFS = [uf.strip().upper() for uf in os.getenv('CNPJ_MATCHER_UFS', '').split(',') if uf.strip()]
+    CNPJ_MATCH_MIN_SCORE = float(os.getenv('CNPJ_MATCH_MIN_SCORE', 0.6))
+    CNPJ_MATCH_MIN_MARGIN = float(os.getenv('CNPJ_MATCH_MIN_MARGIN', 0.15))
+    
+    # Consulta de CNPJ (ReceitaWS): cache local (TTL em segundos), workers da fila e timeout
+    CNPJ_CACHE_ENABLED = os.getenv('CNPJ_CACHE_ENABLED', 'true').lower() == 'true'
+    CNPJ_CACHE_FILE = os.getenv('CNPJ_CACHE_FILE', 'cache/cnpj_cache.sqlite')
+    CNPJ_CACHE_TTL = int(os.getenv('CNPJ_CACHE_TTL', 30 * 86400))
+    CNPJ_CACHE_TTL_NEGATIVE = int(os.getenv('CNPJ_CACHE_TTL_NEGATIVE', 30 * 86400))
+    CNPJ_LOOKUP_WORKERS = int(os.getenv('CNPJ_LOOKUP_WORKERS', 1))
+    CNPJ_LOOKUP_TIMEOUT = float(os.getenv('CNPJ_LOOKUP_TIMEOUT', 30))
+    
+    # Verificação de sites dos leads: requisições simultâneas, timeout e cache por domínio
+    WEBSITE_CHECK_CONCURRENCY = int(os.getenv('WEBSITE_CHECK_CONCURRENCY', 20))
+    WEBSITE_CHECK_TIMEOUT = float(os.getenv('WEBSITE_CHECK_TIMEOUT', 10))
+    WEBSITE_CACHE_ENABLED = os.getenv('WEBSITE_CACHE_ENABLED', 'true').lower() == 'true'
+    WEBSITE_CACHE_FILE = os.getenv('WEBSITE_CACHE_FILE', 'cache/websites.sqlite')
+    WEBSITE_CACHE_TTL = int(os.getenv('WEBSITE_CACHE_TTL', 7 * 86400))
+    WEBSITE_CACHE_TTL_NEGATIVE = int(os.getenv('WEBSITE_CACHE_TTL_NEGATIVE', 86400))
+    
+    # Índice de lugares já coletados: off, skip (ignora conhecidos) ou
+    # refresh (só recoleta os conhecidos com mais de SEEN_INDEX_REFRESH_DAYS)
+    SEEN_INDEX_MODE = os.getenv('SEEN_INDEX_MODE', 'refresh').lower()
+    SEEN_INDEX_FILE = os.getenv('SEEN_INDEX_FILE', 'cache/seen_places.sqlite')
+    SEEN_INDEX_REFRESH_DAYS = int(os.getenv('SEEN_INDEX_REFRESH_DAYS', 30))
+    
+    # Gravação dos leads em fluxo: rotação por tamanho e intervalo de fsync (segundos)
+    LEADS_FILE_MAX_MB = int(os.getenv('LEADS_FILE_MAX_MB', 100))
+    LEADS_FSYNC_INTERVAL = float(os.getenv('LEADS_FSYNC_INTERVAL', 5))
+    
+    # Diário das campanhas (checkpoint para --resume)
+    CAMPAIGN_JOURNAL_DIR = os.getenv('CAMPAIGN_JOURNAL_DIR', 'campanhas')
+    
+    # Campanhas - células keyword × cidade em paralelo
+    CAMPAIGN_MAX_WORKERS = int(os.getenv('CAMPAIGN_MAX_WORKERS', 4))
+    CAMPAIGN_SOURCE_LIMITS = {
+        'google_places': int(os.getenv('CAMPAIGN_PLACES_CONCURRENCY', 4)),
+        'instagram': int(os.getenv('CAMPAIGN_INSTAGRAM_CONCURRENCY', INSTAGRAM_DRIVER_POOL_SIZE)),
+    }
+    # Quantas vezes uma célula que falhou por instabilidade da fonte volta para a fila
+    CAMPAIGN_MAX_REQUEUES = int(os.getenv('CAMPAIGN_MAX_REQUEUES', 2))
+    
     # Empresa
     EMPRESA_NOME = os.getenv('EMPRESA_NOME', 'Libra Energia')
     REPRESENTANTE_NOME = os.getenv('REPRESENTANTE_NOME', 'Seu Nome')
@@ -157,6 +276,21 @@ class Config:
         '9700-2/00',  # Serviços domésticos
         '9900-8/00',  # Atividades de organizações internacionais
     ]
+    # Nível de comparação com a lista acima: divisao (2 dígitos), grupo (3),
+    # classe (4, sem o dígito verificador) ou subclasse (código completo)
+    CNAE_MATCH_LEVEL = os.getenv('CNAE_MATCH_LEVEL', 'classe').lower()
+    
+    # Qualificação em paralelo (qualify_leads_parallel): processos (0 = um por
+    # núcleo) e leads por lote enviado a cada processo
+    QUALIFY_PARALLEL_WORKERS = int(os.getenv('QUALIFY_PARALLEL_WORKERS', 0))
+    QUALIFY_CHUNK_SIZE = int(os.getenv('QUALIFY_CHUNK_SIZE', 5000))
+    
+    # Regras de qualificação (critérios, pesos, níveis e observações) em JSON ou YAML;
+    # o arquivo é relido quando muda, verificado no máximo a cada intervalo (segundos)
+    QUALIFICATION_RULES_FILE = os.getenv(
+        'QUALIFICATION_RULES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'qualification_rules.json')
+    )
+    QUALIFICATION_RULES_RELOAD_INTERVAL = float(os.getenv('QUALIFICATION_RULES_RELOAD_INTERVAL', 2))
     
     # Palavras-chave para busca
     PALAVRAS_CHAVE = [
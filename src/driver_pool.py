@@ -0,0 +1,245 @@
+"""
+Pool de navegadores Selenium reaproveitados entre coletas do Instagram
+"""
+import atexit
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, List, Optional
+
+from config import Config
+
+# selenium e webdriver_manager são importados só ao criar um navegador
+if TYPE_CHECKING:
+    from selenium.webdriver.chrome.options import Options
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def get_chromedriver_path() -> str:
+    """Resolve (e baixa, se preciso) o chromedriver uma única vez por processo"""
+    from webdriver_manager.chrome import ChromeDriverManager
+    
+    path = ChromeDriverManager().install()
+    logger.info(f"Chromedriver resolvido em {path}")
+    return path
+
+# Recursos bloqueados no perfil rápido: imagens, vídeo, fontes e scripts de terceiros
+FAST_PROFILE_BLOCKED_URLS = [
+    '*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.svg*', '*.ico*',
+    '*.mp4*', '*.webm*', '*.m3u8*', '*.mpd*', '*.m4s*',
+    '*.woff*', '*.ttf*', '*.otf*',
+    '*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*',
+    '*connect.facebook.net*', '*facebook.com/tr*',
+]
+
+def build_chrome_options(headless: bool = True, fast: bool = False) -> 'Options':
+    """
+    Opções padrão do Chrome usadas pela coleta.
+    
+    No modo rápido o carregamento é "eager" (retorna no DOMContentLoaded) e
+    imagens, notificações e autoplay de mídia ficam desabilitados.
+    """
+    from selenium.webdriver.chrome.options import Options
+    
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    
+    if fast:
+        chrome_options.page_load_strategy = 'eager'
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_argument('--autoplay-policy=user-gesture-required')
+        chrome_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.default_content_setting_values.notifications': 2,
+            'profile.default_content_setting_values.media_stream': 2,
+        })
+    
+    return chrome_options
+
+def create_chrome_driver(headless: bool = True, fast: bool = False):
+    """Cria um Chrome novo usando o chromedriver em cache"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    
+    driver = webdriver.Chrome(
+        service=Service(get_chromedriver_path()),
+        options=build_chrome_options(headless, fast)
+    )
+    
+    if fast:
+        # Bloqueia na camada de rede o que as preferências não cobrem (mídia, fontes, rastreadores)
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': FAST_PROFILE_BLOCKED_URLS})
+        except Exception as e:
+            logger.warning(f"Não foi possível bloquear recursos no navegador: {e}")
+    
+    return driver
+
+class PooledDriver:
+    """Proxy do WebDriver que conta as páginas abertas durante o empréstimo"""
+    
+    def __init__(self, driver):
+        self._driver = driver
+        self.pages = 0
+    
+    def get(self, url: str):
+        self.pages += 1
+        return self._driver.get(url)
+    
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+class DriverPool:
+    """
+    Mantém até `size` navegadores aquecidos e os empresta para as coletas.
+    
+    Na devolução o navegador volta para o pool, a menos que tenha passado de
+    `max_pages` páginas (é reciclado) ou não responda mais (é descartado).
+    Quem espera por um navegador é acordado tanto na devolução quanto no
+    descarte, quando passa a poder abrir um novo.
+    """
+    
+    def __init__(self, size: int = 2, max_pages: int = 200,
+                 driver_factory: Callable = None, lease_timeout: float = 300):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.lease_timeout = lease_timeout
+        self._factory = driver_factory or (
+            lambda: create_chrome_driver(Config.HEADLESS_BROWSER, Config.INSTAGRAM_FAST_MODE)
+        )
+        self._idle: List[PooledDriver] = []
+        self._created = 0
+        self._available = threading.Condition()
+        self._closed = False
+    
+    def warm_up(self, count: int = None):
+        """Abre navegadores antecipadamente para que a primeira coleta não espere"""
+        count = min(count or self.size, self.size)
+        for _ in range(count):
+            driver = self._create()
+            if not driver:
+                break
+            self._put_idle(driver)
+    
+    @contextmanager
+    def lease(self):
+        """Empresta um navegador do pool durante o bloco `with`"""
+        driver = self._acquire()
+        try:
+            yield driver
+        finally:
+            self._release(driver)
+    
+    def _create(self) -> Optional[PooledDriver]:
+        with self._available:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        return self._start_driver()
+    
+    def _start_driver(self) -> PooledDriver:
+        """Abre um navegador numa vaga já reservada; se falhar, a vaga é liberada"""
+        try:
+            driver = PooledDriver(self._factory())
+            logger.info("Navegador do pool iniciado")
+            return driver
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._available.notify()
+            raise
+    
+    def _acquire(self) -> PooledDriver:
+        deadline = time.monotonic() + self.lease_timeout
+        
+        while True:
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Pool de navegadores encerrado")
+                    if self._idle:
+                        driver = self._idle.pop()
+                        break
+                    if self._created < self.size:
+                        # Reserva a vaga aqui; o navegador é aberto fora do lock
+                        self._created += 1
+                        driver = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Nenhum navegador livre no pool")
+                    self._available.wait(remaining)
+            
+            if driver is None:
+                return self._start_driver()
+            
+            if self._is_healthy(driver):
+                return driver
+            
+            logger.warning("Navegador do pool não respondeu; substituindo")
+            self._discard(driver)
+    
+    def _put_idle(self, driver: PooledDriver):
+        with self._available:
+            self._idle.append(driver)
+            self._available.notify()
+    
+    def _release(self, driver: PooledDriver):
+        if self._closed or driver.pages >= self.max_pages or not self._is_healthy(driver):
+            if driver.pages >= self.max_pages:
+                logger.info(f"Reciclando navegador após {driver.pages} páginas")
+            self._discard(driver)
+            return
+        
+        self._put_idle(driver)
+    
+    def _discard(self, driver: PooledDriver):
+        # A vaga liberada permite que quem está esperando abra um navegador novo
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _is_healthy(driver: PooledDriver) -> bool:
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def shutdown(self):
+        """Fecha todos os navegadores ociosos"""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+_shared_pool: Optional[DriverPool] = None
+_shared_lock = threading.Lock()
+
+def get_driver_pool() -> DriverPool:
+    """Pool de navegadores compartilhado pelo processo"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = DriverPool(
+                size=Config.INSTAGRAM_DRIVER_POOL_SIZE,
+                max_pages=Config.INSTAGRAM_DRIVER_MAX_PAGES
+            )
+            atexit.register(_shared_pool.shutdown)
+        return _shared_pool
@@ -0,0 +1,61 @@
+"""
+Funções de divisão geográfica (tiles) para buscas por área no Google Places
+"""
+import math
+from typing import List, Tuple
+
+# Limite de resultados do Places por consulta (3 páginas de 20)
+PLACES_RESULT_CAP = 60
+
+# Raio máximo aceito pelo Nearby Search, em metros
+MAX_SEARCH_RADIUS = 50000
+
+EARTH_RADIUS_M = 6371000
+
+# (sul, oeste, norte, leste) em graus
+BoundingBox = Tuple[float, float, float, float]
+
+def bbox_from_viewport(viewport: dict) -> BoundingBox:
+    """Converte o viewport da Geocoding API em bounding box"""
+    return (
+        viewport['southwest']['lat'],
+        viewport['southwest']['lng'],
+        viewport['northeast']['lat'],
+        viewport['northeast']['lng'],
+    )
+
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Distância em metros entre dois pontos"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+def split_bbox(bbox: BoundingBox, rows: int, cols: int) -> List[BoundingBox]:
+    """Divide a área em uma grade rows × cols"""
+    south, west, north, east = bbox
+    lat_step = (north - south) / rows
+    lng_step = (east - west) / cols
+    return [
+        (south + r * lat_step, west + c * lng_step, south + (r + 1) * lat_step, west + (c + 1) * lng_step)
+        for r in range(rows)
+        for c in range(cols)
+    ]
+
+def subdivide(bbox: BoundingBox) -> List[BoundingBox]:
+    """Divide um tile em quatro quadrantes"""
+    return split_bbox(bbox, 2, 2)
+
+def center_and_radius(bbox: BoundingBox) -> Tuple[float, float, int]:
+    """Centro do tile e raio (até o canto) que cobre o tile inteiro"""
+    south, west, north, east = bbox
+    lat = (south + north) / 2
+    lng = (west + east) / 2
+    radius = haversine_m(lat, lng, north, east)
+    return lat, lng, int(min(math.ceil(radius), MAX_SEARCH_RADIUS))
+
+def contains(bbox: BoundingBox, lat: float, lng: float) -> bool:
+    """Ponto dentro do tile (borda sul/oeste inclusiva)"""
+    south, west, north, east = bbox
+    return south <= lat < north and west <= lng < east
@@ -0,0 +1,170 @@
+"""
+Executor paralelo da grade keyword × cidade das campanhas de coleta
+"""
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from resilience import TransientError, backoff_delay
+
+logger = logging.getLogger(__name__)
+
+class SourceFailure(Exception):
+    """
+    Fontes obrigatórias que falharam numa célula (fonte -> erro), com os
+    leads das fontes que terminaram, para refazer só as que falharam
+    """
+    
+    def __init__(self, errors: Dict[str, Exception], leads: List[Dict]):
+        super().__init__('; '.join(f"{source}: {error}" for source, error in errors.items()))
+        self.errors = errors
+        self.leads = leads
+    
+    @property
+    def transient(self) -> bool:
+        return all(isinstance(error, TransientError) for error in self.errors.values())
+    
+    @property
+    def retry_after(self) -> Optional[float]:
+        waits = [error.retry_after for error in self.errors.values() if getattr(error, 'retry_after', None)]
+        return max(waits) if waits else None
+
+class GridExecutor:
+    """
+    Executa as células de uma campanha em paralelo.
+    
+    max_workers limita o total de células em andamento e source_limits limita
+    quantas células podem usar cada fonte ao mesmo tempo (ex.: o Instagram
+    não pode ter mais células do que navegadores disponíveis).
+    
+    Células que falham por instabilidade da fonte (TransientError) voltam
+    para a fila até max_requeues vezes, após uma espera com backoff (ou o
+    tempo que o circuito da fonte ainda ficará aberto). A espera é feita pelo
+    despachante, sem ocupar um worker, e quando a célula informa quais
+    fontes falharam (SourceFailure) só elas são refeitas.
+    """
+    
+    def __init__(self, max_workers: int = 4, source_limits: Dict[str, int] = None,
+                 max_requeues: int = 0, requeue_delay: float = 1.0, max_requeue_delay: float = 60.0):
+        self.max_workers = max(1, max_workers)
+        self.max_requeues = max(0, max_requeues)
+        self.requeue_delay = requeue_delay
+        self.max_requeue_delay = max_requeue_delay
+        self._semaphores = {
+            source: threading.BoundedSemaphore(max(1, limit))
+            for source, limit in (source_limits or {}).items()
+        }
+    
+    @contextmanager
+    def source_slot(self, source: str):
+        """Reserva uma vaga na fonte; fontes sem limite não bloqueiam"""
+        semaphore = self._semaphores.get(source)
+        if semaphore is None:
+            yield
+            return
+        
+        with semaphore:
+            yield
+    
+    def run(self, cells: Iterable[Tuple[str, str]], cell_fn: Callable[..., List[Dict]]) -> Iterator[Dict]:
+        """
+        Executa cell_fn(keyword, city) para cada célula e entrega os
+        resultados à medida que as células terminam (ordem de conclusão).
+        
+        Uma célula refeita só pelas fontes que falharam recebe
+        cell_fn(keyword, city, sources=[...]) e mantém os leads das demais.
+        """
+        cells = list(cells)
+        if not cells:
+            return
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(cells))) as executor:
+            futures = {
+                executor.submit(self._run_cell, index, keyword, city, cell_fn): (index, keyword, city, 1, None, [])
+                for index, (keyword, city) in enumerate(cells)
+            }
+            # Células reenfileiradas: (não antes de, índice, keyword, cidade, tentativa, fontes, leads já coletados)
+            delayed = []
+            
+            while futures or delayed:
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, index, keyword, city, attempt, sources, kept = heapq.heappop(delayed)
+                    retry = executor.submit(self._run_cell, index, keyword, city, cell_fn, sources, kept)
+                    futures[retry] = (index, keyword, city, attempt, sources, kept)
+                
+                timeout = max(0.0, delayed[0][0] - now) if delayed else None
+                if not futures:
+                    time.sleep(timeout)
+                    continue
+                
+                done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, keyword, city, attempt, sources, kept = futures.pop(future)
+                    cell, error = future.result()
+                    
+                    requeue = self._requeue_plan(error, sources, kept)
+                    if requeue and attempt <= self.max_requeues:
+                        retry_sources, retry_kept = requeue
+                        delay = max(error.retry_after or 0,
+                                    backoff_delay(attempt, self.requeue_delay, self.max_requeue_delay))
+                        only = f" só com {', '.join(retry_sources)}" if retry_sources else ''
+                        logger.warning(f"Célula '{keyword}' em {city} volta para a fila em {delay:.1f}s{only} "
+                                       f"(tentativa {attempt + 1} de {self.max_requeues + 1})")
+                        heapq.heappush(delayed, (time.monotonic() + delay, index, keyword, city,
+                                                 attempt + 1, retry_sources, retry_kept))
+                        continue
+                    
+                    cell['tentativas'] = attempt
+                    yield cell
+    
+    @staticmethod
+    def _requeue_plan(error: Optional[Exception], sources: Optional[List[str]],
+                      kept: List[Dict]) -> Optional[Tuple[Optional[List[str]], List[Dict]]]:
+        """Fontes a refazer (None = todas) e leads a manter, ou None se a célula não deve voltar para a fila"""
+        if isinstance(error, SourceFailure) and error.transient:
+            return list(error.errors), kept + error.leads
+        if isinstance(error, TransientError):
+            return sources, kept
+        return None
+    
+    def _run_cell(self, index: int, keyword: str, city: str, cell_fn: Callable[..., List[Dict]],
+                  sources: Optional[List[str]] = None, kept: List[Dict] = None) -> Tuple[Dict, Optional[Exception]]:
+        """Executa uma célula registrando tempo, total de leads e erro; retorna (célula, exceção)"""
+        error = None
+        cell = {
+            'indice': index,
+            'keyword': keyword,
+            'cidade': city,
+            'inicio': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            'leads': [],
+            'total_leads': 0,
+            'tempo': 0,
+            'erro': None
+        }
+        
+        start_time = time.time()
+        try:
+            if sources is None:
+                leads = cell_fn(keyword, city)
+            else:
+                leads = cell_fn(keyword, city, sources=sources)
+            cell['leads'] = (kept or []) + (leads or [])
+        except Exception as e:
+            logger.error(f"Erro na célula '{keyword}' em {city}: {e}")
+            cell['erro'] = str(e)
+            # Leads das fontes que terminaram não se perdem se a célula não for refeita
+            cell['leads'] = (kept or []) + getattr(e, 'leads', [])
+            error = e
+        
+        cell['tempo'] = round(time.time() - start_time, 2)
+        cell['total_leads'] = len(cell['leads'])
+        
+        logger.info(f"Célula '{keyword}' em {city}: {cell['total_leads']} leads em {cell['tempo']}s")
+        
+        return cell, error
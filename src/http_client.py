@@ -0,0 +1,288 @@
+"""
+Cliente HTTP compartilhado (httpx) com pool de conexões, limites por host,
+timeouts padrão e métricas de latência
+"""
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from adaptive_concurrency import AIMDLimiter
+from cassette import get_cassette
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Respostas que indicam que o host está recebendo mais do que aguenta
+CONGESTION_STATUSES = {429, 503}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+def http2_available() -> bool:
+    """HTTP/2 no httpx depende do pacote opcional h2"""
+    return importlib.util.find_spec('h2') is not None
+
+class LatencyMetrics:
+    """Latência e erros por host (janela das últimas `window` requisições para o p95)"""
+    
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict] = {}
+    
+    def record(self, host: str, elapsed: float, error: bool = False):
+        with self._lock:
+            stats = self._hosts.setdefault(host, {
+                'requisicoes': 0, 'erros': 0, 'tempo_total': 0.0, 'tempo_max': 0.0,
+                'recentes': deque(maxlen=self.window)
+            })
+            stats['requisicoes'] += 1
+            stats['erros'] += int(error)
+            stats['tempo_total'] += elapsed
+            stats['tempo_max'] = max(stats['tempo_max'], elapsed)
+            stats['recentes'].append(elapsed)
+    
+    def snapshot(self) -> Dict[str, Dict]:
+        """Resumo por host, com latências em milissegundos"""
+        with self._lock:
+            result = {}
+            for host, stats in self._hosts.items():
+                recent = sorted(stats['recentes'])
+                p95 = recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0
+                result[host] = {
+                    'requisicoes': stats['requisicoes'],
+                    'erros': stats['erros'],
+                    'latencia_media_ms': round(stats['tempo_total'] / stats['requisicoes'] * 1000, 1),
+                    'latencia_p95_ms': round(p95 * 1000, 1),
+                    'latencia_max_ms': round(stats['tempo_max'] * 1000, 1),
+                }
+            return result
+
+def _client_options(timeout: float, connect_timeout: float, max_connections: int,
+                    max_keepalive: int, http2: bool) -> Dict:
+    return {
+        'timeout': httpx.Timeout(timeout, connect=connect_timeout),
+        'limits': httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+        'http2': http2 and http2_available(),
+        'headers': DEFAULT_HEADERS,
+        'follow_redirects': True,
+    }
+
+class HttpClient:
+    """
+    Fachada síncrona sobre um httpx.Client compartilhado entre threads.
+    
+    Mantém conexões keep-alive, limita as requisições simultâneas por host
+    (`per_host_limit`) e registra a latência de cada requisição.
+    
+    Com `adaptive`, o limite de cada host começa em `initial_concurrency` e
+    é ajustado por AIMD até `per_host_limit`: sobe enquanto o host responde
+    bem e cai em 429/503, timeouts, latência em alta ou congestionamento
+    informado pelo chamador (report_congestion).
+    """
+    
+    def __init__(self, timeout: float = 30, connect_timeout: float = 10, max_connections: int = 100,
+                 max_keepalive: int = 20, per_host_limit: int = 10, http2: bool = True,
+                 metrics: LatencyMetrics = None, adaptive: bool = False, initial_concurrency: int = 2,
+                 latency_tolerance: float = 2.0, **client_kwargs):
+        options = _client_options(timeout, connect_timeout, max_connections, max_keepalive, http2)
+        options.update(client_kwargs)
+        self._client = httpx.Client(**options)
+        self.per_host_limit = max(1, per_host_limit)
+        self.metrics = metrics or LatencyMetrics()
+        self.adaptive = adaptive
+        self.initial_concurrency = initial_concurrency
+        self.latency_tolerance = latency_tolerance
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._limiters: Dict[str, AIMDLimiter] = {}
+        self._lock = threading.Lock()
+    
+    def _slot(self, host: str):
+        with self._lock:
+            if self.adaptive:
+                if host not in self._limiters:
+                    self._limiters[host] = AIMDLimiter(
+                        initial=self.initial_concurrency, max_limit=self.per_host_limit,
+                        latency_tolerance=self.latency_tolerance
+                    )
+                return self._limiters[host].slot()
+            
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host_limit)
+            return self._slots[host]
+    
+    def _feedback(self, host: str, response: Optional[httpx.Response], elapsed: float):
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            return
+        if response is None:
+            limiter.on_congestion('timeout')
+        elif response.status_code in CONGESTION_STATUSES:
+            limiter.on_congestion(f"HTTP {response.status_code}")
+        else:
+            limiter.on_success(elapsed)
+    
+    def report_congestion(self, url: str, reason: str):
+        """Sinal de congestionamento vindo do corpo da resposta (ex.: OVER_QUERY_LIMIT)"""
+        limiter = self._limiters.get(urlparse(url).hostname or '')
+        if limiter is not None:
+            limiter.on_congestion(reason)
+    
+    def concurrency_snapshot(self) -> Dict[str, Dict]:
+        """Limite de concorrência atual (e requisições em andamento) por host"""
+        with self._lock:
+            if self.adaptive:
+                return {host: limiter.snapshot() for host, limiter in self._limiters.items()}
+            return {host: {'limite': self.per_host_limit} for host in self._slots}
+    
+    @contextmanager
+    def _measure(self, host: str):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.metrics.record(host, time.perf_counter() - start, error)
+    
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        host = urlparse(url).hostname or ''
+        with self._slot(host), self._measure(host):
+            start = time.perf_counter()
+            try:
+                response = self._client.request(method, url, **kwargs)
+            except httpx.TimeoutException:
+                self._feedback(host, None, time.perf_counter() - start)
+                raise
+            self._feedback(host, response, time.perf_counter() - start)
+            return response
+    
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request('GET', url, **kwargs)
+    
+    def head(self, url: str, **kwargs) -> httpx.Response:
+        return self.request('HEAD', url, **kwargs)
+    
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request('POST', url, **kwargs)
+    
+    def close(self):
+        self._client.close()
+
+class AsyncHttpClient:
+    """Fachada assíncrona equivalente ao HttpClient, sobre httpx.AsyncClient"""
+    
+    def __init__(self, timeout: float = 30, connect_timeout: float = 10, max_connections: int = 100,
+                 max_keepalive: int = 20, per_host_limit: int = 10, http2: bool = True,
+                 metrics: LatencyMetrics = None, **client_kwargs):
+        options = _client_options(timeout, connect_timeout, max_connections, max_keepalive, http2)
+        options.update(client_kwargs)
+        self._client = httpx.AsyncClient(**options)
+        self.per_host_limit = max(1, per_host_limit)
+        self.metrics = metrics or LatencyMetrics()
+        self._slots: Dict[str, asyncio.Semaphore] = {}
+    
+    @asynccontextmanager
+    async def _slot(self, host: str):
+        if host not in self._slots:
+            self._slots[host] = asyncio.Semaphore(self.per_host_limit)
+        async with self._slots[host]:
+            yield
+    
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        host = urlparse(url).hostname or ''
+        async with self._slot(host):
+            start = time.perf_counter()
+            error = False
+            try:
+                return await self._client.request(method, url, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                self.metrics.record(host, time.perf_counter() - start, error)
+    
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+    
+    async def head(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('HEAD', url, **kwargs)
+    
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+    
+    async def aclose(self):
+        await self._client.aclose()
+
+def _config_options() -> Dict:
+    return {
+        'timeout': Config.HTTP_TIMEOUT,
+        'connect_timeout': Config.HTTP_CONNECT_TIMEOUT,
+        'max_connections': Config.HTTP_MAX_CONNECTIONS,
+        'max_keepalive': Config.HTTP_MAX_KEEPALIVE,
+        'per_host_limit': Config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        'http2': Config.HTTP2_ENABLED,
+    }
+
+def _with_cassette(options: Dict, is_async: bool = False) -> Dict:
+    """Com CASSETTE_MODE ligado, todas as requisições passam pelo cassete"""
+    cassette = get_cassette()
+    if cassette is None:
+        return options
+    
+    inner = None
+    if cassette.recording:
+        transport_class = httpx.AsyncHTTPTransport if is_async else httpx.HTTPTransport
+        inner = transport_class(
+            limits=httpx.Limits(max_connections=options['max_connections'],
+                                max_keepalive_connections=options['max_keepalive']),
+            http2=options['http2'] and http2_available()
+        )
+    return dict(options, transport=cassette.transport(inner))
+
+_metrics = LatencyMetrics()
+_http_client: Optional[HttpClient] = None
+_http_lock = threading.Lock()
+
+def get_http_client() -> HttpClient:
+    """Cliente HTTP síncrono compartilhado pelo processo"""
+    global _http_client
+    with _http_lock:
+        if _http_client is None:
+            _http_client = HttpClient(
+                metrics=_metrics,
+                adaptive=Config.ADAPTIVE_CONCURRENCY_ENABLED,
+                initial_concurrency=Config.ADAPTIVE_INITIAL_CONCURRENCY,
+                latency_tolerance=Config.ADAPTIVE_LATENCY_TOLERANCE,
+                **_with_cassette(_config_options())
+            )
+        return _http_client
+
+def create_async_http_client() -> AsyncHttpClient:
+    """
+    Cliente assíncrono com a configuração padrão e as mesmas métricas do
+    síncrono. Deve ser criado e fechado dentro do event loop que o usa.
+    """
+    return AsyncHttpClient(metrics=_metrics, **_with_cassette(_config_options(), is_async=True))
+
+def get_http_metrics() -> Dict[str, Dict]:
+    """
+    Métricas de latência por host de todos os clientes padrão, com o limite
+    de concorrência atual do cliente síncrono em 'concorrencia'
+    """
+    metrics = _metrics.snapshot()
+    if _http_client is not None:
+        for host, concurrency in _http_client.concurrency_snapshot().items():
+            metrics.setdefault(host, {})['concorrencia'] = concurrency
+    return metrics
@@ -2,21 +2,28 @@
 Módulo principal para coleta de leads
 """
 import time
-import json
 import logging
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
-import requests
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import pandas as pd
+from contextlib import contextmanager
+# selenium só é importado dentro dos métodos do Instagram: a API e a CLI
+# carregam este módulo sem nunca abrir um navegador
 
+from campaign_journal import CampaignJournal
+from cassette import get_cassette
+from cnpj_lookup import get_cnpj_lookup
 from config import Config
+import geo_tiling
+from driver_pool import create_chrome_driver, get_driver_pool
+from grid_executor import GridExecutor, SourceFailure
+from http_client import get_http_client, get_http_metrics
+from lead_writers import CSVLeadWriter, JSONLeadWriter, JSONLLeadWriter, LeadWriter
+from rate_limiter import get_rate_limiter
+from resilience import RETRYABLE_PLACES_STATUSES, TransientError, get_circuit_breaker, get_retry_policy
+from response_cache import get_places_cache
+from seen_index import get_seen_index
 
 # Configuração de logging
 logging.basicConfig(
@@ -29,32 +36,135 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class LeadSource:
+    """
+    Fonte de leads de uma campanha (plugin do LeadCollector).
+    
+    Cada fonte declara quantas células podem usá-la ao mesmo tempo
+    (`concurrency`) e os limites de taxa dos hosts que consulta
+    (`rate_limits`: host -> (requisições/segundo, rajada)). Fontes
+    opcionais que falham não derrubam a célula; as obrigatórias sim.
+    """
+    
+    name = ''
+    optional = False
+    
+    def __init__(self, collector: 'LeadCollector'):
+        self.collector = collector
+    
+    @property
+    def concurrency(self) -> int:
+        return self.collector.config.CAMPAIGN_MAX_WORKERS
+    
+    @property
+    def rate_limits(self) -> Dict[str, Tuple[float, int]]:
+        return {}
+    
+    def collect(self, keyword: str, city: str) -> List[Dict]:
+        raise NotImplementedError
+    
+    def warm_up(self):
+        """Prepara a fonte antes de uma campanha (por padrão, nada a fazer)"""
+
+class GooglePlacesSource(LeadSource):
+    """Google Places (busca por texto ou por tiles, conforme PLACES_SEARCH_MODE)"""
+    
+    name = 'google_places'
+    
+    @property
+    def concurrency(self) -> int:
+        return self.collector.config.CAMPAIGN_SOURCE_LIMITS.get(self.name, super().concurrency)
+    
+    @property
+    def rate_limits(self) -> Dict[str, Tuple[float, int]]:
+        config = self.collector.config
+        return {'maps.googleapis.com': (config.PLACES_RATE_LIMIT, config.PLACES_RATE_BURST)}
+    
+    def collect(self, keyword: str, city: str) -> List[Dict]:
+        # Na campanha os lugares só entram no índice de vistos quando a célula é gravada
+        if self.collector.config.PLACES_SEARCH_MODE == 'tiled':
+            return self.collector.collect_from_google_places_tiled(keyword, city, mark_seen=False)
+        return self.collector.collect_from_google_places(keyword, city, max_results=20, mark_seen=False)
+
+class InstagramSource(LeadSource):
+    """Posts da hashtag keyword+cidade no Instagram (opcional)"""
+    
+    name = 'instagram'
+    optional = True
+    
+    @property
+    def concurrency(self) -> int:
+        return self.collector.config.CAMPAIGN_SOURCE_LIMITS.get(self.name, super().concurrency)
+    
+    @property
+    def rate_limits(self) -> Dict[str, Tuple[float, int]]:
+        config = self.collector.config
+        return {'instagram.com': (config.INSTAGRAM_RATE_LIMIT, config.INSTAGRAM_RATE_BURST)}
+    
+    def collect(self, keyword: str, city: str) -> List[Dict]:
+        hashtag = f"{keyword.replace(' ', '')}{city.split(',')[0].lower()}"
+        return self.collector.collect_from_instagram(hashtag, max_results=10)
+    
+    def warm_up(self):
+        """Abre os navegadores do pool em segundo plano, enquanto as primeiras células buscam no Places"""
+        cassette = self.collector.cassette
+        if cassette is not None and cassette.replaying:
+            return
+        
+        def open_browsers():
+            try:
+                self.collector.driver_pool.warm_up(self.concurrency)
+            except Exception as e:
+                logger.warning(f"Não foi possível abrir os navegadores do Instagram antecipadamente: {e}")
+        
+        threading.Thread(target=open_browsers, name='instagram-warm-up', daemon=True).start()
+
 class LeadCollector:
     """Classe principal para coleta de leads"""
     
     def __init__(self):
         self.config = Config()
         self.driver = None
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.driver_pool = get_driver_pool()
+        self.rate_limiter = get_rate_limiter()
+        self.cassette = get_cassette()
+        # Com o cassete, toda chamada passa por ele: sem cache nem índice de vistos
+        self.places_cache = None if self.cassette else get_places_cache()
+        self.seen_index = None if self.cassette else get_seen_index()
+        # Lugares com detalhes coletados que ainda não foram registrados no índice
+        self._unconfirmed_places = set()
+        self._unconfirmed_lock = threading.Lock()
+        self.cnpj_lookup = get_cnpj_lookup()
+        self.session = get_http_client()
+        self.retry_policy = get_retry_policy()
+        self.places_breaker = get_circuit_breaker('google_places')
+        self.instagram_breaker = get_circuit_breaker('instagram')
+        self.sources: List[LeadSource] = []
+        for source_class in (GooglePlacesSource, InstagramSource):
+            self.register_source(source_class(self))
+    
+    def warm_up_sources(self):
+        """Prepara as fontes registradas antes de uma campanha (ex.: navegadores do Instagram)"""
+        for source in self.sources:
+            source.warm_up()
+    
+    def register_source(self, source: LeadSource):
+        """
+        Adiciona uma fonte às campanhas. Hosts da fonte ainda sem limite de
+        taxa recebem os declarados por ela; os já configurados são mantidos.
+        Reproduzindo um cassete não há chamadas reais, então não há limites.
+        """
+        replaying = self.cassette is not None and self.cassette.replaying
+        for host, (rate, burst) in source.rate_limits.items():
+            if not replaying and self.rate_limiter.bucket_for(host) is None:
+                self.rate_limiter.configure(host, rate, burst)
         
+        self.sources = [s for s in self.sources if s.name != source.name] + [source]
+    
     def setup_driver(self):
         """Configura o driver do Selenium"""
         try:
-            chrome_options = Options()
-            if self.config.HEADLESS_BROWSER:
-                chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            
-            self.driver = webdriver.Chrome(
-                service=webdriver.chrome.service.Service(ChromeDriverManager().install()),
-                options=chrome_options
-            )
+            self.driver = create_chrome_driver(self.config.HEADLESS_BROWSER, self.config.INSTAGRAM_FAST_MODE)
             logger.info("Driver do Selenium configurado com sucesso")
         except Exception as e:
             logger.error(f"Erro ao configurar driver: {e}")
@@ -72,55 +182,369 @@ class LeadCollector:
         """
         return self.collect_from_google_places(keyword, city, max_results)
     
-    def collect_from_google_places(self, keyword: str, city: str, max_results: int = 20) -> List[Dict]:
+    def collect_from_google_places(self, keyword: str, city: str, max_results: int = 20,
+                                   mark_seen: bool = True) -> List[Dict]:
         """
         Coleta leads usando Google Places API
+        
+        Falhas passageiras que persistem após as novas tentativas (ou com o
+        circuito da fonte aberto) sobem como TransientError, para que a
+        campanha possa refazer a célula em vez de perdê-la.
+        
+        Com mark_seen=False os lugares não são registrados no índice de
+        vistos ao final; a campanha os registra ao gravar a célula.
+        """
+        leads = []
+        search_query = f"{keyword} {city}"
+        
+        try:
+            for lead in self.iter_google_places(keyword, city, max_results=max_results):
+                leads.append(lead)
+            
+            logger.info(f"Coletados {len(leads)} leads para '{search_query}'")
+            if mark_seen:
+                self._confirm_seen(leads)
+        
+        except TransientError as e:
+            logger.warning(f"Google Places instável para '{search_query}': {e}")
+            self._forget_partial(leads)
+            raise
+        
+        except Exception as e:
+            logger.error(f"Erro ao coletar do Google Places: {e}")
+        
+        return leads
+    
+    def iter_google_places(self, keyword: str, city: str, max_results: int = None) -> Iterator[Dict]:
+        """
+        Itera sobre os leads do Google Places seguindo o next_page_token.
+        
+        Os leads de cada página são entregues (já com detalhes) assim que a
+        página chega, permitindo que a qualificação comece antes do fim da
+        coleta. Por padrão vai até Config.MAX_RESULTS_PER_SEARCH resultados.
         """
         if not self.config.GOOGLE_PLACES_API_KEY:
             logger.warning("API key do Google Places não configurada")
-            return []
+            return
+        
+        if max_results is None:
+            max_results = self.config.MAX_RESULTS_PER_SEARCH
         
-        leads = []
         search_query = f"{keyword} {city}"
+        params = {
+            'query': search_query,
+            'key': self.config.GOOGLE_PLACES_API_KEY,
+            'language': 'pt-BR',
+            'region': 'BR'
+        }
         
-        try:
-            # Busca por texto
-            url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-            params = {
-                'query': search_query,
-                'key': self.config.GOOGLE_PLACES_API_KEY,
-                'language': 'pt-BR',
-                'region': 'BR'
-            }
+        remaining = max_results
+        
+        for page, data in enumerate(self._iter_search_pages('textsearch', params), start=1):
+            status = data.get('status')
             
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            if status == 'ZERO_RESULTS':
+                logger.info(f"Nenhum resultado para '{search_query}'")
+                return
             
-            if data['status'] != 'OK':
-                logger.warning(f"Status da API não OK: {data['status']}")
+            if status != 'OK':
+                logger.warning(f"Status da API não OK: {status}")
+                return
+            
+            places = data.get('results', [])[:remaining]
+            remaining -= len(places)
+            
+            leads = self._build_leads(places)
+            
+            logger.info(f"Página {page} de '{search_query}': {len(leads)} leads")
+            
+            for lead in leads:
+                yield lead
+            
+            if remaining <= 0:
+                return
+    
+    def collect_from_google_places_tiled(self, keyword: str, city: str, mark_seen: bool = True) -> List[Dict]:
+        """
+        Coleta a cidade inteira dividindo a sua área em tiles.
+        
+        Cada tile é consultado no Nearby Search (location/radius); tiles que
+        batem no limite de 60 resultados do Places são subdivididos em quatro,
+        até GEO_TILE_MAX_DEPTH níveis. Os resultados são deduplicados por place_id.
+        mark_seen tem o mesmo papel que em collect_from_google_places.
+        """
+        if not self.config.GOOGLE_PLACES_API_KEY:
+            logger.warning("API key do Google Places não configurada")
+            return []
+        
+        leads = []
+        
+        try:
+            bounds = self._geocode_city_bounds(city)
+            if not bounds:
+                logger.warning(f"Não foi possível delimitar a área de {city}")
                 return []
             
-            for place in data['results'][:max_results]:
-                lead = self._extract_place_data(place)
-                if lead:
-                    leads.append(lead)
+            grid = self.config.GEO_TILE_GRID
+            pending = [(tile, 0) for tile in geo_tiling.split_bbox(bounds, grid, grid)]
+            seen_place_ids = set()
+            queries = 0
+            
+            while pending:
+                tile, depth = pending.pop()
+                places, capped = self._search_tile(keyword, tile)
+                queries += 1
                 
-                # Busca detalhes adicionais
-                if place.get('place_id'):
-                    details = self._get_place_details(place['place_id'])
-                    if details:
-                        lead.update(details)
+                if capped and depth < self.config.GEO_TILE_MAX_DEPTH:
+                    # Tile saturado: os quadrantes cobrem o que ficou de fora
+                    pending.extend((sub_tile, depth + 1) for sub_tile in geo_tiling.subdivide(tile))
                 
-                time.sleep(self.config.SCRAPING_DELAY)
-            
-            logger.info(f"Coletados {len(leads)} leads para '{search_query}'")
+                new_places = []
+                for place in places:
+                    place_id = place.get('place_id')
+                    location = place.get('geometry', {}).get('location', {})
+                    if not place_id or place_id in seen_place_ids:
+                        continue
+                    if not geo_tiling.contains(tile, location.get('lat', 0), location.get('lng', 0)):
+                        continue
+                    seen_place_ids.add(place_id)
+                    new_places.append(place)
+                
+                leads.extend(self._build_leads(new_places))
             
+            logger.info(f"Busca por tiles de '{keyword}' em {city}: {len(leads)} leads em {queries} tiles")
+            if mark_seen:
+                self._confirm_seen(leads)
+        
+        except TransientError as e:
+            logger.warning(f"Google Places instável na busca por tiles de '{keyword}' em {city}: {e}")
+            self._forget_partial(leads)
+            raise
+        
         except Exception as e:
-            logger.error(f"Erro ao coletar do Google Places: {e}")
+            logger.error(f"Erro na busca por tiles do Google Places: {e}")
+        
+        return leads
+    
+    def _search_tile(self, keyword: str, tile) -> tuple:
+        """Consulta um tile no Nearby Search; retorna (lugares, atingiu_o_limite)"""
+        lat, lng, radius = geo_tiling.center_and_radius(tile)
+        params = {
+            'location': f"{lat:.6f},{lng:.6f}",
+            'radius': radius,
+            'keyword': keyword,
+            'key': self.config.GOOGLE_PLACES_API_KEY,
+            'language': 'pt-BR'
+        }
+        
+        places = []
+        for data in self._iter_search_pages('nearbysearch', params):
+            if data.get('status') not in ('OK', 'ZERO_RESULTS'):
+                logger.warning(f"Status da API não OK no tile {tile}: {data.get('status')}")
+            places.extend(data.get('results', []))
+        
+        return places, len(places) >= geo_tiling.PLACES_RESULT_CAP
+    
+    def _geocode_city_bounds(self, city: str):
+        """Bounding box da cidade via Geocoding API (viewport)"""
+        url = "https://maps.googleapis.com/maps/api/geocode/json"
+        params = {
+            'address': city,
+            'key': self.config.GOOGLE_PLACES_API_KEY,
+            'language': 'pt-BR',
+            'region': 'br'
+        }
+        
+        data = self._cache_get('geocode', params)
+        if data is None:
+            data = self._places_request(url, params)
+            self._cache_set('geocode', params, data)
+        
+        if data.get('status') != 'OK' or not data.get('results'):
+            return None
+        
+        geometry = data['results'][0].get('geometry', {})
+        viewport = geometry.get('bounds') or geometry.get('viewport')
+        return geo_tiling.bbox_from_viewport(viewport) if viewport else None
+    
+    def _build_leads(self, places: List[Dict]) -> List[Dict]:
+        """Converte lugares em leads, filtra os já conhecidos e busca os detalhes"""
+        leads = [lead for lead in map(self._extract_place_data, places) if lead]
+        leads = self._filter_seen_places(leads)
+        enriched = self._enrich_with_place_details(leads)
+        
+        # Lugares cujos detalhes falharam continuam desconhecidos e voltam na próxima coleta;
+        # os demais só entram no índice quando a coleta é confirmada (_confirm_seen)
+        if self._active_seen_index() is not None:
+            with self._unconfirmed_lock:
+                self._unconfirmed_places.update(lead['place_id'] for lead in enriched)
         
         return leads
     
+    def _active_seen_index(self):
+        """Índice de lugares vistos, desligado com o cassete para que gravação e replay vejam os mesmos lugares"""
+        return None if self.cassette else self.seen_index
+    
+    def _confirm_seen(self, leads: List[Dict]):
+        """Registra no índice de vistos os lugares destes leads cujos detalhes foram coletados"""
+        place_ids = {lead.get('place_id') for lead in leads}
+        with self._unconfirmed_lock:
+            confirmed = self._unconfirmed_places & place_ids
+            self._unconfirmed_places -= confirmed
+        
+        seen_index = self._active_seen_index()
+        if seen_index is not None and confirmed:
+            seen_index.mark_refreshed(confirmed)
+    
+    def _forget_partial(self, leads: List[Dict]):
+        """Descarta os lugares de uma coleta interrompida, para que a célula refeita os traga de novo"""
+        with self._unconfirmed_lock:
+            self._unconfirmed_places -= {lead.get('place_id') for lead in leads}
+    
+    def _filter_seen_places(self, leads: List[Dict]) -> List[Dict]:
+        """
+        Remove lugares já coletados em campanhas anteriores antes de buscar detalhes.
+        
+        SEEN_INDEX_MODE=skip descarta todo lugar conhecido; refresh mantém
+        apenas os conhecidos com mais de SEEN_INDEX_REFRESH_DAYS, para atualizá-los.
+        """
+        seen_index = self._active_seen_index()
+        if seen_index is None:
+            return leads
+        
+        refresh_before = time.time() - self.config.SEEN_INDEX_REFRESH_DAYS * 86400
+        kept = []
+        for lead in leads:
+            refreshed = seen_index.last_refreshed(lead.get('place_id'))
+            if refreshed is None:
+                kept.append(lead)
+            elif self.config.SEEN_INDEX_MODE == 'refresh' and refreshed < refresh_before:
+                kept.append(lead)
+        
+        skipped = len(leads) - len(kept)
+        if skipped:
+            logger.info(f"{skipped} lugares já conhecidos ignorados")
+        
+        return kept
+    
+    def _iter_search_pages(self, endpoint: str, params: Dict) -> Iterator[Dict]:
+        """
+        Itera sobre as páginas de uma busca do Places (textsearch/nearbysearch)
+        seguindo o next_page_token enquanto houver.
+        
+        O token de uma página vinda do cache provavelmente já expirou; se a
+        página seguinte não está no cache, as anteriores são refeitas ao vivo
+        para obter um token válido.
+        """
+        # Páginas seguintes são guardadas no cache pela busca original + número
+        # da página, já que o next_page_token muda a cada execução
+        base_params = params
+        page = 1
+        token_from_cache = False
+        
+        while True:
+            cache_params = base_params if page == 1 else dict(base_params, page=page)
+            data = self._cache_get(endpoint, cache_params)
+            
+            if data is not None:
+                token_from_cache = True
+            else:
+                if token_from_cache:
+                    params = self._refresh_page_token(endpoint, base_params, page)
+                    if params is None:
+                        return
+                    token_from_cache = False
+                data = self._fetch_places_page(endpoint, params, cache_params)
+            yield data
+            
+            next_page_token = data.get('next_page_token')
+            if data.get('status') != 'OK' or not next_page_token:
+                return
+            
+            # Com pagetoken a API ignora os demais parâmetros de busca
+            params = {
+                'pagetoken': next_page_token,
+                'key': self.config.GOOGLE_PLACES_API_KEY
+            }
+            page += 1
+    
+    def _refresh_page_token(self, endpoint: str, base_params: Dict, page: int) -> Optional[Dict]:
+        """
+        Refaz ao vivo as páginas 1..page-1 de uma busca (atualizando o cache)
+        e retorna os parâmetros com um pagetoken válido para a página `page`.
+        
+        Retorna None se a busca não chegar mais até essa página.
+        """
+        logger.info(f"Página {page} de {endpoint} fora do cache; renovando o next_page_token")
+        params = base_params
+        
+        for previous in range(1, page):
+            cache_params = base_params if previous == 1 else dict(base_params, page=previous)
+            data = self._fetch_places_page(endpoint, params, cache_params)
+            next_page_token = data.get('next_page_token')
+            if data.get('status') != 'OK' or not next_page_token:
+                return None
+            params = {
+                'pagetoken': next_page_token,
+                'key': self.config.GOOGLE_PLACES_API_KEY
+            }
+        
+        return params
+    
+    def _fetch_places_page(self, endpoint: str, params: Dict, cache_params: Dict = None) -> Dict:
+        """
+        Busca ao vivo uma página de um endpoint de busca do Places e a guarda no cache em disco.
+        
+        O next_page_token só fica válido alguns segundos depois de emitido;
+        até lá a API responde INVALID_REQUEST, então aguarda e tenta de novo.
+        """
+        url = f"https://maps.googleapis.com/maps/api/place/{endpoint}/json"
+        cache_params = cache_params or params
+        
+        attempts = self.config.PLACES_PAGE_TOKEN_RETRIES if 'pagetoken' in params else 1
+        
+        for _ in range(attempts):
+            if 'pagetoken' in params and not (self.cassette and self.cassette.replaying):
+                time.sleep(self.config.PLACES_PAGE_TOKEN_DELAY)
+            
+            data = self._places_request(url, params)
+            
+            if data.get('status') != 'INVALID_REQUEST':
+                break
+        
+        self._cache_set(endpoint, cache_params, data)
+        return data
+    
+    def _places_request(self, url: str, params: Dict) -> Dict:
+        """
+        GET em um endpoint do Google Places com novas tentativas e circuit breaker.
+        
+        OVER_QUERY_LIMIT/UNKNOWN_ERROR, 429/5xx e timeouts são repetidos com
+        backoff; respostas com esses status nunca vão para o cache.
+        """
+        def fetch() -> Dict:
+            self.rate_limiter.acquire(url)
+            response = self.session.get(url, params=params)
+            response.raise_for_status()
+            data = response.json()
+            if data.get('status') in RETRYABLE_PLACES_STATUSES:
+                self.session.report_congestion(url, data['status'])
+                raise TransientError(f"Google Places respondeu {data['status']}")
+            return data
+        
+        return self.retry_policy.call(fetch, breaker=self.places_breaker)
+    
+    def _cache_get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Consulta o cache de respostas do Google Places, se habilitado (nunca com o cassete)"""
+        if not self.places_cache or self.cassette:
+            return None
+        return self.places_cache.get(endpoint, params)
+    
+    def _cache_set(self, endpoint: str, params: Dict, data: Dict):
+        """Guarda uma resposta do Google Places no cache, se habilitado (nunca com o cassete)"""
+        if self.places_cache and not self.cassette:
+            self.places_cache.set(endpoint, params, data)
+    
     def _process_google_places_results(self, places: List[Dict]) -> List[Dict]:
         """Processa resultados da API do Google Places para compatibilidade com testes"""
         leads = []
@@ -151,8 +575,50 @@ class LeadCollector:
             logger.error(f"Erro ao extrair dados do lugar: {e}")
             return None
     
+    def _enrich_with_place_details(self, leads: List[Dict]) -> List[Dict]:
+        """
+        Busca os detalhes de cada lead e mescla no próprio dicionário.
+        
+        Com PLACES_DETAILS_CONCURRENCY > 1 as consultas são feitas em paralelo
+        (no máximo PLACES_DETAILS_CONCURRENCY em andamento); caso contrário
+        são feitas em sequência. Em ambos os modos o ritmo é dado pelo
+        limitador de taxa do host.
+        
+        Retorna os leads cujos detalhes foram obtidos. TransientError sobe
+        para que a célula seja refeita.
+        """
+        pending = [lead for lead in leads if lead.get('place_id')]
+        if not pending:
+            return []
+        
+        concurrency = max(1, self.config.PLACES_DETAILS_CONCURRENCY)
+        enriched = []
+        
+        if concurrency == 1:
+            for lead in pending:
+                details = self._get_place_details(lead['place_id'])
+                if details is not None:
+                    lead.update(details)
+                    enriched.append(lead)
+            return enriched
+        
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(pending))) as executor:
+            # map preserva a ordem de entrada, então cada resultado volta para o seu lead
+            results = executor.map(self._get_place_details, [lead['place_id'] for lead in pending])
+            for lead, details in zip(pending, results):
+                if details is not None:
+                    lead.update(details)
+                    enriched.append(lead)
+        
+        return enriched
+    
     def _get_place_details(self, place_id: str) -> Optional[Dict]:
-        """Busca detalhes adicionais de um lugar"""
+        """
+        Busca detalhes adicionais de um lugar
+        
+        Falhas passageiras (TransientError, CircuitOpenError) sobem em vez de
+        virar None, para não darem o lugar como coletado sem detalhes.
+        """
         try:
             url = "https://maps.googleapis.com/maps/api/place/details/json"
             params = {
@@ -162,9 +628,10 @@ class LeadCollector:
                 'language': 'pt-BR'
             }
             
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+            data = self._cache_get('details', params)
+            if data is None:
+                data = self._places_request(url, params)
+                self._cache_set('details', params, data)
             
             if data['status'] != 'OK':
                 return None
@@ -176,80 +643,173 @@ class LeadCollector:
                 'horario_funcionamento': result.get('opening_hours', {}).get('weekday_text', []),
                 'nivel_preco': result.get('price_level', 0)
             }
-            
+        
+        except TransientError:
+            raise
+        
         except Exception as e:
             logger.error(f"Erro ao buscar detalhes do lugar: {e}")
             return None
     
-    def collect_from_instagram(self, hashtag: str, max_results: int = 50) -> List[Dict]:
+    @contextmanager
+    def _instagram_driver(self):
         """
-        Coleta leads do Instagram (requer login)
+        Navegador para a coleta do Instagram: o driver próprio, se foi
+        configurado com setup_driver, ou um navegador emprestado do pool.
         """
-        if not self.driver:
-            self.setup_driver()
+        if self.driver:
+            yield self.driver
+            return
         
-        leads = []
+        with self.driver_pool.lease() as driver:
+            yield driver
+    
+    def _wait_for_element(self, driver, locator, legacy_delay: float) -> bool:
+        """
+        Espera um elemento aparecer após navegar ou rolar a página.
+        
+        No modo rápido a espera é dirigida pela condição, com timeout
+        INSTAGRAM_WAIT_TIMEOUT; fora dele mantém a pausa fixa antiga.
+        """
+        if not self.config.INSTAGRAM_FAST_MODE:
+            time.sleep(legacy_delay)
+            return True
+        
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
         
         try:
-            # Navega para a hashtag
-            url = f"https://www.instagram.com/explore/tags/{hashtag}/"
-            self.driver.get(url)
-            time.sleep(3)
-            
-            # Aceita cookies se necessário
-            try:
-                cookie_button = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Aceitar')]"))
-                )
-                cookie_button.click()
-                time.sleep(2)
-            except:
-                pass
+            WebDriverWait(driver, self.config.INSTAGRAM_WAIT_TIMEOUT).until(
+                EC.presence_of_element_located(locator)
+            )
+            return True
+        except TimeoutException:
+            logger.debug(f"Elemento {locator[1]} não apareceu em {self.config.INSTAGRAM_WAIT_TIMEOUT}s")
+            return False
+    
+    def _scroll_for_more_posts(self, driver, scrolls: int):
+        """Rola a página da hashtag até carregar novos posts ou parar de crescer"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        post_locator = (By.CSS_SELECTOR, "article a")
+        
+        for _ in range(scrolls):
+            loaded = len(driver.find_elements(*post_locator))
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             
-            # Rola para carregar mais posts
-            for _ in range(max_results // 12):
-                self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            if not self.config.INSTAGRAM_FAST_MODE:
                 time.sleep(2)
+                continue
             
-            # Extrai dados dos posts
-            posts = self.driver.find_elements(By.CSS_SELECTOR, "article a")
+            try:
+                WebDriverWait(driver, self.config.INSTAGRAM_WAIT_TIMEOUT).until(
+                    lambda d: len(d.find_elements(*post_locator)) > loaded
+                )
+            except TimeoutException:
+                break  # A página parou de carregar posts
+    
+    def collect_from_instagram(self, hashtag: str, max_results: int = 50) -> List[Dict]:
+        """
+        Coleta leads do Instagram (requer login)
+        
+        Com o cassete ligado, os leads extraídos no navegador são gravados
+        (record) ou servidos sem abrir o navegador (replay).
+        """
+        if self.cassette:
+            return self.cassette.call('instagram', (hashtag, max_results),
+                                      lambda: self._collect_from_instagram(hashtag, max_results))
+        return self._collect_from_instagram(hashtag, max_results)
+    
+    def _collect_from_instagram(self, hashtag: str, max_results: int) -> List[Dict]:
+        """
+        Coleta os posts da hashtag no navegador.
+        
+        Com o circuito do Instagram aberto (falhas seguidas), a coleta é
+        pulada em vez de esperar pelos timeouts do navegador.
+        """
+        leads = []
+        
+        if not self.instagram_breaker.allow():
+            logger.warning(f"Instagram suspenso (circuito aberto); #{hashtag} ignorada")
+            return leads
+        
+        try:
+            from selenium.webdriver.common.by import By
+            from selenium.webdriver.support import expected_conditions as EC
+            from selenium.webdriver.support.ui import WebDriverWait
             
-            for post in posts[:max_results]:
+            with self._instagram_driver() as driver:
+                # Navega para a hashtag
+                url = f"https://www.instagram.com/explore/tags/{hashtag}/"
+                self.rate_limiter.acquire(url)
+                driver.get(url)
+                self._wait_for_element(driver, (By.CSS_SELECTOR, "article a"), legacy_delay=3)
+                
+                # Aceita cookies se necessário
+                cookie_timeout = self.config.INSTAGRAM_WAIT_TIMEOUT if self.config.INSTAGRAM_FAST_MODE else 10
                 try:
-                    href = post.get_attribute('href')
-                    if href and '/p/' in href:
-                        lead = self._extract_instagram_post_data(href)
-                        if lead:
-                            leads.append(lead)
-                        time.sleep(self.config.SCRAPING_DELAY)
-                except Exception as e:
-                    logger.error(f"Erro ao processar post do Instagram: {e}")
+                    cookie_button = WebDriverWait(driver, cookie_timeout).until(
+                        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Aceitar')]"))
+                    )
+                    cookie_button.click()
+                    if self.config.INSTAGRAM_FAST_MODE:
+                        WebDriverWait(driver, cookie_timeout).until(EC.staleness_of(cookie_button))
+                    else:
+                        time.sleep(2)
+                except:
+                    pass
+                
+                # Rola para carregar mais posts
+                self._scroll_for_more_posts(driver, max_results // 12)
+                
+                # Lê os links antes de navegar, pois os elementos expiram ao sair da página
+                posts = driver.find_elements(By.CSS_SELECTOR, "article a")
+                hrefs = [post.get_attribute('href') for post in posts[:max_results]]
+                
+                for href in hrefs:
+                    try:
+                        if href and '/p/' in href:
+                            lead = self._extract_instagram_post_data(href, driver)
+                            if lead:
+                                leads.append(lead)
+                    except Exception as e:
+                        logger.error(f"Erro ao processar post do Instagram: {e}")
             
             logger.info(f"Coletados {len(leads)} leads do Instagram para #{hashtag}")
-            
+            self.instagram_breaker.record_success()
+        
         except Exception as e:
             logger.error(f"Erro ao coletar do Instagram: {e}")
+            self.instagram_breaker.record_failure()
         
         return leads
     
-    def _extract_instagram_post_data(self, post_url: str) -> Optional[Dict]:
+    def _extract_instagram_post_data(self, post_url: str, driver=None) -> Optional[Dict]:
         """Extrai dados de um post do Instagram"""
+        from selenium.webdriver.common.by import By
+        
+        driver = driver or self.driver
         try:
-            self.driver.get(post_url)
-            time.sleep(2)
+            self.rate_limiter.acquire(post_url)
+            driver.get(post_url)
+            self._wait_for_element(driver, (By.CSS_SELECTOR, "header a"), legacy_delay=2)
             
             # Extrai informações do perfil
-            profile_link = self.driver.find_element(By.CSS_SELECTOR, "header a")
+            profile_link = driver.find_element(By.CSS_SELECTOR, "header a")
             profile_url = profile_link.get_attribute('href')
             profile_name = profile_link.text
             
             # Navega para o perfil
-            self.driver.get(profile_url)
-            time.sleep(2)
+            self.rate_limiter.acquire(profile_url)
+            driver.get(profile_url)
+            self._wait_for_element(driver, (By.CSS_SELECTOR, "header section"), legacy_delay=2)
             
             # Extrai bio e informações
             try:
-                bio_element = self.driver.find_element(By.CSS_SELECTOR, "div[data-testid='user-bio']")
+                bio_element = driver.find_element(By.CSS_SELECTOR, "div[data-testid='user-bio']")
                 bio = bio_element.text
             except:
                 bio = ""
@@ -273,7 +833,7 @@ class LeadCollector:
                 'fonte': 'Instagram',
                 'data_coleta': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
             }
-            
+        
         except Exception as e:
             logger.error(f"Erro ao extrair dados do post: {e}")
             return None
@@ -286,14 +846,10 @@ class LeadCollector:
             # Remove caracteres especiais
             cnpj_limpo = ''.join(filter(str.isdigit, cnpj))
             
-            # API pública da Receita
-            url = f"https://receitaws.com.br/v1/cnpj/{cnpj_limpo}"
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            data = response.json()
+            # API pública da Receita (via cache e fila do serviço de CNPJ)
+            data = self.cnpj_lookup.lookup(cnpj_limpo)
             
-            if data.get('status') == 'ERROR':
+            if not data:
                 logger.warning(f"CNPJ {cnpj} não encontrado ou erro na API")
                 return None
             
@@ -318,14 +874,21 @@ class LeadCollector:
                 'fonte': 'Receita Federal',
                 'data_coleta': datetime.now().strftime('%d/%m/%Y %H:%M:%S')
             }
-            
+        
         except Exception as e:
             logger.error(f"Erro ao buscar CNPJ {cnpj}: {e}")
             return None
     
-    def run_collection_campaign(self, keywords: List[str] = None, cities: List[str] = None) -> List[Dict]:
+    def run_collection_campaign(self, keywords: List[str] = None, cities: List[str] = None,
+                                journal: CampaignJournal = None, sink: LeadWriter = None) -> List[Dict]:
         """
         Executa campanha completa de coleta
+        
+        Com um journal, cada célula concluída é gravada em disco e, ao
+        retomar, as células já concluídas são lidas do diário em vez de coletadas.
+        
+        Com um sink, os leads novos de cada célula são gravados assim que ela
+        termina, para que resultados parciais fiquem em disco.
         """
         if not keywords:
             keywords = self.config.PALAVRAS_CHAVE[:5]  # Primeiras 5 palavras-chave
@@ -333,38 +896,133 @@ class LeadCollector:
         if not cities:
             cities = self.config.CIDADES_INICIAIS[:1]  # Primeira cidade para teste
         
-        all_leads = []
-        
         logger.info(f"Iniciando campanha de coleta com {len(keywords)} keywords e {len(cities)} cidades")
         
-        for city in cities:
-            for keyword in keywords:
-                logger.info(f"Coletando leads para '{keyword}' em {city}")
-                
-                # Coleta do Google Places
-                leads_places = self.collect_from_google_places(keyword, city, max_results=20)
-                all_leads.extend(leads_places)
-                
-                # Coleta do Instagram (opcional)
-                try:
-                    hashtag = f"{keyword.replace(' ', '')}{city.split(',')[0].lower()}"
-                    leads_instagram = self.collect_from_instagram(hashtag, max_results=10)
-                    all_leads.extend(leads_instagram)
-                except Exception as e:
-                    logger.warning(f"Instagram não disponível para {keyword}: {e}")
-                
-                time.sleep(self.config.SCRAPING_DELAY * 2)
+        # Leads de células concluídas em execuções anteriores já foram gravados no sink
+        streamed = set()
+        if sink and journal:
+            for cell in journal.completed_cells():
+                self._remove_duplicates(cell['leads'], streamed)
+        
+        cells = []
+        for cell in self.iter_collection_campaign(keywords, cities, journal=journal):
+            cells.append(cell)
+            if sink:
+                sink.write_all(self._remove_duplicates(cell['leads'], streamed))
+        
+        if journal:
+            cells = journal.completed_cells() + [cell for cell in cells if cell.get('erro')]
+        
+        # Reordena pela grade para que o resultado não dependa da ordem de conclusão
+        all_leads = []
+        for cell in sorted(cells, key=lambda c: c['indice']):
+            all_leads.extend(cell['leads'])
         
         # Remove duplicatas
         unique_leads = self._remove_duplicates(all_leads)
         
         logger.info(f"Campanha concluída. Total de leads únicos: {len(unique_leads)}")
         
+        if self.places_cache:
+            cache_stats = self.places_cache.get_stats()
+            logger.info(f"Cache do Google Places: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+        
+        for host, metrics in get_http_metrics().items():
+            if 'requisicoes' not in metrics:
+                continue
+            concurrency = metrics.get('concorrencia', {}).get('limite', '-')
+            logger.info(f"HTTP {host}: {metrics['requisicoes']} requisições, {metrics['erros']} erros, "
+                        f"latência média {metrics['latencia_media_ms']}ms (p95 {metrics['latencia_p95_ms']}ms), "
+                        f"concorrência {concurrency}")
+        
+        if self.cassette:
+            stats = self.cassette.get_stats()
+            logger.info(f"Cassete ({stats['modo']}): {stats['hits']} respostas reproduzidas, {stats['misses']} ausentes")
+        
         return unique_leads
     
-    def _remove_duplicates(self, leads: List[Dict]) -> List[Dict]:
-        """Remove leads duplicados baseado no nome e endereço"""
-        seen = set()
+    def iter_collection_campaign(self, keywords: List[str], cities: List[str],
+                                 max_workers: int = None, journal: CampaignJournal = None) -> Iterator[Dict]:
+        """
+        Executa a grade cidades × keywords em paralelo e entrega cada célula
+        assim que termina, com leads, tempo e total de leads da célula.
+        
+        Células já registradas no journal são puladas; as novas são gravadas
+        nele assim que terminam, e só então os seus lugares entram no índice
+        de vistos (uma célula interrompida traz os mesmos lugares ao ser refeita).
+        """
+        executor = GridExecutor(
+            max_workers=max_workers or self.config.CAMPAIGN_MAX_WORKERS,
+            source_limits={source.name: source.concurrency for source in self.sources},
+            max_requeues=self.config.CAMPAIGN_MAX_REQUEUES,
+            requeue_delay=self.config.RETRY_BASE_DELAY,
+            max_requeue_delay=self.config.CIRCUIT_RESET_TIMEOUT
+        )
+        grid = [(keyword, city) for city in cities for keyword in keywords]
+        pending = [
+            (index, cell) for index, cell in enumerate(grid)
+            if not (journal and journal.is_done(*cell))
+        ]
+        
+        if journal and len(pending) < len(grid):
+            logger.info(f"Retomando campanha {journal.campaign_id}: "
+                        f"{len(grid) - len(pending)}/{len(grid)} células já concluídas")
+        
+        def collect_cell(keyword: str, city: str, sources: List[str] = None) -> List[Dict]:
+            return self._collect_cell(keyword, city, executor, sources)
+        
+        for cell in executor.run([cell for _, cell in pending], collect_cell):
+            # Índice na grade completa, não apenas entre as células pendentes
+            cell['indice'] = pending[cell['indice']][0]
+            if journal:
+                journal.record_cell(cell)
+            if not cell.get('erro'):
+                self._confirm_seen(cell['leads'])
+            yield cell
+    
+    def _collect_cell(self, keyword: str, city: str, executor: GridExecutor,
+                      sources: List[str] = None) -> List[Dict]:
+        """
+        Coleta uma célula keyword × cidade em todas as fontes ao mesmo tempo
+        (ou só nas fontes `sources`, quando a célula é refeita).
+        
+        Os leads são juntados na ordem em que as fontes terminam, então o
+        tempo da célula é o da fonte mais lenta e não a soma de todas. Se
+        fontes obrigatórias falham, sobe SourceFailure com os erros delas e
+        os leads das demais.
+        """
+        logger.info(f"Coletando leads para '{keyword}' em {city}")
+        leads = []
+        errors = {}
+        selected = [source for source in self.sources if sources is None or source.name in sources]
+        
+        def run_source(source: LeadSource) -> List[Dict]:
+            with executor.source_slot(source.name):
+                return source.collect(keyword, city) or []
+        
+        with ThreadPoolExecutor(max_workers=max(1, len(selected))) as pool:
+            futures = {pool.submit(run_source, source): source for source in selected}
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    leads.extend(future.result())
+                except Exception as e:
+                    if not source.optional:
+                        errors[source.name] = e
+                        continue
+                    logger.warning(f"{source.name} não disponível para {keyword}: {e}")
+        
+        if errors:
+            raise SourceFailure(errors, leads)
+        return leads
+    
+    def _remove_duplicates(self, leads: List[Dict], seen: set = None) -> List[Dict]:
+        """
+        Remove leads duplicados baseado no nome e endereço
+        
+        Um `seen` compartilhado permite deduplicar lote a lote.
+        """
+        seen = set() if seen is None else seen
         unique_leads = []
         
         for lead in leads:
@@ -377,35 +1035,55 @@ class LeadCollector:
         
         return unique_leads
     
-    def save_leads_to_csv(self, leads: List[Dict], filename: str = None):
-        """Salva leads em arquivo CSV"""
+    def save_leads_to_csv(self, leads: Iterable[Dict], filename: str = None):
+        """Salva leads em arquivo CSV (aceita qualquer iterável, gravando lead a lead)"""
         if not filename:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"leads_coletados_{timestamp}.csv"
         
         try:
-            df = pd.DataFrame(leads)
-            df.to_csv(filename, index=False, encoding='utf-8-sig')
+            # Numa lista dá para conhecer todas as colunas antes de começar
+            fieldnames = None
+            if isinstance(leads, list):
+                fieldnames = list(dict.fromkeys(field for lead in leads for field in lead))
+            
+            with CSVLeadWriter(filename, fieldnames=fieldnames,
+                               fsync_interval=self.config.LEADS_FSYNC_INTERVAL) as writer:
+                writer.write_all(leads)
             logger.info(f"Leads salvos em {filename}")
             return filename
         except Exception as e:
             logger.error(f"Erro ao salvar CSV: {e}")
             return None
     
-    def save_leads_to_json(self, leads: List[Dict], filename: str = None):
-        """Salva leads em arquivo JSON"""
+    def save_leads_to_json(self, leads: Iterable[Dict], filename: str = None):
+        """Salva leads em arquivo JSON (aceita qualquer iterável, gravando lead a lead)"""
         if not filename:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"leads_coletados_{timestamp}.json"
         
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(leads, f, ensure_ascii=False, indent=2)
+            with JSONLeadWriter(filename, fsync_interval=self.config.LEADS_FSYNC_INTERVAL) as writer:
+                writer.write_all(leads)
             logger.info(f"Leads salvos em {filename}")
             return filename
         except Exception as e:
             logger.error(f"Erro ao salvar JSON: {e}")
             return None
+    
+    def open_leads_stream(self, filename: str) -> JSONLLeadWriter:
+        """
+        Arquivo JSONL para gravar leads durante a coleta, rotacionado por tamanho
+        
+        Um arquivo existente é continuado, para que a campanha retomada acrescente
+        os leads das células novas aos já gravados.
+        """
+        return JSONLLeadWriter(
+            filename,
+            max_bytes=self.config.LEADS_FILE_MAX_MB * 1024 * 1024,
+            fsync_interval=self.config.LEADS_FSYNC_INTERVAL,
+            append=True
+        )
 
 if __name__ == "__main__":
     # Exemplo de uso
@@ -423,7 +1101,7 @@ if __name__ == "__main__":
         collector.save_leads_to_json(leads)
         
         print(f"Coleta concluída! {len(leads)} leads coletados.")
-        
+    
     except Exception as e:
         logger.error(f"Erro na execução: {e}")
     finally:
@@ -2,23 +2,54 @@
 Módulo para qualificação automática dos leads
 """
 import logging
+import os
 import re
-from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
-import requests
+from cnae_index import CNAEIndex
+from cnpj_lookup import CNPJLookupService, get_cnpj_lookup
+from cnpj_matcher import CNPJMatcher, extract_cep, get_cnpj_matcher
 from config import Config
+from http_client import get_http_client
+from qualification_rules import QualificationRules, get_qualification_rules
+from website_checker import get_website_checker
 
 logger = logging.getLogger(__name__)
 
+# Campos acrescentados por qualify_lead (voltam dos processos como tupla nesta ordem)
+QUALIFICATION_OUTPUTS = (
+    'score', 'criterios_atingidos', 'qualificado', 'nivel_qualificacao',
+    'data_qualificacao', 'observacoes_qualificacao'
+)
+
 class LeadQualifier:
     """Classe para qualificação automática dos leads"""
     
-    def __init__(self):
+    def __init__(self, enrich_cnpj: bool = True):
         self.config = Config()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+        self.cnae_index = CNAEIndex(self.config.CNAES_ALTO_CONSUMO, level=self.config.CNAE_MATCH_LEVEL)
+        # Os processos da qualificação em paralelo não consultam CNPJ
+        self.cnpj_lookup = get_cnpj_lookup() if enrich_cnpj else None
+        # O índice de nomes é montado/carregado só na primeira busca de CNPJ que precisar dele
+        self._cnpj_matcher: Optional[CNPJMatcher] = None
+        self._cnpj_matcher_loaded = not enrich_cnpj
+        self.session = get_http_client()
+        self.website_checker = get_website_checker()
+        self.rules = get_qualification_rules()
+    
+    @property
+    def cnpj_matcher(self) -> Optional[CNPJMatcher]:
+        """Índice de nomes de empresas (None se desabilitado ou sem índice de CNPJs)"""
+        if not self._cnpj_matcher_loaded:
+            self._cnpj_matcher = get_cnpj_matcher()
+            self._cnpj_matcher_loaded = True
+        return self._cnpj_matcher
+    
+    @cnpj_matcher.setter
+    def cnpj_matcher(self, matcher: Optional[CNPJMatcher]):
+        self._cnpj_matcher = matcher
+        self._cnpj_matcher_loaded = True
     
     def qualify_lead(self, lead: Dict) -> Dict:
         """
@@ -27,66 +58,45 @@ class LeadQualifier:
         try:
             qualified_lead = lead.copy()
             
-            # Aplica critérios de qualificação
-            score = 0
-            criterios_atingidos = []
-            
-            # Critério 1: Tem telefone ativo (+1 ponto)
-            if self._has_valid_phone(lead):
-                score += 1
-                criterios_atingidos.append("Telefone válido")
-            
-            # Critério 2: Tem site ativo (+1 ponto)
-            if self._has_valid_website(lead):
-                score += 1
-                criterios_atingidos.append("Site ativo")
-            
-            # Critério 3: CNAE compatível (+2 pontos)
-            if self._has_compatible_cnae(lead):
-                score += 2
-                criterios_atingidos.append("CNAE compatível")
-            
-            # Critério 4: Tem WhatsApp ou Instagram (+1 ponto)
-            if self._has_social_media(lead):
-                score += 1
-                criterios_atingidos.append("Mídia social")
-            
-            # Critério 5: Endereço válido (+1 ponto)
-            if self._has_valid_address(lead):
-                score += 1
-                criterios_atingidos.append("Endereço válido")
-            
-            # Critério 6: Nome da empresa válido (+1 ponto)
-            if self._has_valid_company_name(lead):
-                score += 1
-                criterios_atingidos.append("Nome válido")
+            # Aplica os critérios do arquivo de regras (recarregado quando muda)
+            rules = self.rules.current()
+            score, criterios_atingidos = rules.evaluate(lead, self)
             
             # Adiciona informações de qualificação
             qualified_lead.update({
                 'score': score,
                 'criterios_atingidos': criterios_atingidos,
-                'qualificado': score >= 3,  # Mínimo 3 pontos para ser qualificado
-                'nivel_qualificacao': self._get_qualification_level(score),
+                'qualificado': rules.is_qualified(score),
+                'nivel_qualificacao': rules.level_for(score),
                 'data_qualificacao': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-                'observacoes_qualificacao': self._generate_qualification_notes(score, criterios_atingidos)
+                'observacoes_qualificacao': rules.notes_for(score, criterios_atingidos)
             })
             
             logger.info(f"Lead '{lead.get('nome', 'N/A')}' qualificado com score {score}")
             
             return qualified_lead
-            
+        
         except Exception as e:
             logger.error(f"Erro ao qualificar lead: {e}")
             return lead
     
     def qualify_leads_batch(self, leads: List[Dict]) -> List[Dict]:
         """
-        Qualifica uma lista de leads em lote
+        Qualifica uma lista de leads em lote (um DataFrame é qualificado em colunas)
         """
+        if hasattr(leads, 'columns') or hasattr(leads, 'to_pandas'):
+            return self.qualify_dataframe(leads)
+        
         qualified_leads = []
         
         logger.info(f"Iniciando qualificação de {len(leads)} leads")
         
+        # Verifica todos os sites de uma vez; qualify_lead passa a ler do cache
+        self.website_checker.check_many(
+            lead['website'] for lead in leads
+            if re.match(r'^https?://', lead.get('website') or '')
+        )
+        
         for i, lead in enumerate(leads):
             try:
                 qualified_lead = self.qualify_lead(lead)
@@ -95,7 +105,7 @@ class LeadQualifier:
                 # Log de progresso
                 if (i + 1) % 10 == 0:
                     logger.info(f"Qualificados {i + 1}/{len(leads)} leads")
-                
+            
             except Exception as e:
                 logger.error(f"Erro ao qualificar lead {i + 1}: {e}")
                 qualified_leads.append(lead)  # Adiciona lead não qualificado
@@ -109,149 +119,163 @@ class LeadQualifier:
         
         return qualified_leads
     
-    def _has_valid_phone(self, lead: Dict) -> bool:
-        """Verifica se o lead tem telefone válido"""
-        phone = lead.get('telefone', '')
-        if not phone:
-            return False
+    def qualify_leads_parallel(self, leads: List[Dict], workers: int = None,
+                               chunk_size: int = None) -> Tuple[List[Dict], Dict]:
+        """
+        Qualifica muitos leads em vários processos; retorna os leads
+        qualificados, na ordem de entrada, e o relatório de
+        generate_qualification_report.
         
-        # Remove caracteres especiais e espaços
-        phone_clean = re.sub(r'[^\d]', '', phone)
+        Os sites são verificados antes, neste processo. Cada lote leva só os
+        campos usados pelos critérios e volta só com os campos de
+        qualificação e as estatísticas do lote, somadas aqui no relatório.
+        """
+        workers = workers or self.config.QUALIFY_PARALLEL_WORKERS or os.cpu_count() or 1
+        chunk_size = max(1, chunk_size or self.config.QUALIFY_CHUNK_SIZE)
         
-        # Telefone deve ter pelo menos 10 dígitos (DDD + número)
-        return len(phone_clean) >= 10
-    
-    def _has_valid_website(self, lead: Dict) -> bool:
-        """Verifica se o lead tem site válido"""
-        website = lead.get('website', '')
-        if not website:
-            return False
+        if workers <= 1 or len(leads) <= chunk_size:
+            qualified_leads = self.qualify_leads_batch(leads) if leads else []
+            return qualified_leads, self.generate_qualification_report(qualified_leads)
         
-        # Verifica formato básico de URL
-        if not re.match(r'^https?://', website):
-            return False
+        logger.info(f"Iniciando qualificação em paralelo de {len(leads)} leads "
+                    f"({workers} processos, lotes de {chunk_size})")
         
-        # Tenta fazer requisição para verificar se o site está ativo
-        try:
-            response = self.session.head(website, timeout=10)
-            return response.status_code == 200
-        except:
-            return False
-    
-    def _has_compatible_cnae(self, lead: Dict) -> bool:
-        """Verifica se o CNAE é compatível com alto consumo de energia"""
-        cnae = lead.get('cnae', '')
-        if not cnae:
-            return False
-        
-        # Remove caracteres especiais
-        cnae_clean = re.sub(r'[^\d]', '', cnae)
-        
-        # Verifica se está na lista de CNAEs de alto consumo
-        for cnae_alto in self.config.CNAES_ALTO_CONSUMO:
-            cnae_alto_clean = re.sub(r'[^\d]', '', cnae_alto)
-            if cnae_clean.startswith(cnae_alto_clean[:4]):  # Primeiros 4 dígitos
-                return True
-        
-        return False
-    
-    def _has_social_media(self, lead: Dict) -> bool:
-        """Verifica se o lead tem mídia social"""
-        # Verifica Instagram
-        if lead.get('instagram'):
-            return True
-        
-        # Verifica WhatsApp
-        whatsapp = lead.get('whatsapp', '')
-        if whatsapp and ('whatsapp' in whatsapp.lower() or 'wa.me' in whatsapp):
-            return True
-        
-        return False
-    
-    def _has_valid_address(self, lead: Dict) -> bool:
-        """Verifica se o lead tem endereço válido"""
-        address = lead.get('endereco', '')
-        if not address:
-            return False
+        websites = self.website_checker.check_many(
+            lead['website'] for lead in leads
+            if re.match(r'^https?://', lead.get('website') or '')
+        )
         
-        # Endereço deve ter pelo menos 20 caracteres e conter elementos básicos
-        if len(address) < 20:
-            return False
+        # Todos os processos usam as regras em vigor agora, mesmo que o arquivo mude no meio
+        rules = self.rules.current()
         
-        # Deve conter pelo menos uma vírgula (separador comum em endereços)
-        if ',' not in address:
-            return False
+        chunks = []
+        for start in range(0, len(leads), chunk_size):
+            batch = leads[start:start + chunk_size]
+            rows = [tuple(lead.get(field) for field in rules.fields) for lead in batch]
+            chunk_websites = {lead['website']: websites[lead['website']] for lead in batch
+                              if lead.get('website') in websites}
+            chunks.append((rows, chunk_websites))
         
-        return True
-    
-    def _has_valid_company_name(self, lead: Dict) -> bool:
-        """Verifica se o nome da empresa é válido"""
-        name = lead.get('nome', '')
-        if not name:
-            return False
-        
-        # Nome deve ter pelo menos 3 caracteres
-        if len(name) < 3:
-            return False
-        
-        # Não deve ser apenas números
-        if name.isdigit():
-            return False
-        
-        # Não deve conter palavras comuns que indicam dados inválidos
-        invalid_words = ['n/a', 'null', 'undefined', 'sem nome', 'sem título']
-        if any(word in name.lower() for word in invalid_words):
-            return False
-        
-        return True
+        qualified_leads = []
+        chunk_stats = []
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=_init_qualify_worker,
+                                 initargs=(rules.spec,)) as executor:
+            offset = 0
+            for results, stats, counters in executor.map(_qualify_chunk, chunks):
+                for lead, result in zip(leads[offset:offset + len(results)], results):
+                    qualified_leads.append(dict(lead, **dict(zip(QUALIFICATION_OUTPUTS, result))) if result else lead)
+                offset += len(results)
+                chunk_stats.append(stats)
+                rules.add_counters(*counters)
+        
+        report = self._build_qualification_report(self._merge_qualification_stats(chunk_stats))
+        logger.info(f"Qualificação em paralelo concluída: {report.get('resumo', '')}")
+        return qualified_leads, report
     
-    def _get_qualification_level(self, score: int) -> str:
-        """Retorna o nível de qualificação baseado no score"""
-        if score >= 5:
-            return "Alto"
-        elif score >= 3:
-            return "Médio"
-        elif score >= 1:
-            return "Baixo"
-        else:
-            return "Não qualificado"
+    def qualify_dataframe(self, data, check_websites: bool = True):
+        """
+        Qualifica um DataFrame do pandas (ou tabela Arrow) de leads em colunas,
+        com os mesmos scores de qualify_lead; retorna um DataFrame com as
+        colunas de qualificação acrescentadas
+        """
+        from columnar_scoring import qualify_frame
+        
+        logger.info(f"Iniciando qualificação em colunas de {len(data)} leads")
+        return qualify_frame(self, data, check_websites=check_websites)
     
-    def _generate_qualification_notes(self, score: int, criterios: List[str]) -> str:
-        """Gera observações sobre a qualificação"""
-        if score >= 5:
-            return f"Lead altamente qualificado! Critérios atingidos: {', '.join(criterios)}"
-        elif score >= 3:
-            return f"Lead qualificado. Critérios atingidos: {', '.join(criterios)}"
-        elif score >= 1:
-            return f"Lead com baixa qualificação. Critérios atingidos: {', '.join(criterios)}"
-        else:
-            return "Lead não qualificado. Nenhum critério atendido."
+    def enrich_leads_with_cnpj(self, leads: List[Dict]) -> List[Dict]:
+        """
+        Enriquece uma lista de leads com informações da Receita Federal
+        
+        Os CNPJs são consultados de uma vez: o serviço de CNPJ responde os que
+        estão no cache e enfileira os demais juntos, e cada lead usa a resposta
+        do lote em vez de consultar de novo.
+        """
+        for lead in leads:
+            self._ensure_cnpj(lead, use_matcher=False)
+        
+        # Leads sem CNPJ no texto são identificados pelo nome/CEP, todos de uma vez
+        unmatched = [lead for lead in leads if not lead.get('cnpj')]
+        if unmatched and self.cnpj_matcher is not None:
+            candidates = self.cnpj_matcher.match_batch(unmatched, min_score=self.config.CNPJ_MATCH_MIN_SCORE)
+            for lead, lead_candidates in zip(unmatched, candidates):
+                self._apply_cnpj_match(lead, lead_candidates)
+        
+        cnpjs = [lead['cnpj'] for lead in leads if lead.get('cnpj')]
+        prefetched = self.cnpj_lookup.lookup_batch(cnpjs) if cnpjs else {}
+        
+        # O índice de nomes já foi consultado acima para todo o lote
+        enriched = []
+        for i, lead in enumerate(leads):
+            enriched.append(self.enrich_lead_with_cnpj(lead, use_matcher=False, prefetched=prefetched))
+            
+            # Log de progresso
+            if (i + 1) % 10 == 0:
+                logger.info(f"Enriquecidos {i + 1}/{len(leads)} leads")
+        
+        return enriched
     
-    def enrich_lead_with_cnpj(self, lead: Dict) -> Dict:
+    def enrich_lead_with_cnpj(self, lead: Dict, use_matcher: bool = True,
+                              prefetched: Dict[str, Optional[Dict]] = None) -> Dict:
         """
         Enriquece o lead com informações da Receita Federal
+        
+        use_matcher=False não procura o CNPJ pelo nome/CEP (o lote já procurou);
+        prefetched traz as respostas já obtidas por lookup_batch.
         """
         try:
-            # Busca CNPJ se não existir
-            if not lead.get('cnpj'):
-                # Tenta extrair CNPJ do nome ou endereço (implementação básica)
-                cnpj = self._extract_cnpj_from_text(lead.get('nome', '') + ' ' + lead.get('endereco', ''))
-                if cnpj:
-                    lead['cnpj'] = cnpj
+            self._ensure_cnpj(lead, use_matcher=use_matcher)
             
             # Se tem CNPJ, busca informações da Receita
             if lead.get('cnpj'):
-                receita_info = self._get_receita_info(lead['cnpj'])
+                receita_info = self._get_receita_info(lead['cnpj'], prefetched)
                 if receita_info:
                     lead.update(receita_info)
                     logger.info(f"Lead '{lead.get('nome')}' enriquecido com dados da Receita")
             
             return lead
-            
+        
         except Exception as e:
             logger.error(f"Erro ao enriquecer lead: {e}")
             return lead
     
+    def _ensure_cnpj(self, lead: Dict, use_matcher: bool = True):
+        """Busca CNPJ se não existir"""
+        if not lead.get('cnpj'):
+            # Tenta extrair CNPJ do nome ou endereço (implementação básica)
+            cnpj = self._extract_cnpj_from_text(lead.get('nome', '') + ' ' + lead.get('endereco', ''))
+            if cnpj:
+                lead['cnpj'] = cnpj
+        
+        # Sem CNPJ no texto, procura a empresa pelo nome e CEP
+        if not lead.get('cnpj') and use_matcher and self.cnpj_matcher is not None:
+            candidates = self.cnpj_matcher.match(
+                lead.get('nome', ''), extract_cep(lead.get('endereco', '')),
+                min_score=self.config.CNPJ_MATCH_MIN_SCORE
+            )
+            self._apply_cnpj_match(lead, candidates)
+    
+    def _apply_cnpj_match(self, lead: Dict, candidates: List[Dict]):
+        """
+        Guarda os candidatos e usa o melhor como CNPJ do lead quando não há
+        dúvida: mesmo CEP do lead ou score CNPJ_MATCH_MIN_MARGIN acima do segundo
+        """
+        if not candidates:
+            return
+        
+        lead['cnpj_candidatos'] = [candidate['cnpj'] for candidate in candidates]
+        
+        best = candidates[0]
+        runner_up = candidates[1]['score'] if len(candidates) > 1 else 0.0
+        same_cep = bool(best.get('cep')) and best['cep'] == extract_cep(lead.get('endereco', ''))
+        if not same_cep and best['score'] - runner_up < self.config.CNPJ_MATCH_MIN_MARGIN:
+            logger.info(f"CNPJ de '{lead.get('nome')}' ambíguo entre {len(candidates)} candidatos")
+            return
+        
+        cnpj = best['cnpj']
+        lead['cnpj'] = f"{cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}"
+        lead['cnpj_match_score'] = best['score']
+    
     def _extract_cnpj_from_text(self, text: str) -> Optional[str]:
         """Extrai CNPJ de um texto"""
         # Padrão de CNPJ: XX.XXX.XXX/XXXX-XX
@@ -272,22 +296,19 @@ class LeadQualifier:
         
         return None
     
-    def _get_receita_info(self, cnpj: str) -> Optional[Dict]:
+    def _get_receita_info(self, cnpj: str, prefetched: Dict[str, Optional[Dict]] = None) -> Optional[Dict]:
         """
         Busca informações da Receita Federal
         """
         try:
-            # Remove caracteres especiais
-            cnpj_limpo = ''.join(filter(str.isdigit, cnpj))
-            
-            # API pública da Receita
-            url = f"https://receitaws.com.br/v1/cnpj/{cnpj_limpo}"
+            key = CNPJLookupService.normalize(cnpj)
+            if prefetched is not None and key in prefetched:
+                data = prefetched[key]
+            else:
+                # API pública da Receita (via cache e fila do serviço de CNPJ)
+                data = self.cnpj_lookup.lookup(cnpj)
             
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('status') == 'ERROR':
+            if not data:
                 return None
             
             return {
@@ -301,7 +322,7 @@ class LeadQualifier:
                 'capital_social': data.get('capital_social', ''),
                 'quadro_socios': data.get('qsa', [])
             }
-            
+        
         except Exception as e:
             logger.error(f"Erro ao buscar CNPJ {cnpj}: {e}")
             return None
@@ -311,51 +332,124 @@ class LeadQualifier:
         Gera relatório de qualificação dos leads
         """
         try:
-            total_leads = len(leads)
-            qualified_leads = sum(1 for lead in leads if lead.get('qualificado', False))
-            unqualified_leads = total_leads - qualified_leads
-            
-            # Distribuição por score
-            score_distribution = {}
-            for lead in leads:
-                score = lead.get('score', 0)
-                score_distribution[score] = score_distribution.get(score, 0) + 1
-            
-            # Distribuição por nível de qualificação
-            level_distribution = {}
-            for lead in leads:
-                level = lead.get('nivel_qualificacao', 'Não qualificado')
-                level_distribution[level] = level_distribution.get(level, 0) + 1
-            
-            # Critérios mais atingidos
-            criterios_count = {}
-            for lead in leads:
-                for criterio in lead.get('criterios_atingidos', []):
-                    criterios_count[criterio] = criterios_count.get(criterio, 0) + 1
-            
-            # Top critérios
-            top_criterios = sorted(criterios_count.items(), key=lambda x: x[1], reverse=True)[:5]
-            
-            report = {
-                'data_geracao': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
-                'total_leads': total_leads,
-                'leads_qualificados': qualified_leads,
-                'leads_nao_qualificados': unqualified_leads,
-                'taxa_qualificacao': (qualified_leads / total_leads * 100) if total_leads > 0 else 0,
-                'score_medio': sum(lead.get('score', 0) for lead in leads) / total_leads if total_leads > 0 else 0,
-                'score_distribuicao': score_distribution,
-                'nivel_distribuicao': level_distribution,
-                'top_criterios': top_criterios,
-                'resumo': f"De {total_leads} leads, {qualified_leads} foram qualificados ({qualified_leads/total_leads*100:.1f}%)"
-            }
+            report = self._build_qualification_report(self._qualification_stats(leads))
             
             logger.info(f"Relatório de qualificação gerado: {report['resumo']}")
             
             return report
-            
+        
         except Exception as e:
             logger.error(f"Erro ao gerar relatório: {e}")
             return {}
+    
+    @staticmethod
+    def _qualification_stats(leads: List[Dict]) -> Dict:
+        """Contagens do relatório de qualificação (somáveis entre lotes)"""
+        score_distribution = {}
+        level_distribution = {}
+        criterios_count = {}
+        
+        for lead in leads:
+            # Distribuição por score
+            score = lead.get('score', 0)
+            score_distribution[score] = score_distribution.get(score, 0) + 1
+            
+            # Distribuição por nível de qualificação
+            level = lead.get('nivel_qualificacao', 'Não qualificado')
+            level_distribution[level] = level_distribution.get(level, 0) + 1
+            
+            # Critérios mais atingidos
+            for criterio in lead.get('criterios_atingidos', []):
+                criterios_count[criterio] = criterios_count.get(criterio, 0) + 1
+        
+        return {
+            'total': len(leads),
+            'qualificados': sum(1 for lead in leads if lead.get('qualificado', False)),
+            'soma_score': sum(lead.get('score', 0) for lead in leads),
+            'score_distribuicao': score_distribution,
+            'nivel_distribuicao': level_distribution,
+            'criterios': criterios_count,
+        }
+    
+    @staticmethod
+    def _merge_qualification_stats(stats_list: List[Dict]) -> Dict:
+        """Soma as contagens de vários lotes, na ordem dos lotes"""
+        merged = {'total': 0, 'qualificados': 0, 'soma_score': 0,
+                  'score_distribuicao': {}, 'nivel_distribuicao': {}, 'criterios': {}}
+        
+        for stats in stats_list:
+            for key in ('total', 'qualificados', 'soma_score'):
+                merged[key] += stats[key]
+            for key in ('score_distribuicao', 'nivel_distribuicao', 'criterios'):
+                for value, count in stats[key].items():
+                    merged[key][value] = merged[key].get(value, 0) + count
+        
+        return merged
+    
+    @staticmethod
+    def _build_qualification_report(stats: Dict) -> Dict:
+        total_leads = stats['total']
+        qualified_leads = stats['qualificados']
+        unqualified_leads = total_leads - qualified_leads
+        
+        # Top critérios
+        top_criterios = sorted(stats['criterios'].items(), key=lambda x: x[1], reverse=True)[:5]
+        
+        return {
+            'data_geracao': datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+            'total_leads': total_leads,
+            'leads_qualificados': qualified_leads,
+            'leads_nao_qualificados': unqualified_leads,
+            'taxa_qualificacao': (qualified_leads / total_leads * 100) if total_leads > 0 else 0,
+            'score_medio': stats['soma_score'] / total_leads if total_leads > 0 else 0,
+            'score_distribuicao': stats['score_distribuicao'],
+            'nivel_distribuicao': stats['nivel_distribuicao'],
+            'top_criterios': top_criterios,
+            'resumo': f"De {total_leads} leads, {qualified_leads} foram qualificados ({qualified_leads/total_leads*100:.1f}%)"
+        }
+
+class _ResolvedWebsites:
+    """Sites já verificados pelo processo principal (usado nos processos de qualificação)"""
+    
+    def __init__(self, status: Dict[str, bool]):
+        self.status = status
+    
+    def is_alive(self, url: str) -> bool:
+        return self.status.get(url, False)
+    
+    def check_many(self, urls) -> Dict[str, bool]:
+        return {url: self.status.get(url, False) for url in urls}
+
+_worker_qualifier: Optional[LeadQualifier] = None
+_worker_rules: Optional[Dict] = None
+
+def _init_qualify_worker(rules: Dict):
+    """Cria o qualificador de cada processo uma única vez, com as regras do processo principal"""
+    global _worker_qualifier, _worker_rules
+    _worker_qualifier = LeadQualifier(enrich_cnpj=False)
+    _worker_rules = rules
+
+def _qualify_chunk(chunk: Tuple[List[tuple], Dict[str, bool]]) -> Tuple[List[Optional[tuple]], Dict, tuple]:
+    """
+    Qualifica um lote no processo de trabalho; None marca lead que falhou na
+    qualificação. Devolve também os contadores das regras no lote.
+    """
+    rows, websites = chunk
+    _worker_qualifier.website_checker = _ResolvedWebsites(websites)
+    # Regras novas a cada lote para os contadores serem só deste lote
+    _worker_qualifier.rules = QualificationRules(spec=_worker_rules)
+    fields = _worker_qualifier.rules.current().fields
+    
+    results = []
+    qualified = []
+    for row in rows:
+        lead = {field: value for field, value in zip(fields, row) if value is not None}
+        qualified_lead = _worker_qualifier.qualify_lead(lead)
+        qualified.append(qualified_lead)
+        results.append(tuple(qualified_lead[field] for field in QUALIFICATION_OUTPUTS)
+                       if 'score' in qualified_lead else None)
+    
+    return results, LeadQualifier._qualification_stats(qualified), _worker_qualifier.rules.current().counters()
 
 if __name__ == "__main__":
     # Exemplo de uso
@@ -0,0 +1,220 @@
+"""
+Gravação incremental de leads (JSONL, JSON e CSV) à medida que são produzidos
+"""
+import csv
+import io
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class LeadWriter:
+    """
+    Base dos gravadores de leads em fluxo.
+    
+    Cada lead é serializado e acrescentado ao arquivo (escrita com buffer);
+    a cada `fsync_every` leads ou `fsync_interval` segundos o buffer é
+    descarregado e sincronizado com o disco. Com `max_bytes` > 0, ao passar
+    do tamanho o arquivo é fechado e a gravação segue em `<nome>_001<ext>`,
+    `<nome>_002<ext>`...
+    
+    Arquivos existentes são substituídos; com `append=True` (fluxo retomado
+    de uma campanha) a gravação continua no fim deles.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = 0, fsync_every: int = 100,
+                 fsync_interval: float = 5.0, buffer_size: int = 64 * 1024, append: bool = False):
+        self.path = Path(path)
+        self.append = append
+        self.max_bytes = max_bytes
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.buffer_size = buffer_size
+        self.files: List[str] = []
+        self.count = 0
+        self._part = 0
+        self._file = None
+        self._size = 0
+        self._items = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _part_path(self) -> Path:
+        if self._part == 0:
+            return self.path
+        return self.path.with_name(f"{self.path.stem}_{self._part:03d}{self.path.suffix}")
+    
+    def _open(self):
+        path = self._part_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._size = path.stat().st_size if self.append and path.exists() else 0
+        self._items = 0
+        self._file = open(path, 'a' if self.append else 'w', encoding=self._encoding(),
+                          newline='', buffering=self.buffer_size)
+        self.files.append(str(path))
+        if self._size == 0:
+            self._write_raw(self._header())
+    
+    def _encoding(self) -> str:
+        return 'utf-8'
+    
+    def _header(self) -> str:
+        return ''
+    
+    def _footer(self) -> str:
+        return ''
+    
+    def _serialize(self, lead: Dict, first: bool) -> str:
+        """Texto do lead; `first` indica o primeiro lead do arquivo atual"""
+        raise NotImplementedError
+    
+    def _write_raw(self, text: str):
+        if text:
+            self._file.write(text)
+            self._size += len(text.encode('utf-8'))
+    
+    def write(self, lead: Dict):
+        """Acrescenta um lead ao arquivo"""
+        if self._file is None:
+            self._open()
+        elif self.max_bytes and self._size >= self.max_bytes:
+            self._rotate()
+        
+        self._write_raw(self._serialize(lead, first=self._items == 0))
+        self._items += 1
+        self.count += 1
+        self._unsynced += 1
+        
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+    
+    def write_all(self, leads: Iterable[Dict]) -> int:
+        """Grava todos os leads de qualquer iterável; retorna quantos foram gravados"""
+        written = 0
+        for lead in leads:
+            self.write(lead)
+            written += 1
+        return written
+    
+    def sync(self):
+        """Descarrega o buffer e força a gravação em disco"""
+        if self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def _finish_file(self):
+        self._write_raw(self._footer())
+        self.sync()
+        self._file.close()
+        self._file = None
+    
+    def _rotate(self):
+        self._finish_file()
+        logger.info(f"Arquivo de leads {self.files[-1]} atingiu {self._size} bytes; rotacionando")
+        self._part += 1
+        self._open()
+    
+    def close(self):
+        """Finaliza o arquivo atual (cria um arquivo vazio válido se nada foi gravado)"""
+        if self._file is None and not self.files:
+            self._open()
+        if self._file is not None:
+            self._finish_file()
+
+class JSONLLeadWriter(LeadWriter):
+    """Um lead por linha em JSON (JSON Lines)"""
+    
+    def _serialize(self, lead: Dict, first: bool) -> str:
+        return json.dumps(lead, ensure_ascii=False, default=str) + '\n'
+
+class JSONLeadWriter(LeadWriter):
+    """
+    Lista JSON gravada item a item, no mesmo formato de json.dump(indent=2).
+    
+    O arquivo só fica completo (com o "]") ao fechar ou rotacionar.
+    """
+    
+    def __init__(self, path: str, **kwargs):
+        # Uma lista JSON não pode ser continuada depois de fechada
+        super().__init__(path, **dict(kwargs, append=False))
+    
+    def _header(self) -> str:
+        return '['
+    
+    def _footer(self) -> str:
+        return '\n]' if self._items else ']'
+    
+    def _serialize(self, lead: Dict, first: bool) -> str:
+        item = json.dumps(lead, ensure_ascii=False, indent=2, default=str).replace('\n', '\n  ')
+        return ('\n  ' if first else ',\n  ') + item
+
+class CSVLeadWriter(LeadWriter):
+    """
+    CSV com cabeçalho (utf-8 com BOM, para abrir direto no Excel).
+    
+    As colunas vêm de `fieldnames` ou, se não informadas, do primeiro lead;
+    campos que aparecerem só depois são descartados (com aviso).
+    """
+    
+    def __init__(self, path: str, fieldnames: Optional[List[str]] = None, **kwargs):
+        super().__init__(path, **kwargs)
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self._ignored = set()
+    
+    def _encoding(self) -> str:
+        # O BOM só vai no início do arquivo, nunca ao continuar um existente
+        return 'utf-8-sig' if self._size == 0 else 'utf-8'
+    
+    def _header(self) -> str:
+        return self._row(self.fieldnames)
+    
+    @staticmethod
+    def _row(values: List) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(values)
+        return buffer.getvalue()
+    
+    def write(self, lead: Dict):
+        if self.fieldnames is None:
+            self.fieldnames = list(lead.keys())
+        
+        extra = set(lead) - set(self.fieldnames) - self._ignored
+        if extra:
+            logger.warning(f"Campos fora do cabeçalho do CSV ignorados: {', '.join(sorted(extra))}")
+            self._ignored |= extra
+        
+        super().write(lead)
+    
+    def _serialize(self, lead: Dict, first: bool) -> str:
+        return self._row([lead.get(field) for field in self.fieldnames])
+    
+    def close(self):
+        if self.fieldnames is None:
+            self.fieldnames = []
+        super().close()
+
+WRITERS = {
+    '.jsonl': JSONLLeadWriter,
+    '.json': JSONLeadWriter,
+    '.csv': CSVLeadWriter,
+}
+
+def open_lead_writer(path: str, **kwargs) -> LeadWriter:
+    """Gravador adequado à extensão do arquivo (.jsonl, .json ou .csv)"""
+    suffix = Path(path).suffix.lower()
+    if suffix not in WRITERS:
+        raise ValueError(f"Formato de arquivo de leads não suportado: {suffix}")
+    return WRITERS[suffix](path, **kwargs)
@@ -9,6 +9,7 @@ from datetime import datetime
 import argparse
 import json
 
+from campaign_journal import CampaignJournal
 from lead_collector import LeadCollector
 from lead_qualifier import LeadQualifier
 from sheets_manager import GoogleSheetsManager
@@ -41,6 +42,7 @@ class ProspeccaoAutomatica:
             'leads_coletados': 0,
             'leads_qualificados': 0,
             'leads_armazenados': 0,
+            'campaign_id': None,
             'erros': [],
             'tempo_total': 0
         }
@@ -49,19 +51,34 @@ class ProspeccaoAutomatica:
                                   keywords: List[str] = None,
                                   cities: List[str] = None,
                                   max_leads_por_busca: int = 20,
-                                  usar_google_sheets: bool = True) -> Dict:
+                                  usar_google_sheets: bool = True,
+                                  campaign_id: str = None, resume: bool = False) -> Dict:
         """
         Executa campanha completa de prospecção
+        
+        A coleta é registrada no diário da campanha (campaign_id); se a
+        execução cair, retomar_campanha continua de onde parou. Sem resume,
+        um campaign_id que já tem diário é recusado.
         """
         start_time = time.time()
         self.stats['inicio_execucao'] = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
         
+        journal = CampaignJournal(campaign_id)
+        journal.start({
+            'keywords': keywords,
+            'cities': cities,
+            'max_leads_por_busca': max_leads_por_busca,
+            'usar_google_sheets': usar_google_sheets
+        }, resume=resume)
+        self.stats['campaign_id'] = journal.campaign_id
+        
         logger.info("Iniciando campanha completa de prospecção automática")
+        logger.info(f"Campanha {journal.campaign_id} (para retomar: --resume {journal.campaign_id})")
         
         try:
             # Etapa 1: Coleta de leads
             logger.info("Etapa 1: Coletando leads...")
-            leads_coletados = self._coletar_leads(keywords, cities, max_leads_por_busca)
+            leads_coletados = self._coletar_leads(keywords, cities, max_leads_por_busca, journal)
             
             if not leads_coletados:
                 logger.warning("Nenhum lead foi coletado")
@@ -83,6 +100,7 @@ class ProspeccaoAutomatica:
             relatorio = self._gerar_relatorio_final(leads_qualificados)
             
             # Finaliza execução
+            journal.mark_status('concluida')
             return self._finalizar_execucao(start_time, relatorio)
             
         except Exception as e:
@@ -91,7 +109,27 @@ class ProspeccaoAutomatica:
             self.stats['erros'].append(error_msg)
             return self._finalizar_execucao(start_time)
     
-    def _coletar_leads(self, keywords: List[str], cities: List[str], max_leads: int) -> List[Dict]:
+    def retomar_campanha(self, campaign_id: str) -> Dict:
+        """
+        Retoma uma campanha interrompida a partir do seu diário, pulando as
+        células já concluídas
+        """
+        journal = CampaignJournal.resume(campaign_id)
+        params = journal.params
+        
+        logger.info(f"Retomando campanha {campaign_id} ({len(journal.completed_cells())} células já concluídas)")
+        
+        return self.executar_campanha_completa(
+            keywords=params.get('keywords'),
+            cities=params.get('cities'),
+            max_leads_por_busca=params.get('max_leads_por_busca', 20),
+            usar_google_sheets=params.get('usar_google_sheets', True),
+            campaign_id=campaign_id,
+            resume=True
+        )
+    
+    def _coletar_leads(self, keywords: List[str], cities: List[str], max_leads: int,
+                       journal: CampaignJournal = None) -> List[Dict]:
         """
         Coleta leads usando múltiplas fontes
         """
@@ -105,11 +143,19 @@ class ProspeccaoAutomatica:
             
             logger.info(f"Coletando leads para {len(keywords)} keywords em {len(cities)} cidades")
             
-            # Executa campanha de coleta
-            leads = self.collector.run_collection_campaign(
-                keywords=keywords,
-                cities=cities
-            )
+            # Executa campanha de coleta, gravando os leads à medida que chegam
+            self.collector.warm_up_sources()
+            sink = self.collector.open_leads_stream(journal.directory / 'leads.jsonl') if journal else None
+            try:
+                leads = self.collector.run_collection_campaign(
+                    keywords=keywords,
+                    cities=cities,
+                    journal=journal,
+                    sink=sink
+                )
+            finally:
+                if sink:
+                    sink.close()
             
             self.stats['leads_coletados'] = len(leads)
             logger.info(f"Coleta concluída: {len(leads)} leads coletados")
@@ -129,26 +175,16 @@ class ProspeccaoAutomatica:
         try:
             logger.info(f"Qualificando {len(leads)} leads...")
             
+            # Enriquece com dados da Receita antes da pontuação, para o CNAE contar
+            logger.info("Enriquecendo leads com dados da Receita...")
+            try:
+                leads = self.qualifier.enrich_leads_with_cnpj(leads)
+            except Exception as e:
+                logger.warning(f"Erro ao enriquecer leads: {e}")
+            
             # Qualifica leads em lote
             leads_qualificados = self.qualifier.qualify_leads_batch(leads)
             
-            # Enriquece com dados da Receita (opcional)
-            logger.info("Enriquecendo leads com dados da Receita...")
-            for i, lead in enumerate(leads_qualificados):
-                try:
-                    lead_enriquecido = self.qualifier.enrich_lead_with_cnpj(lead)
-                    leads_qualificados[i] = lead_enriquecido
-                    
-                    # Log de progresso
-                    if (i + 1) % 10 == 0:
-                        logger.info(f"Enriquecidos {i + 1}/{len(leads_qualificados)} leads")
-                        
-                except Exception as e:
-                    logger.warning(f"Erro ao enriquecer lead {i + 1}: {e}")
-                
-                # Delay para evitar sobrecarga da API da Receita
-                time.sleep(0.5)
-            
             self.stats['leads_qualificados'] = len(leads_qualificados)
             logger.info(f"Qualificação concluída: {len(leads_qualificados)} leads processados")
             
@@ -327,14 +363,28 @@ def main():
     parser.add_argument('--cidades', nargs='+', help='Cidades para busca')
     parser.add_argument('--max-leads', type=int, default=20, help='Máximo de leads por busca')
     parser.add_argument('--sem-sheets', action='store_true', help='Não usar Google Sheets')
+    parser.add_argument('--resume', metavar='CAMPAIGN_ID', help='Retoma uma campanha interrompida')
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--gravar-cassete', metavar='ARQUIVO',
+                          help='Grava todas as respostas externas no cassete')
+    cassette.add_argument('--reproduzir-cassete', metavar='ARQUIVO',
+                          help='Reproduz as respostas do cassete, sem rede')
     
     args = parser.parse_args()
     
+    # O cassete precisa estar configurado antes de criar os clientes compartilhados
+    if args.gravar_cassete or args.reproduzir_cassete:
+        Config.CASSETTE_MODE = 'record' if args.gravar_cassete else 'replay'
+        Config.CASSETTE_FILE = args.gravar_cassete or args.reproduzir_cassete
+    
     # Inicializa sistema
     sistema = ProspeccaoAutomatica()
     
     try:
-        if args.teste:
+        if args.resume:
+            # Retoma campanha interrompida
+            resultado = sistema.retomar_campanha(args.resume)
+        elif args.teste:
             # Executa teste rápido
             resultado = sistema.executar_teste_rapido()
         else:
@@ -350,6 +400,7 @@ def main():
         print("\n" + "="*60)
         print("RESULTADO DA CAMPANHA DE PROSPECÇÃO")
         print("="*60)
+        print(f"Campanha: {resultado['estatisticas']['campaign_id']}")
         print(f"Tempo total: {resultado['estatisticas']['tempo_total']} segundos")
         print(f"Leads coletados: {resultado['estatisticas']['leads_coletados']}")
         print(f"Leads qualificados: {resultado['estatisticas']['leads_qualificados']}")
@@ -0,0 +1,348 @@
+"""
+Regras de qualificação declarativas: critérios, pesos, níveis e observações
+vêm de um arquivo JSON (ou YAML), compilados em funções na carga e
+recarregados quando o arquivo muda
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from cnae_index import LEVELS as CNAE_LEVELS
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_NON_DIGITS = re.compile(r'\D')
+
+class RuleError(ValueError):
+    """Arquivo de regras inválido"""
+
+def _text(value) -> str:
+    if value is None:
+        return ''
+    return value if isinstance(value, str) else str(value)
+
+# Cada tipo de condição recebe a definição e devolve fn(valor, ctx) -> bool;
+# ctx é o LeadQualifier (website_checker e cnae_index)
+
+def _filled(spec: Dict) -> Callable:
+    return lambda value, ctx: bool(value)
+
+def _min_digits(spec: Dict) -> Callable:
+    minimum = int(spec['valor'])
+    return lambda value, ctx: len(_NON_DIGITS.sub('', _text(value))) >= minimum
+
+def _min_length(spec: Dict) -> Callable:
+    minimum = int(spec['valor'])
+    return lambda value, ctx: len(_text(value)) >= minimum
+
+def _contains(spec: Dict) -> Callable:
+    needle = str(spec['valor'])
+    if spec.get('ignorar_caixa'):
+        needle = needle.lower()
+        return lambda value, ctx: needle in _text(value).lower()
+    return lambda value, ctx: needle in _text(value)
+
+def _not_contains(spec: Dict) -> Callable:
+    words = [str(word) for word in spec['valores']]
+    if spec.get('ignorar_caixa'):
+        words = [word.lower() for word in words]
+        return lambda value, ctx: not any(word in _text(value).lower() for word in words)
+    return lambda value, ctx: not any(word in _text(value) for word in words)
+
+def _not_numeric(spec: Dict) -> Callable:
+    return lambda value, ctx: not _text(value).isdigit()
+
+def _regex(spec: Dict) -> Callable:
+    try:
+        pattern = re.compile(spec['padrao'])
+    except re.error as e:
+        raise RuleError(f"Expressão regular inválida '{spec['padrao']}': {e}")
+    return lambda value, ctx: pattern.search(_text(value)) is not None
+
+def _website_alive(spec: Dict) -> Callable:
+    return lambda value, ctx: bool(value) and ctx.website_checker.is_alive(_text(value))
+
+def _high_consumption_cnae(spec: Dict) -> Callable:
+    level = spec.get('nivel')
+    if level is not None and level not in CNAE_LEVELS:
+        raise RuleError(f"Nível de CNAE inválido: {level}")
+    return lambda value, ctx: bool(value) and ctx.cnae_index.matches(_text(value), level)
+
+CONDITIONS = {
+    'preenchido': _filled,
+    'min_digitos': _min_digits,
+    'min_caracteres': _min_length,
+    'contem': _contains,
+    'nao_contem': _not_contains,
+    'nao_numerico': _not_numeric,
+    'regex': _regex,
+    'site_ativo': _website_alive,
+    'cnae_alto_consumo': _high_consumption_cnae,
+}
+
+class Rule:
+    """Critério compilado: condições combinadas em uma única função de verificação"""
+    
+    def __init__(self, spec: Dict):
+        if not spec.get('nome'):
+            raise RuleError(f"Critério sem nome: {spec}")
+        
+        self.name = spec['nome']
+        self.weight = spec.get('peso', 1)
+        if not isinstance(self.weight, (int, float)):
+            raise RuleError(f"Peso inválido no critério '{self.name}': {self.weight}")
+        
+        modes = [mode for mode in ('todas', 'qualquer') if mode in spec]
+        if len(modes) != 1 or not spec[modes[0]]:
+            raise RuleError(f"Critério '{self.name}' precisa de uma lista 'todas' ou 'qualquer'")
+        self.mode = modes[0]
+        
+        conditions = []
+        for condition in spec[self.mode]:
+            kind = condition.get('tipo')
+            if kind not in CONDITIONS:
+                raise RuleError(f"Tipo de condição desconhecido no critério '{self.name}': {kind}")
+            if not condition.get('campo'):
+                raise RuleError(f"Condição '{kind}' sem campo no critério '{self.name}'")
+            try:
+                conditions.append((condition['campo'], CONDITIONS[kind](condition)))
+            except (KeyError, TypeError, ValueError) as e:
+                raise RuleError(f"Condição '{kind}' inválida no critério '{self.name}': {e}")
+        
+        self.spec = spec
+        self.check = self._compile(self.mode, tuple(conditions))
+    
+    @staticmethod
+    def _compile(mode: str, conditions: tuple) -> Callable[[Dict, object], bool]:
+        """Condições avaliadas na ordem do arquivo, parando na primeira que decide"""
+        if mode == 'todas':
+            def check(lead, ctx):
+                for field, condition in conditions:
+                    if not condition(lead.get(field), ctx):
+                        return False
+                return True
+        else:
+            def check(lead, ctx):
+                for field, condition in conditions:
+                    if condition(lead.get(field), ctx):
+                        return True
+                return False
+        return check
+
+class RuleEngine:
+    """
+    Conjunto de regras compilado a partir da definição (dict do arquivo).
+    
+    `evaluate` passa pelos critérios uma vez por lead e devolve o score e os
+    critérios atingidos; cada critério conta avaliações, acertos e tempo.
+    """
+    
+    def __init__(self, spec: Dict):
+        if not isinstance(spec, dict):
+            raise RuleError("O arquivo de regras deve conter um objeto")
+        if not spec.get('criterios'):
+            raise RuleError("Nenhum critério definido")
+        if not spec.get('niveis'):
+            raise RuleError("Nenhum nível definido")
+        
+        self.spec = spec
+        self.rules = [Rule(rule) for rule in spec['criterios']]
+        # Campos do lead lidos pelas regras, na ordem em que aparecem
+        self.fields = tuple(dict.fromkeys(
+            condition['campo'] for rule in self.rules for condition in rule.spec[rule.mode]
+        ))
+        self.qualified_score = spec.get('score_qualificado', 3)
+        
+        self.levels = []
+        for level in spec['niveis']:
+            if not level.get('nome') or not isinstance(level.get('score_minimo'), (int, float)):
+                raise RuleError(f"Nível inválido: {level}")
+            template = level.get('observacao', '')
+            try:
+                template.format(criterios='', score=0)
+            except (KeyError, IndexError, ValueError) as e:
+                raise RuleError(f"Observação inválida no nível '{level['nome']}': {e}")
+            self.levels.append((level['score_minimo'], level['nome'], template))
+        self.levels.sort(key=lambda level: level[0], reverse=True)
+        
+        self._lock = threading.Lock()
+        self.evaluations = 0
+        self._hits = [0] * len(self.rules)
+        self._time_ns = [0] * len(self.rules)
+    
+    def evaluate(self, lead: Dict, ctx) -> Tuple[int, List[str]]:
+        """Score e critérios atingidos pelo lead"""
+        score = 0
+        criterios = []
+        results = []
+        clock = time.perf_counter_ns
+        
+        for rule in self.rules:
+            start = clock()
+            passed = rule.check(lead, ctx)
+            results.append((passed, clock() - start))
+            if passed:
+                score += rule.weight
+                criterios.append(rule.name)
+        
+        with self._lock:
+            self.evaluations += 1
+            for i, (passed, elapsed) in enumerate(results):
+                self._hits[i] += passed
+                self._time_ns[i] += elapsed
+        
+        return score, criterios
+    
+    def counters(self) -> Tuple[int, List[int], List[int]]:
+        """Avaliações, acertos e tempo (ns) por critério, para somar entre processos"""
+        with self._lock:
+            return self.evaluations, list(self._hits), list(self._time_ns)
+    
+    def add_counters(self, evaluations: int, hits: List[int], time_ns: List[int]):
+        """Soma contadores de avaliações feitas fora deste objeto (outros processos, modo em colunas)"""
+        with self._lock:
+            self.evaluations += evaluations
+            for i in range(len(self.rules)):
+                self._hits[i] += hits[i]
+                self._time_ns[i] += time_ns[i]
+    
+    def is_qualified(self, score) -> bool:
+        return score >= self.qualified_score
+    
+    def _level(self, score) -> tuple:
+        for level in self.levels:
+            if score >= level[0]:
+                return level
+        # Abaixo de todos os mínimos fica no nível mais baixo
+        return self.levels[-1]
+    
+    def level_for(self, score) -> str:
+        return self._level(score)[1]
+    
+    def notes_for(self, score, criterios: List[str]) -> str:
+        return self._level(score)[2].format(criterios=', '.join(criterios), score=score)
+    
+    def get_stats(self) -> Dict:
+        evaluations, hits, times = self.counters()
+        
+        return {
+            'avaliacoes': evaluations,
+            'criterios': [
+                {
+                    'nome': rule.name,
+                    'peso': rule.weight,
+                    'acertos': hits[i],
+                    'taxa_acerto': round(hits[i] / evaluations * 100, 1) if evaluations else 0,
+                    'tempo_total_ms': round(times[i] / 1e6, 2),
+                    'tempo_medio_us': round(times[i] / evaluations / 1e3, 2) if evaluations else 0,
+                }
+                for i, rule in enumerate(self.rules)
+            ],
+        }
+
+def load_rules_file(path: str) -> Dict:
+    """Lê o arquivo de regras (JSON, ou YAML se a extensão for .yaml/.yml)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise RuleError("Regras em YAML exigem o pacote pyyaml (pip install pyyaml)")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+class QualificationRules:
+    """
+    Regras em uso, recarregadas do arquivo quando ele muda (verificado no
+    máximo a cada `reload_interval` segundos). Um arquivo inválido é
+    registrado no log e as regras anteriores continuam valendo.
+    """
+    
+    def __init__(self, path: str = None, spec: Dict = None, reload_interval: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._signature = None
+        self._next_check = 0.0
+        self.reloads = 0
+        self.last_error: Optional[str] = None
+        
+        if spec is not None:
+            self._engine = RuleEngine(spec)
+            self.path = None
+        else:
+            self._signature = self._file_signature()
+            self._engine = RuleEngine(load_rules_file(path))
+            self._next_check = clock() + reload_interval
+            logger.info(f"Regras de qualificação carregadas de {path} ({len(self._engine.rules)} critérios)")
+        self.loaded_at = datetime.now()
+    
+    def _file_signature(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def current(self) -> RuleEngine:
+        """Regras em uso, recarregando o arquivo se ele mudou"""
+        if self.path and self._clock() >= self._next_check:
+            self.reload()
+        return self._engine
+    
+    def reload(self, force: bool = False) -> bool:
+        """Recarrega o arquivo se mudou (ou sempre, com force); retorna se trocou as regras"""
+        with self._lock:
+            self._next_check = self._clock() + self.reload_interval
+            signature = self._file_signature()
+            if not force and (signature is None or signature == self._signature):
+                return False
+            
+            try:
+                engine = RuleEngine(load_rules_file(self.path))
+            except (OSError, ValueError) as e:
+                # RuleError e erros de JSON são ValueError
+                self._signature = signature
+                self.last_error = str(e)
+                logger.error(f"Regras de qualificação inválidas em {self.path}; mantendo as anteriores: {e}")
+                return False
+            
+            self._engine = engine
+            self._signature = signature
+            self.last_error = None
+            self.reloads += 1
+            self.loaded_at = datetime.now()
+            logger.info(f"Regras de qualificação recarregadas de {self.path} ({len(engine.rules)} critérios)")
+            return True
+    
+    def get_stats(self) -> Dict:
+        stats = self.current().get_stats()
+        stats.update({
+            'arquivo': self.path,
+            'carregado_em': self.loaded_at.isoformat(),
+            'recargas': self.reloads,
+            'erro': self.last_error,
+        })
+        return stats
+
+_qualification_rules: Optional[QualificationRules] = None
+_rules_lock = threading.Lock()
+
+def get_qualification_rules() -> QualificationRules:
+    """Regras de qualificação compartilhadas pelo processo (QUALIFICATION_RULES_FILE)"""
+    global _qualification_rules
+    with _rules_lock:
+        if _qualification_rules is None or _qualification_rules.path != Config.QUALIFICATION_RULES_FILE:
+            _qualification_rules = QualificationRules(
+                Config.QUALIFICATION_RULES_FILE,
+                reload_interval=Config.QUALIFICATION_RULES_RELOAD_INTERVAL
+            )
+        return _qualification_rules
@@ -0,0 +1,110 @@
+"""
+Limitador de taxa compartilhado (token bucket por host de origem)
+"""
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Token bucket com taxa (tokens/segundo) e capacidade de rajada"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate deve ser maior que zero")
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    def reserve(self, tokens: float = 1) -> float:
+        """
+        Reserva tokens e retorna quantos segundos o chamador deve esperar.
+        
+        O saldo pode ficar negativo: cada chamada reserva a sua vez na fila,
+        então chamadas concorrentes saem espaçadas exatamente pela taxa.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self, tokens: float = 1) -> float:
+        """Bloqueia apenas o necessário para respeitar a taxa; retorna o tempo esperado"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class RateLimiter:
+    """Conjunto de token buckets indexados por host"""
+    
+    def __init__(self, limits: Dict[str, Tuple[float, int]] = None):
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        for host, (rate, burst) in (limits or {}).items():
+            self.configure(host, rate, burst)
+    
+    def configure(self, host: str, rate: float, burst: int = 1):
+        """Cria ou substitui o bucket de um host"""
+        with self._lock:
+            self._buckets[host.lower()] = TokenBucket(rate, burst)
+    
+    def bucket_for(self, host_or_url: str) -> Optional[TokenBucket]:
+        """
+        Retorna o bucket de um host ou URL.
+        
+        Subdomínios usam o bucket do domínio configurado
+        (www.instagram.com -> instagram.com).
+        """
+        host = host_or_url.lower()
+        if '://' in host:
+            host = urlparse(host).hostname or ''
+        
+        while host:
+            bucket = self._buckets.get(host)
+            if bucket:
+                return bucket
+            if '.' not in host:
+                break
+            host = host.split('.', 1)[1]
+        
+        return None
+    
+    def acquire(self, host_or_url: str, tokens: float = 1) -> float:
+        """Aguarda o orçamento do host; hosts sem limite passam direto"""
+        bucket = self.bucket_for(host_or_url)
+        if not bucket:
+            return 0.0
+        
+        waited = bucket.acquire(tokens)
+        if waited > 1:
+            logger.debug(f"Limite de taxa para {host_or_url}: aguardou {waited:.2f}s")
+        return waited
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Retorna o limitador compartilhado pelo coletor e pelo qualificador.
+    
+    Reproduzindo um cassete não há chamadas reais, então não há limites.
+    """
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter({} if Config.CASSETTE_MODE == 'replay' else Config.RATE_LIMITS)
+        return _shared_limiter
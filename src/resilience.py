@@ -0,0 +1,180 @@
+"""
+Resiliência das fontes de coleta: novas tentativas com backoff exponencial
+(com jitter) e circuit breaker por fonte
+"""
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Status do Google Places que indicam problema passageiro do serviço (e não da busca)
+RETRYABLE_PLACES_STATUSES = {'OVER_QUERY_LIMIT', 'UNKNOWN_ERROR'}
+RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+
+class TransientError(Exception):
+    """Falha passageira da fonte; `retry_after` sugere quando tentar de novo (segundos)"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(TransientError):
+    """A fonte está com o circuito aberto e a chamada nem foi feita"""
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, falhas de conexão, 429/5xx e TransientError valem nova tentativa"""
+    if isinstance(error, TransientError):
+        return not isinstance(error, CircuitOpenError)
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_HTTP_STATUSES
+    return isinstance(error, httpx.TransportError)
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Espera da tentativa `attempt` (0, 1, 2...): sorteada entre 0 e base·2^attempt, limitada a max_delay"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+class CircuitBreaker:
+    """
+    Circuit breaker de uma fonte.
+    
+    Após `failure_threshold` falhas seguidas o circuito abre e as chamadas
+    são recusadas por `reset_timeout` segundos. Depois disso uma única
+    chamada de teste é liberada (meio aberto): se der certo o circuito
+    fecha, se falhar abre de novo.
+    """
+    
+    CLOSED = 'fechado'
+    OPEN = 'aberto'
+    HALF_OPEN = 'meio_aberto'
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.rejected = 0
+    
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+    
+    def retry_after(self) -> float:
+        """Segundos até o circuito liberar a chamada de teste (0 se não estiver aberto)"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+    
+    def allow(self) -> bool:
+        """Indica se a chamada pode ser feita; quem recebe True deve registrar o resultado"""
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            
+            if self._state == self.CLOSED:
+                return True
+            
+            if self._state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            
+            self.rejected += 1
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuito '{self.name}' fechado: fonte respondeu normalmente")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Circuito '{self.name}' aberto após {self._failures} falhas; "
+                                   f"chamadas suspensas por {self.reset_timeout}s")
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+class RetryPolicy:
+    """Executa chamadas com novas tentativas (backoff com jitter) e, opcionalmente, um circuit breaker"""
+    
+    def __init__(self, max_attempts: int = 3, base_delay: float = 1.0, max_delay: float = 30.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+    
+    def call(self, fn: Callable, breaker: CircuitBreaker = None):
+        """
+        Executa fn() até dar certo ou acabarem as tentativas.
+        
+        Erros não passageiros sobem na hora. Esgotadas as tentativas, sobe
+        TransientError; com o circuito aberto, CircuitOpenError sem chamar fn.
+        """
+        for attempt in range(self.max_attempts):
+            if breaker and not breaker.allow():
+                raise CircuitOpenError(f"Circuito '{breaker.name}' aberto", retry_after=breaker.retry_after())
+            
+            try:
+                result = fn()
+            except Exception as e:
+                if not is_retryable(e):
+                    # A fonte respondeu; o erro é da requisição, não do serviço
+                    if breaker:
+                        breaker.record_success()
+                    raise
+                
+                if breaker:
+                    breaker.record_failure()
+                
+                if attempt == self.max_attempts - 1:
+                    if isinstance(e, TransientError):
+                        raise
+                    raise TransientError(str(e)) from e
+                
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+                logger.warning(f"Falha passageira ({e}); nova tentativa em {delay:.1f}s")
+                self._sleep(delay)
+                continue
+            
+            if breaker:
+                breaker.record_success()
+            return result
+
+def get_retry_policy() -> RetryPolicy:
+    """Política de novas tentativas com os valores da configuração"""
+    return RetryPolicy(Config.RETRY_MAX_ATTEMPTS, Config.RETRY_BASE_DELAY, Config.RETRY_MAX_DELAY)
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(source: str) -> CircuitBreaker:
+    """Circuit breaker compartilhado de uma fonte (google_places, instagram...)"""
+    with _breakers_lock:
+        if source not in _breakers:
+            _breakers[source] = CircuitBreaker(source, Config.CIRCUIT_FAILURE_THRESHOLD,
+                                               Config.CIRCUIT_RESET_TIMEOUT)
+        return _breakers[source]
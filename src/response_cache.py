@@ -0,0 +1,192 @@
+"""
+Cache persistente (SQLite) de respostas das APIs de origem
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Cache em disco de respostas JSON indexado pelos parâmetros normalizados.
+    
+    Cada endpoint tem o seu TTL; respostas negativas (ZERO_RESULTS, por padrão)
+    são guardadas com um TTL próprio e os demais status nunca são guardados. Quando o
+    tamanho total passa de max_bytes, as entradas menos acessadas são removidas.
+    """
+    
+    IGNORED_PARAMS = {'key'}
+    # Texto livre: caixa e espaços não mudam a busca (place_id, pagetoken e afins são ids exatos)
+    FREE_TEXT_PARAMS = {'query', 'keyword', 'address'}
+    
+    def __init__(self, path: str, ttls: Dict[str, int], negative_ttl: int = 86400,
+                 max_bytes: int = 200 * 1024 * 1024, negative_statuses: tuple = ('ZERO_RESULTS',)):
+        self.path = path
+        self.ttls = ttls
+        self.negative_ttl = negative_ttl
+        self.negative_statuses = negative_statuses
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                body TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses(last_access)")
+        self._conn.commit()
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+    
+    @classmethod
+    def make_key(cls, endpoint: str, params: Dict) -> str:
+        """Chave estável: endpoint + parâmetros ordenados, sem a API key e sem diferenças de caixa/espaços no texto livre"""
+        normalized = {}
+        for name, value in params.items():
+            if name in cls.IGNORED_PARAMS:
+                continue
+            if name in cls.FREE_TEXT_PARAMS and isinstance(value, str):
+                value = ' '.join(value.split()).lower()
+            normalized[name] = value
+        
+        raw = json.dumps([endpoint, normalized], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Retorna a resposta guardada ou None (expirada ou inexistente)"""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if not row or row[1] < now:
+                self.misses += 1
+                return None
+            
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        
+        return json.loads(row[0])
+    
+    def set(self, endpoint: str, params: Dict, data: Dict) -> bool:
+        """Guarda a resposta se o status permitir; retorna se foi guardada"""
+        status = data.get('status')
+        if status == 'OK':
+            ttl = self.ttls.get(endpoint, 0)
+        elif status in self.negative_statuses:
+            ttl = self.negative_ttl
+        else:
+            return False
+        
+        if ttl <= 0:
+            return False
+        
+        key = self.make_key(endpoint, params)
+        body = json.dumps(data, ensure_ascii=False)
+        size = len(body.encode('utf-8'))
+        now = time.time()
+        
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, body, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, size, now + ttl, now)
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            
+            self._conn.commit()
+        
+        return True
+    
+    def _evict(self):
+        """Remove expirados e depois os menos acessados até 90% de max_bytes"""
+        self._conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        
+        target = self.max_bytes * 0.9
+        if self._total_bytes <= target:
+            return
+        
+        removed = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            removed += 1
+        
+        logger.info(f"Cache de respostas: {removed} entradas removidas por tamanho")
+    
+    def clear(self):
+        """Remove todas as entradas"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._total_bytes = 0
+    
+    def get_stats(self) -> Dict:
+        """Contadores de acerto/erro e ocupação do cache"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'taxa_acerto': (self.hits / lookups * 100) if lookups > 0 else 0,
+            'entradas': entries,
+            'bytes': self._total_bytes
+        }
+
+_places_cache: Optional[ResponseCache] = None
+_places_lock = threading.Lock()
+
+def get_places_cache() -> Optional[ResponseCache]:
+    """Cache compartilhado do Google Places (None se desabilitado)"""
+    global _places_cache
+    if not Config.PLACES_CACHE_ENABLED:
+        return None
+    
+    with _places_lock:
+        if _places_cache is None:
+            _places_cache = ResponseCache(
+                Config.PLACES_CACHE_FILE,
+                ttls={
+                    'textsearch': Config.PLACES_CACHE_TTL_TEXTSEARCH,
+                    'nearbysearch': Config.PLACES_CACHE_TTL_TEXTSEARCH,
+                    'details': Config.PLACES_CACHE_TTL_DETAILS,
+                    'geocode': Config.PLACES_CACHE_TTL_DETAILS,
+                },
+                negative_ttl=Config.PLACES_CACHE_TTL_NEGATIVE,
+                max_bytes=Config.PLACES_CACHE_MAX_MB * 1024 * 1024
+            )
+        return _places_cache
@@ -0,0 +1,134 @@
+"""
+Índice persistente de lugares já coletados (place_id), com filtro de Bloom em memória
+"""
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Filtro de Bloom simples (bits em bytearray, hashing duplo com blake2b)"""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+    
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+    
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+class SeenPlaceIndex:
+    """
+    Registro (SQLite) de todos os place_id já coletados, entre campanhas.
+    
+    O filtro de Bloom responde "com certeza nunca visto" sem tocar no disco;
+    só os prováveis repetidos são confirmados no banco.
+    """
+    
+    def __init__(self, path: str, capacity: int = 100000):
+        self.path = path
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_places (
+                place_id TEXT PRIMARY KEY,
+                first_seen REAL NOT NULL,
+                last_refreshed REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        
+        total = self._conn.execute("SELECT COUNT(*) FROM seen_places").fetchone()[0]
+        self._build_filter(max(capacity, total * 2))
+    
+    def _build_filter(self, capacity: int):
+        # Monta o filtro novo por completo antes de trocar, para leitores concorrentes
+        bloom = BloomFilter(capacity)
+        for (place_id,) in self._conn.execute("SELECT place_id FROM seen_places"):
+            bloom.add(place_id)
+        self._bloom = bloom
+        logger.info(f"Índice de lugares vistos carregado: {bloom.count} place_ids")
+    
+    def last_refreshed(self, place_id: str) -> Optional[float]:
+        """Timestamp da última coleta de detalhes do lugar, ou None se nunca visto"""
+        if not place_id or place_id not in self._bloom:
+            return None
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_refreshed FROM seen_places WHERE place_id = ?", (place_id,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def is_known(self, place_id: str) -> bool:
+        """Verifica se o lugar já foi coletado em alguma campanha"""
+        return self.last_refreshed(place_id) is not None
+    
+    def mark_refreshed(self, place_ids: Iterable[str]):
+        """Registra que os detalhes destes lugares acabaram de ser coletados"""
+        now = time.time()
+        place_ids = [place_id for place_id in place_ids if place_id]
+        if not place_ids:
+            return
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO seen_places (place_id, first_seen, last_refreshed) VALUES (?, ?, ?) "
+                "ON CONFLICT(place_id) DO UPDATE SET last_refreshed = excluded.last_refreshed",
+                [(place_id, now, now) for place_id in place_ids]
+            )
+            self._conn.commit()
+            
+            for place_id in place_ids:
+                if place_id not in self._bloom:
+                    self._bloom.add(place_id)
+            
+            # Acima da capacidade a taxa de falsos positivos sobe; reconstrói maior
+            if self._bloom.count > self._bloom.capacity:
+                self._build_filter(self._bloom.capacity * 2)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM seen_places").fetchone()[0]
+
+_seen_index: Optional[SeenPlaceIndex] = None
+_seen_lock = threading.Lock()
+
+def get_seen_index() -> Optional[SeenPlaceIndex]:
+    """Índice compartilhado de lugares vistos (None se SEEN_INDEX_MODE=off)"""
+    global _seen_index
+    if Config.SEEN_INDEX_MODE == 'off':
+        return None
+    
+    with _seen_lock:
+        if _seen_index is None:
+            _seen_index = SeenPlaceIndex(Config.SEEN_INDEX_FILE)
+        return _seen_index
@@ -0,0 +1,159 @@
+"""
+Verificação concorrente de sites ativos com cache por domínio
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from cassette import get_cassette
+from config import Config
+from http_client import HttpClient, get_http_client
+from response_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Servidores que recusam HEAD costumam responder 403/405; nesses casos tenta GET
+HEAD_FALLBACK_STATUSES = {403, 405}
+
+def normalize_domain(url: str) -> str:
+    """Domínio do site em minúsculas e sem www (https://www.Exemplo.com.br/x -> exemplo.com.br)"""
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+class WebsiteChecker:
+    """
+    Verifica se sites estão no ar, vários ao mesmo tempo.
+    
+    Cada domínio é verificado uma única vez por vez (HEAD, com GET quando o
+    servidor recusa HEAD, seguindo redirecionamentos) e o resultado fica em
+    memória e, se houver, no cache em disco: sites ativos por `ttl` segundos
+    e fora do ar pelo TTL negativo do cache.
+    """
+    
+    ENDPOINT = 'website'
+    
+    def __init__(self, session: HttpClient = None, cache: Optional[ResponseCache] = None,
+                 max_in_flight: int = 20, timeout: float = 10, ttl: int = 7 * 86400):
+        self.session = session or get_http_client()
+        self.cache = cache
+        self.max_in_flight = max(1, max_in_flight)
+        self.timeout = timeout
+        self.ttl = ttl
+        self._results: Dict[str, tuple] = {}
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+    
+    def _active_cache(self) -> Optional[ResponseCache]:
+        """Cache em disco, desligado com o cassete para que gravação e replay façam as mesmas verificações"""
+        return None if get_cassette() else self.cache
+    
+    def _cached(self, domain: str) -> Optional[bool]:
+        with self._lock:
+            entry = self._results.get(domain)
+            if entry and entry[1] > time.time():
+                return entry[0]
+        
+        cache = self._active_cache()
+        if cache:
+            data = cache.get(self.ENDPOINT, {'dominio': domain})
+            if data is not None:
+                self._remember(domain, data['status'] == 'OK', store=False)
+                return data['status'] == 'OK'
+        
+        return None
+    
+    def _remember(self, domain: str, alive: bool, store: bool = True):
+        cache = self._active_cache()
+        ttl = self.ttl if alive or not cache else cache.negative_ttl
+        with self._lock:
+            self._results[domain] = (alive, time.time() + ttl)
+        if store and cache:
+            cache.set(self.ENDPOINT, {'dominio': domain}, {'status': 'OK' if alive else 'OFFLINE'})
+    
+    def _probe(self, url: str) -> bool:
+        """HEAD no site (GET se o servidor recusar HEAD); ativo = resposta 200 no destino final"""
+        try:
+            response = self.session.head(url, timeout=self.timeout)
+            if response.status_code in HEAD_FALLBACK_STATUSES:
+                response = self.session.get(url, timeout=self.timeout)
+            return response.status_code == 200
+        except Exception as e:
+            logger.debug(f"Site {url} fora do ar: {e}")
+            return False
+    
+    def is_alive(self, url: str) -> bool:
+        """Indica se o site responde; consultas simultâneas ao mesmo domínio compartilham a verificação"""
+        domain = normalize_domain(url)
+        if not domain:
+            return False
+        
+        cached = self._cached(domain)
+        if cached is not None:
+            return cached
+        
+        with self._lock:
+            event = self._in_flight.get(domain)
+            owner = event is None
+            if owner:
+                event = self._in_flight[domain] = threading.Event()
+        
+        if not owner:
+            event.wait()
+            cached = self._cached(domain)
+            return bool(cached)
+        
+        try:
+            alive = self._probe(url)
+            self._remember(domain, alive)
+            return alive
+        finally:
+            with self._lock:
+                self._in_flight.pop(domain, None)
+            event.set()
+    
+    def check_many(self, urls: Iterable[str]) -> Dict[str, bool]:
+        """
+        Verifica vários sites em paralelo (até max_in_flight de uma vez);
+        retorna {url: ativo}. Cada domínio é consultado uma vez só.
+        """
+        urls = [url for url in dict.fromkeys(urls) if url]
+        by_domain: Dict[str, str] = {}
+        for url in urls:
+            by_domain.setdefault(normalize_domain(url), url)
+        by_domain.pop('', None)
+        
+        pending = [url for domain, url in by_domain.items() if self._cached(domain) is None]
+        if pending:
+            start_time = time.time()
+            with ThreadPoolExecutor(max_workers=min(self.max_in_flight, len(pending))) as executor:
+                alive = sum(executor.map(self.is_alive, pending))
+            logger.info(f"Sites verificados: {alive}/{len(pending)} ativos em {time.time() - start_time:.1f}s")
+        
+        return {url: self.is_alive(url) for url in urls}
+
+_website_checker: Optional[WebsiteChecker] = None
+_website_lock = threading.Lock()
+
+def get_website_checker() -> WebsiteChecker:
+    """Verificador de sites compartilhado pelo processo"""
+    global _website_checker
+    with _website_lock:
+        if _website_checker is None:
+            cache = None
+            if Config.WEBSITE_CACHE_ENABLED:
+                cache = ResponseCache(
+                    Config.WEBSITE_CACHE_FILE,
+                    ttls={WebsiteChecker.ENDPOINT: Config.WEBSITE_CACHE_TTL},
+                    negative_ttl=Config.WEBSITE_CACHE_TTL_NEGATIVE,
+                    negative_statuses=('OFFLINE',)
+                )
+            _website_checker = WebsiteChecker(
+                cache=cache,
+                max_in_flight=Config.WEBSITE_CHECK_CONCURRENCY,
+                timeout=Config.WEBSITE_CHECK_TIMEOUT,
+                ttl=Config.WEBSITE_CACHE_TTL
+            )
+        return _website_checker
@@ -21,6 +21,19 @@ from datetime import datetime, timedelta
 # Adicionar o diretório raiz ao path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Caches em disco apontam para um diretório temporário (antes de qualquer
+# import de config), para que os testes não gravem nos caches reais em cache/
+TEST_CACHE_DIR = tempfile.mkdtemp(prefix='libra_test_cache_')
+TEST_CACHE_FILES = {
+    'PLACES_CACHE_FILE': 'places_cache.sqlite',
+    'CNPJ_CACHE_FILE': 'cnpj_cache.sqlite',
+    'CNPJ_MATCHER_FILE': 'cnpj_matcher.pkl',
+    'WEBSITE_CACHE_FILE': 'websites.sqlite',
+    'SEEN_INDEX_FILE': 'seen_places.sqlite'
+}
+for setting, filename in TEST_CACHE_FILES.items():
+    os.environ[setting] = os.path.join(TEST_CACHE_DIR, filename)
+
 # ============================================================================
 # FIXTURES DE CONFIGURAÇÃO
 # ============================================================================
@@ -364,6 +377,10 @@ def cleanup_test_files():
 # MARCADORES PERSONALIZADOS
 # ============================================================================
 
+def pytest_unconfigure(config):
+    """Remover os caches temporários dos testes"""
+    shutil.rmtree(TEST_CACHE_DIR, ignore_errors=True)
+
 def pytest_configure(config):
     """Configurar marcadores personalizados"""
     config.addinivalue_line("markers", "unit: Testes unitários")
@@ -4,10 +4,29 @@
 Script para executar todos os testes do sistema
 Libra Energia - TDD Framework
 """
+import os
+import shutil
+import tempfile
 import unittest
 import sys
 from pathlib import Path
 
+# Caches em disco usados pelo sistema; nos testes apontam para um diretório temporário
+TEST_CACHE_FILES = {
+    'PLACES_CACHE_FILE': 'places_cache.sqlite',
+    'CNPJ_CACHE_FILE': 'cnpj_cache.sqlite',
+    'CNPJ_MATCHER_FILE': 'cnpj_matcher.pkl',
+    'WEBSITE_CACHE_FILE': 'websites.sqlite',
+    'SEEN_INDEX_FILE': 'seen_places.sqlite'
+}
+
+def isolate_caches():
+    """Aponta os caches para um diretório temporário (antes de importar config), para não gravar em cache/"""
+    cache_dir = tempfile.mkdtemp(prefix='libra_test_cache_')
+    for setting, filename in TEST_CACHE_FILES.items():
+        os.environ[setting] = os.path.join(cache_dir, filename)
+    return cache_dir
+
 def run_all_tests():
     """Executa todos os testes do sistema"""
     print("🧪 INICIANDO TESTES TDD - LIBRA ENERGIA")
@@ -83,15 +102,19 @@ def run_specific_test(test_name):
 
 def main():
     """Função principal"""
-    if len(sys.argv) > 1:
-        # Executar teste específico
-        test_name = sys.argv[1]
-        success = run_specific_test(test_name)
-        sys.exit(0 if success else 1)
-    else:
-        # Executar todos os testes
-        success = run_all_tests()
-        sys.exit(0 if success else 1)
+    cache_dir = isolate_caches()
+    try:
+        if len(sys.argv) > 1:
+            # Executar teste específico
+            test_name = sys.argv[1]
+            success = run_specific_test(test_name)
+        else:
+            # Executar todos os testes
+            success = run_all_tests()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    
+    sys.exit(0 if success else 1)
 
 if __name__ == '__main__':
     main()
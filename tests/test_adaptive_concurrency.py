@@ -0,0 +1,113 @@
+"""
+Testes para o controle adaptativo de concorrência (AIMD)
+TDD: Concorrência deve subir com respostas boas e cair com sinais de congestionamento
+"""
+import unittest
+from pathlib import Path
+
+import httpx
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from adaptive_concurrency import AIMDLimiter
+from http_client import HttpClient
+
+class TestAdaptiveConcurrency(unittest.TestCase):
+    """Testes para AIMDLimiter e o modo adaptativo do HttpClient"""
+    
+    def test_additive_increase_multiplicative_decrease(self):
+        """Teste: Limite deve subir +1 por janela de sucessos e cair pela metade no congestionamento"""
+        # Arrange
+        now = {'t': 0.0}
+        limiter = AIMDLimiter(initial=2, max_limit=8, cooldown=1.0, clock=lambda: now['t'])
+        
+        # Act
+        for _ in range(2 + 3 + 4):
+            limiter.on_success(0.1)
+        grown = limiter.limit
+        
+        limiter.on_congestion('HTTP 429')
+        limiter.on_congestion('HTTP 429')  # mesma rajada: dentro do cooldown
+        after_burst = limiter.limit
+        
+        now['t'] = 2.0
+        limiter.on_congestion('OVER_QUERY_LIMIT')
+        
+        # Assert
+        self.assertEqual(grown, 5)
+        self.assertEqual(after_burst, 2)
+        self.assertEqual(limiter.limit, 1)
+        self.assertEqual(limiter.decreases, 2)
+    
+    def test_rising_latency_cuts_concurrency(self):
+        """Teste: Latência muito acima da melhor média deve contar como congestionamento"""
+        # Arrange
+        limiter = AIMDLimiter(initial=6, max_limit=10, latency_tolerance=2.0, cooldown=0)
+        
+        # Act
+        for _ in range(5):
+            limiter.on_success(0.1)
+        before = limiter.limit
+        for _ in range(10):
+            limiter.on_success(1.0)
+        
+        # Assert
+        self.assertGreaterEqual(before, 6)
+        self.assertLess(limiter.limit, before)
+        self.assertGreater(limiter.decreases, 0)
+    
+    def test_latency_baseline_is_not_reset_by_cuts(self):
+        """Teste: Corte por latência não deve subir a referência; só o desvio lento a acompanha"""
+        # Arrange
+        now = {'t': 0.0}
+        limiter = AIMDLimiter(initial=8, max_limit=10, latency_tolerance=2.0, cooldown=1.0,
+                              ewma_alpha=1.0, baseline_drift=0.01, clock=lambda: now['t'])
+        
+        # Act
+        limiter.on_success(0.1)
+        limiter.on_success(0.25)
+        first_cut = limiter.decreases
+        now['t'] = 2.0
+        limiter.on_success(0.45)
+        second_cut = limiter.decreases
+        for _ in range(150):
+            now['t'] += 2.0
+            limiter.on_success(0.45)
+        drifted = limiter.decreases
+        limiter.on_success(0.45)
+        
+        # Assert
+        self.assertEqual(first_cut, 1)
+        self.assertEqual(second_cut, 2)
+        self.assertEqual(limiter.decreases, drifted)
+        self.assertLess(drifted, 150)
+    
+    def test_http_client_adapts_per_host(self):
+        """Teste: 429 de um host deve reduzir só a concorrência dele e aparecer no snapshot"""
+        # Arrange
+        def handler(request):
+            if request.url.host == 'receitaws.com.br':
+                return httpx.Response(429)
+            return httpx.Response(200, json={'status': 'OK'})
+        
+        client = HttpClient(adaptive=True, initial_concurrency=4, per_host_limit=10,
+                            transport=httpx.MockTransport(handler))
+        
+        # Act
+        client.get('https://receitaws.com.br/v1/cnpj/123')
+        for _ in range(4 + 5):
+            client.get('https://maps.googleapis.com/maps/api/place/textsearch/json')
+        client.report_congestion('https://maps.googleapis.com/x', 'OVER_QUERY_LIMIT')
+        snapshot = client.concurrency_snapshot()
+        client.close()
+        
+        # Assert
+        self.assertEqual(snapshot['receitaws.com.br']['limite'], 2)
+        self.assertEqual(snapshot['maps.googleapis.com']['limite'], 3)
+        self.assertEqual(snapshot['maps.googleapis.com']['reducoes'], 1)
+        self.assertEqual(snapshot['maps.googleapis.com']['em_andamento'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
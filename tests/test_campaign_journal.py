@@ -0,0 +1,98 @@
+"""
+Testes para o diário de campanhas
+TDD: Campanhas interrompidas devem ser retomadas sem refazer células concluídas
+"""
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+class TestCampaignJournal(unittest.TestCase):
+    """Testes para a classe CampaignJournal"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_record_and_resume(self):
+        """Teste: Células gravadas devem ser relidas ao retomar a campanha"""
+        # Arrange
+        from campaign_journal import CampaignJournal
+        journal = CampaignJournal('camp1', self.temp_dir)
+        journal.start({'keywords': ['padaria'], 'cities': ['São Paulo, SP']})
+        
+        # Act
+        journal.record_cell({'indice': 0, 'keyword': 'padaria', 'cidade': 'São Paulo, SP',
+                             'leads': [{'nome': 'Padaria do João'}]})
+        journal.record_cell({'indice': 1, 'keyword': 'hotel', 'cidade': 'São Paulo, SP',
+                             'leads': [], 'erro': 'timeout'})
+        resumed = CampaignJournal.resume('camp1', self.temp_dir)
+        
+        # Assert
+        self.assertEqual(resumed.params['keywords'], ['padaria'])
+        self.assertTrue(resumed.is_done('padaria', 'São Paulo, SP'))
+        self.assertFalse(resumed.is_done('hotel', 'São Paulo, SP'))
+        self.assertEqual(resumed.load_leads(), [{'nome': 'Padaria do João'}])
+    
+    def test_resume_unknown_campaign(self):
+        """Teste: Retomar campanha inexistente deve falhar"""
+        # Arrange
+        from campaign_journal import CampaignJournal
+        
+        # Act & Assert
+        with self.assertRaises(FileNotFoundError):
+            CampaignJournal.resume('nao_existe', self.temp_dir)
+    
+    def test_new_campaign_never_adopts_existing_journal(self):
+        """Teste: Campanhas novas devem ter ids distintos e não reaproveitar um diário existente"""
+        # Arrange
+        from campaign_journal import CampaignJournal
+        journal = CampaignJournal('camp1', self.temp_dir)
+        journal.start({'keywords': ['padaria']})
+        
+        # Act
+        ids = {CampaignJournal(base_dir=self.temp_dir).campaign_id for _ in range(3)}
+        resumed = CampaignJournal('camp1', self.temp_dir)
+        resumed.start({'keywords': ['hotel']}, resume=True)
+        
+        # Assert
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(resumed.params['keywords'], ['padaria'])
+        with self.assertRaises(FileExistsError):
+            CampaignJournal('camp1', self.temp_dir).start({'keywords': ['hotel']})
+    
+    def test_campaign_skips_finished_cells(self):
+        """Teste: Campanha retomada só deve coletar as células pendentes"""
+        # Arrange
+        from campaign_journal import CampaignJournal
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        journal = CampaignJournal('camp2', self.temp_dir)
+        journal.start({})
+        journal.record_cell({'indice': 0, 'keyword': 'supermercado', 'cidade': 'São Paulo, SP',
+                             'leads': [{'nome': 'Supermercado', 'endereco': 'SP'}]})
+        
+        def fake_places(keyword, city, max_results=20, mark_seen=True):
+            return [{'nome': keyword.title(), 'endereco': city}]
+        
+        # Act
+        with patch.object(collector, 'collect_from_google_places', side_effect=fake_places) as mock_places, \
+             patch.object(collector, 'collect_from_instagram', return_value=[]):
+            leads = collector.run_collection_campaign(['supermercado', 'padaria'], ['São Paulo, SP'], journal=journal)
+        
+        # Assert
+        mock_places.assert_called_once()
+        self.assertEqual([lead['nome'] for lead in leads], ['Supermercado', 'Padaria'])
+        self.assertTrue(journal.is_done('padaria', 'São Paulo, SP'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+"""
+Testes para o cassete de chamadas externas
+TDD: O que foi gravado deve ser reproduzido igual e sem rede
+"""
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from cassette import Cassette, CassetteMiss
+from http_client import HttpClient
+
+def _offline(request):
+    raise AssertionError(f"Chamada de rede durante o replay: {request.url}")
+
+class TestCassette(unittest.TestCase):
+    """Testes para Cassette e CassetteTransport"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = str(self.temp_dir / 'upstream.jsonl')
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_http_record_then_replay(self):
+        """Teste: Respostas gravadas devem voltar na mesma ordem, sem a API key no arquivo"""
+        # Arrange
+        statuses = iter(['INVALID_REQUEST', 'OK'])
+        
+        def upstream(request):
+            return httpx.Response(200, json={'status': next(statuses), 'results': [{'name': 'Mercado'}]})
+        
+        url = 'https://maps.googleapis.com/maps/api/place/textsearch/json'
+        params = {'pagetoken': 'tok1', 'key': 'segredo'}
+        
+        # Act
+        recorder = Cassette(self.path, mode='record')
+        client = HttpClient(transport=recorder.transport(httpx.MockTransport(upstream)))
+        recorded = [client.get(url, params=params).json() for _ in range(2)]
+        client.close()
+        
+        player = Cassette(self.path, mode='replay')
+        client = HttpClient(transport=player.transport(httpx.MockTransport(_offline)))
+        replayed = [client.get(url, params=dict(params, key='outra')).json() for _ in range(3)]
+        with self.assertRaises(CassetteMiss):
+            client.get(url, params={'pagetoken': 'tok2'})
+        client.close()
+        
+        # Assert
+        self.assertEqual(replayed[:2], recorded)
+        self.assertEqual(replayed[2]['status'], 'OK')
+        self.assertNotIn('segredo', Path(self.path).read_text(encoding='utf-8'))
+        self.assertEqual(player.get_stats()['hits'], 3)
+    
+    def test_collector_replays_places_and_instagram(self):
+        """Teste: Coletor deve reproduzir Places e Instagram do cassete sem rede nem navegador"""
+        # Arrange
+        from lead_collector import LeadCollector
+        
+        def upstream(request):
+            return httpx.Response(200, json={'status': 'OK', 'results': [
+                {'name': 'Mercado Bom', 'place_id': 'p1', 'formatted_address': 'Rua A, 1'}
+            ]})
+        
+        def run(cassette, transport, instagram):
+            collector = LeadCollector()
+            collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+            collector.places_cache = None
+            collector.seen_index = None
+            collector.cassette = cassette
+            collector.session = HttpClient(transport=cassette.transport(transport))
+            with patch.object(collector, '_collect_from_instagram', side_effect=instagram) as browser, \
+                 patch.object(collector, '_enrich_with_place_details'):
+                places = collector.collect_from_google_places('supermercado', 'São Paulo, SP')
+                posts = collector.collect_from_instagram('supermercadosaopaulo', max_results=10)
+            return places, posts, browser.call_count
+        
+        # Act
+        recorded = run(Cassette(self.path, mode='record'), httpx.MockTransport(upstream),
+                       lambda hashtag, max_results: [{'nome': 'Perfil', 'fonte': 'Instagram'}])
+        replayed = run(Cassette(self.path, mode='replay'), httpx.MockTransport(_offline),
+                       AssertionError('navegador aberto durante o replay'))
+        
+        # Assert
+        self.assertEqual([lead['place_id'] for lead in replayed[0]], ['p1'])
+        self.assertEqual(replayed[1], recorded[1])
+        self.assertEqual(recorded[2], 1)
+        self.assertEqual(replayed[2], 0)
+        kinds = [json.loads(line)['tipo'] for line in Path(self.path).read_text(encoding='utf-8').splitlines()]
+        self.assertEqual(sorted(kinds), ['http', 'instagram'])
+    
+    def test_replay_bypasses_cache_seen_index_and_rate_limits(self):
+        """Teste: Gravação com cache quente deve ser reproduzida com o cache vazio e sem limites de taxa"""
+        # Arrange
+        import os
+        from config import Config
+        from lead_collector import LeadCollector
+        from rate_limiter import RateLimiter
+        from response_cache import ResponseCache
+        from seen_index import SeenPlaceIndex
+        
+        def upstream(request):
+            return httpx.Response(200, json={'status': 'OK', 'results': [
+                {'name': 'Mercado Bom', 'place_id': 'p1', 'formatted_address': 'Rua A, 1'}
+            ]})
+        
+        warm_cache = ResponseCache(str(self.temp_dir / 'quente' / 'places.sqlite'), ttls={'textsearch': 3600, 'details': 3600})
+        seen_index = SeenPlaceIndex(str(self.temp_dir / 'quente' / 'seen.sqlite'))
+        empty_dir = self.temp_dir / 'vazio'
+        empty_dir.mkdir()
+        
+        def collect(cassette, transport):
+            collector = LeadCollector()
+            collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+            collector.config.SEEN_INDEX_MODE = 'skip'
+            collector.places_cache = warm_cache
+            collector.seen_index = seen_index
+            collector.cassette = cassette
+            collector.session = HttpClient(transport=cassette.transport(transport) if cassette else transport)
+            return collector.collect_from_google_places('supermercado', 'São Paulo, SP')
+        
+        collect(None, httpx.MockTransport(upstream))
+        
+        # Act
+        recorded = collect(Cassette(self.path, mode='record'), httpx.MockTransport(upstream))
+        
+        with patch.object(Config, 'CASSETTE_MODE', 'replay'), \
+             patch.object(Config, 'CASSETTE_FILE', self.path), \
+             patch.object(Config, 'PLACES_CACHE_FILE', str(empty_dir / 'places.sqlite')), \
+             patch.object(Config, 'SEEN_INDEX_FILE', str(empty_dir / 'seen.sqlite')), \
+             patch('lead_collector.get_rate_limiter', return_value=RateLimiter()):
+            collector = LeadCollector()
+        collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+        collector.session = HttpClient(transport=collector.cassette.transport(httpx.MockTransport(_offline)))
+        replayed = collector.collect_from_google_places('supermercado', 'São Paulo, SP')
+        
+        # Assert
+        self.assertEqual([lead['place_id'] for lead in recorded], ['p1'])
+        self.assertEqual([lead['place_id'] for lead in replayed], ['p1'])
+        self.assertEqual(collector.cassette.get_stats()['misses'], 0)
+        self.assertIsNone(collector.places_cache)
+        self.assertIsNone(collector.rate_limiter.bucket_for('maps.googleapis.com'))
+        self.assertEqual(os.listdir(empty_dir), [])
+    
+    def test_cnpj_and_website_caches_are_bypassed_with_cassette(self):
+        """Teste: Com o cassete ligado, CNPJ e sites devem ser consultados na rede mesmo com o cache quente"""
+        # Arrange
+        from config import Config
+        from cnpj_lookup import CNPJLookupService
+        from rate_limiter import RateLimiter
+        from response_cache import ResponseCache
+        from website_checker import WebsiteChecker
+        requests = []
+        
+        def upstream(request):
+            requests.append(request.url.host)
+            return httpx.Response(200, json={'status': 'OK', 'nome': 'MERCADO BOM LTDA'})
+        
+        session = HttpClient(transport=httpx.MockTransport(upstream))
+        cnpj_cache = ResponseCache(str(self.temp_dir / 'cnpj.sqlite'), ttls={'cnpj': 3600})
+        cnpj_cache.set('cnpj', {'cnpj': '12345678000199'}, {'status': 'OK', 'nome': 'DO CACHE'})
+        website_cache = ResponseCache(str(self.temp_dir / 'websites.sqlite'), ttls={'website': 3600})
+        website_cache.set('website', {'dominio': 'mercado.com.br'}, {'status': 'OFFLINE'})
+        
+        # Act
+        with patch.object(Config, 'CASSETTE_MODE', 'record'), \
+             patch.object(Config, 'CASSETTE_FILE', self.path):
+            lookup = CNPJLookupService(cache=cnpj_cache, session=session, rate_limiter=RateLimiter())
+            cnpj_data = lookup.lookup('12.345.678/0001-99')
+            alive = WebsiteChecker(session=session, cache=website_cache).is_alive('https://mercado.com.br')
+        
+        # Assert
+        self.assertEqual(cnpj_data['nome'], 'MERCADO BOM LTDA')
+        self.assertTrue(alive)
+        self.assertEqual(requests, ['receitaws.com.br', 'mercado.com.br'])
+        self.assertEqual(cnpj_cache.get('cnpj', {'cnpj': '12345678000199'})['nome'], 'DO CACHE')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Testes para o índice de prefixos de CNAE
+TDD: O índice deve dar o mesmo resultado da varredura da lista original
+"""
+import random
+import re
+import unittest
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from cnae_index import CNAEIndex, normalize_cnae
+from config import Config
+
+def _linear_match(cnae: str) -> bool:
+    """Varredura original da lista de CNAEs, usada como referência"""
+    cnae_clean = re.sub(r'[^\d]', '', cnae)
+    for cnae_alto in Config.CNAES_ALTO_CONSUMO:
+        if cnae_clean.startswith(re.sub(r'[^\d]', '', cnae_alto)[:4]):
+            return True
+    return False
+
+class TestCNAEIndex(unittest.TestCase):
+    """Testes para CNAEIndex"""
+    
+    def test_matches_same_as_linear_scan(self):
+        """Teste: Índice por classe deve concordar com a varredura em CNAEs aleatórios e da lista"""
+        # Arrange
+        index = CNAEIndex(Config.CNAES_ALTO_CONSUMO)
+        rng = random.Random(42)
+        samples = list(Config.CNAES_ALTO_CONSUMO) + [
+            f"{rng.randint(100, 9999):04d}-{rng.randint(0, 9)}/{rng.randint(0, 99):02d}" for _ in range(2000)
+        ] + ['', '47', '4721', 'abc']
+        
+        # Act
+        mismatches = [cnae for cnae in samples if index.matches(cnae) != _linear_match(cnae)]
+        
+        # Assert
+        self.assertEqual(mismatches, [])
+    
+    def test_division_and_group_levels(self):
+        """Teste: Comparação por divisão e grupo deve aceitar atividades vizinhas da lista"""
+        # Arrange
+        index = CNAEIndex(['4721-1/02', '1011-2/01'])
+        
+        # Act / Assert
+        self.assertEqual(normalize_cnae('4721-1/02'), '4721102')
+        self.assertFalse(index.matches('4729-6/99'))
+        self.assertTrue(index.matches_group('4729-6/99'))
+        self.assertFalse(index.matches_group('4711-3/01'))
+        self.assertTrue(index.matches_division('4711-3/01'))
+        self.assertTrue(index.matches('4721102', level='subclasse'))
+        self.assertFalse(index.matches('4721-1/01', level='subclasse'))
+    
+    def test_invalid_level(self):
+        """Teste: Nível desconhecido deve ser recusado"""
+        with self.assertRaises(ValueError):
+            CNAEIndex(Config.CNAES_ALTO_CONSUMO, level='secao')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Testes para o índice offline de CNPJs
+TDD: O índice deve responder por busca binária no formato da ReceitaWS
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from cnpj_index import CNPJIndex, SortedIndex
+
+def _estabelecimento(basico, ordem, dv, fantasia, cnae):
+    row = [''] * 30
+    row[0:3] = [basico, ordem, dv]
+    row[3] = '1'
+    row[4] = fantasia
+    row[5] = '02'
+    row[10] = '20150312'
+    row[11] = cnae
+    row[12] = '4722901,4723700'
+    row[13:21] = ['RUA', 'DAS FLORES', '100', 'LOJA 1', 'CENTRO', '01001000', 'SP', '7107']
+    row[21:23] = ['11', '33334444']
+    row[27] = 'CONTATO@MERCADO.COM.BR'
+    return ';'.join(f'"{value}"' for value in row)
+
+class TestCNPJIndex(unittest.TestCase):
+    """Testes para SortedIndex e CNPJIndex"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.index_dir = os.path.join(self.temp_dir, 'indice')
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _write(self, name, lines):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'w', encoding='latin-1') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+    
+    def test_sorted_index_external_sort(self):
+        """Teste: Chaves fora de ordem e em vários blocos devem ser encontradas"""
+        # Arrange
+        prefix = os.path.join(self.temp_dir, 'numeros')
+        rows = [(f"{n:08d}", [n]) for n in range(999, 0, -7)]
+        
+        # Act
+        total = SortedIndex.build(prefix, 8, rows, chunk_size=10)
+        index = SortedIndex(prefix, 8)
+        
+        # Assert
+        self.assertEqual(total, len(rows))
+        self.assertEqual(index.get('00000005'), [5])
+        self.assertEqual(index.get('00000999'), [999])
+        self.assertIsNone(index.get('00000006'))
+        self.assertIsNone(index.get('123'))
+        index.close()
+    
+    def test_build_and_lookup_in_receitaws_format(self):
+        """Teste: Consulta deve juntar estabelecimento e empresa no formato da ReceitaWS"""
+        # Arrange
+        estabelecimentos = self._write('estab.csv', [
+            _estabelecimento('12345678', '0001', '99', 'MERCADO BOM PREÇO', '4711302'),
+            _estabelecimento('11222333', '0002', '81', 'PADARIA PÃO', '4721102'),
+        ])
+        empresas_csv = self._write('empresas.csv', [
+            '"12345678";"MERCADO BOM PRECO LTDA";"2062";"49";"150000,00";"03";""',
+        ])
+        empresas_zip = os.path.join(self.temp_dir, 'Empresas0.zip')
+        with zipfile.ZipFile(empresas_zip, 'w') as archive:
+            archive.write(empresas_csv, 'K3241.EMPRECSV')
+        municipios = self._write('municipios.csv', ['"7107";"SAO PAULO"'])
+        cnaes = self._write('cnaes.csv', ['"4711302";"Comércio varejista - supermercados"'])
+        
+        # Act
+        CNPJIndex.build(self.index_dir, [estabelecimentos], [empresas_zip], [municipios], [cnaes])
+        index = CNPJIndex(self.index_dir)
+        data = index.lookup('12.345.678/0001-99')
+        results = index.lookup_batch(['11222333000281', '99999999000199'])
+        
+        # Assert
+        self.assertTrue(CNPJIndex.exists(self.index_dir))
+        self.assertEqual(data['status'], 'OK')
+        self.assertEqual(data['nome'], 'MERCADO BOM PRECO LTDA')
+        self.assertEqual(data['fantasia'], 'MERCADO BOM PREÇO')
+        self.assertEqual(data['atividade_principal'][0], {
+            'code': '47.11-3-02', 'text': 'Comércio varejista - supermercados'
+        })
+        self.assertEqual(data['situacao'], 'ATIVA')
+        self.assertEqual(data['abertura'], '12/03/2015')
+        self.assertEqual(data['municipio'], 'SAO PAULO')
+        self.assertEqual(data['porte'], 'EMPRESA DE PEQUENO PORTE')
+        self.assertEqual(data['capital_social'], '150000.00')
+        self.assertEqual(results['11222333000281']['fantasia'], 'PADARIA PÃO')
+        self.assertEqual(results['11222333000281']['nome'], '')
+        self.assertIsNone(results['99999999000199'])
+        index.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Testes para o serviço de consulta de CNPJ
+TDD: O mesmo CNPJ não deve ser buscado duas vezes enquanto estiver no cache
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from cnpj_lookup import CNPJLookupService
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+
+class TestCNPJLookupService(unittest.TestCase):
+    """Testes para a classe CNPJLookupService"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = ResponseCache(
+            os.path.join(self.temp_dir, 'cnpj.sqlite'),
+            ttls={'cnpj': 3600},
+            negative_ttl=3600,
+            negative_statuses=('ERROR',)
+        )
+        self.session = Mock()
+        self.session.get.side_effect = self._respond
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    @staticmethod
+    def _respond(url, timeout=None):
+        response = Mock()
+        cnpj = url.rsplit('/', 1)[-1]
+        if cnpj.startswith('0000'):
+            response.json.return_value = {'status': 'ERROR', 'message': 'CNPJ inválido'}
+        else:
+            response.json.return_value = {'status': 'OK', 'cnpj': cnpj, 'nome': 'Supermercado Teste Ltda'}
+        return response
+    
+    def _service(self, **kwargs):
+        options = {'cache': self.cache, 'session': self.session, 'rate_limiter': RateLimiter({})}
+        options.update(kwargs)
+        return CNPJLookupService(**options)
+    
+    def test_cached_cnpj_is_not_fetched_again(self):
+        """Teste: Segunda consulta (com outra formatação) deve vir do cache"""
+        # Arrange
+        service = self._service()
+        
+        # Act
+        first = service.lookup('12.345.678/0001-99')
+        second = self._service().lookup('12345678000199')
+        
+        # Assert
+        self.assertEqual(first['nome'], 'Supermercado Teste Ltda')
+        self.assertEqual(second, first)
+        self.assertEqual(self.session.get.call_count, 1)
+    
+    def test_error_result_is_negatively_cached(self):
+        """Teste: CNPJ inexistente deve retornar None e não ser consultado de novo"""
+        # Arrange
+        service = self._service()
+        
+        # Act
+        first = service.lookup('00000000000000')
+        second = service.lookup('00000000000000')
+        
+        # Assert
+        self.assertIsNone(first)
+        self.assertIsNone(second)
+        self.assertEqual(self.session.get.call_count, 1)
+    
+    def test_batch_deduplicates_and_keeps_failures_uncached(self):
+        """Teste: Lote deve consultar cada CNPJ uma vez e não guardar falhas de rede"""
+        # Arrange
+        def respond(url, timeout=None):
+            if url.endswith('99999999000199'):
+                raise ConnectionError("timeout")
+            return self._respond(url, timeout)
+        self.session.get.side_effect = respond
+        service = self._service(workers=2)
+        
+        # Act
+        results = service.lookup_batch(['11111111000111', '11.111.111/0001-11', '99999999000199'])
+        
+        # Assert
+        self.assertEqual(set(results), {'11111111000111', '99999999000199'})
+        self.assertIsNone(results['99999999000199'])
+        self.assertEqual(service.fetches, 1)
+        self.assertIsNone(self.cache.get('cnpj', {'cnpj': '99999999000199'}))
+    
+    def test_concurrent_lookups_share_one_request(self):
+        """Teste: Consultas simultâneas do mesmo CNPJ devem aguardar a mesma requisição"""
+        # Arrange
+        release = threading.Event()
+        def slow_respond(url, timeout=None):
+            release.wait(2)
+            return self._respond(url, timeout)
+        self.session.get.side_effect = slow_respond
+        service = self._service()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(service.lookup('22222222000122')))
+            for _ in range(3)
+        ]
+        
+        # Act
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        
+        # Assert
+        self.assertEqual(len(results), 3)
+        self.assertEqual(self.session.get.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
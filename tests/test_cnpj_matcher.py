@@ -0,0 +1,197 @@
+"""
+Testes para a identificação de CNPJ por nome e CEP
+TDD: Nomes parecidos devem trazer o CNPJ certo no topo dos candidatos
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from cnpj_matcher import CNPJMatcher, extract_cep, normalize_name
+
+COMPANIES = [
+    ('12345678000199', 'SUPERMERCADO BOM PREÇO LTDA', 'BOM PRECO', '01001000'),
+    ('22345678000199', 'SUPERMERCADO BOA PRAÇA LTDA', '', '04567000'),
+    ('32345678000199', 'PADARIA PÃO DE OURO EIRELI', 'PAO DE OURO', '01001000'),
+    ('42345678000199', 'ACADEMIA CORPO EM FORMA ME', 'CORPO EM FORMA FITNESS', '05001000'),
+]
+
+class TestCNPJMatcher(unittest.TestCase):
+    """Testes para a classe CNPJMatcher"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.matcher = CNPJMatcher.from_companies(COMPANIES)
+    
+    def test_normalization_and_cep_extraction(self):
+        """Teste: Acentos e termos societários devem ser removidos; CEP extraído do endereço"""
+        # Act & Assert
+        self.assertEqual(normalize_name('Padaria Pão de Ouro EIRELI'), 'padaria pao ouro')
+        self.assertEqual(extract_cep('Rua X, 100 - Centro, São Paulo - SP, 01001-000, Brasil'), '01001000')
+        self.assertIsNone(extract_cep('Rua sem CEP'))
+    
+    def test_match_ranks_best_candidate_first(self):
+        """Teste: Nome do Google Places deve encontrar a razão social/fantasia correta"""
+        # Act
+        candidates = self.matcher.match('Supermercado Bom Preço')
+        fantasia = self.matcher.match('Corpo em Forma Fitness')
+        
+        # Assert
+        self.assertEqual(candidates[0]['cnpj'], '12345678000199')
+        self.assertGreater(candidates[0]['score'], candidates[1]['score'])
+        self.assertEqual(fantasia[0]['cnpj'], '42345678000199')
+        self.assertEqual(fantasia[0]['score'], 1.0)
+    
+    def test_cep_breaks_ties_and_min_score_filters(self):
+        """Teste: CEP igual deve somar ao score e candidatos fracos devem ser descartados"""
+        # Act
+        with_cep = self.matcher.match('Supermercado Boa', cep='04567-000')
+        filtered = self.matcher.match('Oficina Mecânica', min_score=0.6)
+        
+        # Assert
+        self.assertEqual(with_cep[0]['cnpj'], '22345678000199')
+        self.assertEqual(filtered, [])
+    
+    def test_match_batch_and_persistence(self):
+        """Teste: Lote deve seguir a ordem dos leads e o índice salvo deve responder igual"""
+        # Arrange
+        temp_dir = tempfile.mkdtemp()
+        path = os.path.join(temp_dir, 'matcher.pkl')
+        leads = [
+            {'nome': 'Pão de Ouro', 'endereco': 'Praça da Sé - SP, 01001-000'},
+            {'nome': 'Supermercado Bom Preço', 'endereco': ''},
+            {'nome': 'Pão de Ouro', 'endereco': 'Praça da Sé - SP, 01001-000'},
+        ]
+        
+        # Act
+        self.matcher.save(path)
+        loaded = CNPJMatcher.load(path)
+        results = loaded.match_batch(leads, min_score=0.6)
+        shutil.rmtree(temp_dir)
+        
+        # Assert
+        self.assertEqual(len(loaded), len(COMPANIES))
+        self.assertEqual([r[0]['cnpj'] for r in results], ['32345678000199', '12345678000199', '32345678000199'])
+    
+    def test_qualifier_uses_matcher_for_leads_without_cnpj(self):
+        """Teste: Qualificador deve preencher o CNPJ do lead pelo melhor candidato"""
+        # Arrange
+        from unittest.mock import Mock
+        from lead_qualifier import LeadQualifier
+        qualifier = LeadQualifier()
+        qualifier.cnpj_matcher = self.matcher
+        qualifier.cnpj_lookup = Mock()
+        qualifier.cnpj_lookup.lookup_batch.return_value = {'12345678000199': {
+            'status': 'OK', 'nome': 'SUPERMERCADO BOM PREÇO LTDA', 'atividade_principal': [{'code': '47.11-3-02'}]
+        }}
+        leads = [{'nome': 'Supermercado Bom Preço', 'endereco': 'São Paulo - SP, 01001-000'}]
+        
+        # Act
+        enriched = qualifier.enrich_leads_with_cnpj(leads)
+        
+        # Assert
+        self.assertEqual(enriched[0]['cnpj'], '12.345.678/0001-99')
+        self.assertIn('cnpj_match_score', enriched[0])
+        self.assertEqual(enriched[0]['cnae'], '47.11-3-02')
+    
+    def test_batch_enrichment_matches_each_lead_once(self):
+        """Teste: Enriquecimento em lote não deve consultar o índice de nomes de novo lead a lead"""
+        # Arrange
+        from unittest.mock import Mock, patch
+        from lead_qualifier import LeadQualifier
+        qualifier = LeadQualifier()
+        qualifier.cnpj_matcher = self.matcher
+        qualifier.cnpj_lookup = Mock()
+        qualifier.cnpj_lookup.lookup.return_value = None
+        leads = [{'nome': 'Oficina Mecânica Silva', 'endereco': 'Rua Y, 10'}]
+        
+        # Act
+        with patch.object(self.matcher, 'match', wraps=self.matcher.match) as match:
+            enriched = qualifier.enrich_leads_with_cnpj(leads)
+        
+        # Assert
+        self.assertEqual(match.call_count, 1)
+        self.assertNotIn('cnpj', enriched[0])
+    
+    def test_ambiguous_match_keeps_only_candidates(self):
+        """Teste: Sem CEP igual nem vantagem clara, o lead deve ficar só com os candidatos"""
+        # Arrange
+        from lead_qualifier import LeadQualifier
+        qualifier = LeadQualifier()
+        qualifier.config.CNPJ_MATCH_MIN_MARGIN = 0.15
+        ambiguous = {'nome': 'Supermercado Boa Preça', 'endereco': 'Rua Z, 5'}
+        same_cep = {'nome': 'Supermercado Boa Preça', 'endereco': 'Rua Z, 5 - SP, 04567-000'}
+        clear = {'nome': 'Supermercado Bom Preço', 'endereco': 'Rua Z, 5'}
+        
+        # Act
+        for lead in (ambiguous, same_cep, clear):
+            qualifier._apply_cnpj_match(lead, self.matcher.match(
+                lead['nome'], extract_cep(lead['endereco']), min_score=0.6
+            ))
+        
+        # Assert
+        self.assertNotIn('cnpj', ambiguous)
+        self.assertEqual(ambiguous['cnpj_candidatos'], ['22345678000199', '12345678000199'])
+        self.assertEqual(same_cep['cnpj'], '22.345.678/0001-99')
+        self.assertEqual(clear['cnpj'], '12.345.678/0001-99')
+    
+    def test_qualifier_loads_matcher_on_first_lead_without_cnpj(self):
+        """Teste: Índice de nomes não deve ser carregado ao criar o qualificador, só quando um lead precisar"""
+        # Arrange
+        from unittest.mock import Mock, patch
+        from lead_qualifier import LeadQualifier
+        
+        # Act
+        with patch('lead_qualifier.get_cnpj_matcher', return_value=self.matcher) as loader:
+            qualifier = LeadQualifier()
+            qualifier.cnpj_lookup = Mock()
+            qualifier.cnpj_lookup.lookup.return_value = None
+            qualifier.cnpj_lookup.lookup_batch.return_value = {}
+            calls_at_startup = loader.call_count
+            qualifier.enrich_leads_with_cnpj([{'nome': 'Mercado', 'endereco': 'CNPJ 12.345.678/0001-99'}])
+            calls_with_cnpj = loader.call_count
+            qualifier.enrich_leads_with_cnpj([{'nome': 'Supermercado Bom Preço', 'endereco': ''}])
+            qualifier.enrich_lead_with_cnpj({'nome': 'Pão de Ouro', 'endereco': ''})
+        
+        # Assert
+        self.assertEqual(calls_at_startup, 0)
+        self.assertEqual(calls_with_cnpj, 0)
+        self.assertEqual(loader.call_count, 1)
+    
+    def test_shared_matcher_is_only_built_for_configured_ufs(self):
+        """Teste: Sem CNPJ_MATCHER_UFS o índice de nomes não deve ser montado para o Brasil inteiro"""
+        # Arrange
+        from unittest.mock import patch
+        import cnpj_matcher
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        open(os.path.join(temp_dir, 'estabelecimentos.idx'), 'w').close()
+        
+        def build(ufs):
+            with patch.object(cnpj_matcher, '_cnpj_matcher', None), \
+                 patch.object(cnpj_matcher.Config, 'CNPJ_MATCHER_ENABLED', True), \
+                 patch.object(cnpj_matcher.Config, 'CNPJ_INDEX_DIR', temp_dir), \
+                 patch.object(cnpj_matcher.Config, 'CNPJ_MATCHER_FILE', os.path.join(temp_dir, 'matcher.pkl')), \
+                 patch.object(cnpj_matcher.Config, 'CNPJ_MATCHER_UFS', ufs), \
+                 patch.object(cnpj_matcher, 'CNPJIndex') as index_class:
+                index_class.exists.return_value = True
+                index_class.return_value.iter_companies.return_value = COMPANIES
+                return cnpj_matcher.get_cnpj_matcher(), index_class
+        
+        # Act
+        without_ufs, index_without_ufs = build([])
+        with_ufs, index_with_ufs = build(['SP'])
+        
+        # Assert
+        self.assertIsNone(without_ufs)
+        index_without_ufs.assert_not_called()
+        self.assertIsNotNone(with_ufs)
+        index_with_ufs.return_value.iter_companies.assert_called_once_with(['SP'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Testes para a qualificação em colunas
+TDD: Scores em colunas devem ser idênticos aos de qualify_lead
+"""
+import random
+import unittest
+from pathlib import Path
+
+import httpx
+import pandas as pd
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from http_client import HttpClient
+from lead_qualifier import LeadQualifier
+from website_checker import WebsiteChecker
+
+QUALIFICATION_FIELDS = ['score', 'criterios_atingidos', 'qualificado', 'nivel_qualificacao', 'observacoes_qualificacao']
+
+def _random_leads(count: int, seed: int = 7):
+    """Leads com campos válidos, inválidos e ausentes misturados"""
+    rng = random.Random(seed)
+    options = {
+        'nome': ['Supermercado Bom Preço', 'AB', '12345', 'N/A Comércio', 'Padaria Sem Título', 'Academia Forma'],
+        'telefone': ['(11) 99999-9999', '1199999', '', '+55 11 3333-4444', None],
+        'website': ['https://vivo.com.br', 'https://morto.com.br', 'www.semprotocolo.com.br', '', None],
+        'cnae': ['4721-1/02', '4729-6/99', '9311-5/01', '1234-5/67', '', None],
+        'instagram': ['@mercado', '', None],
+        'whatsapp': ['https://wa.me/5511999999999', 'WhatsApp: 11 99999', '11 99999-9999', '', None],
+        'endereco': ['Rua das Flores, 123 - Centro, São Paulo', 'Rua Curta, 1', 'Avenida Paulista 1000 Bela Vista', ''],
+    }
+    leads = []
+    for _ in range(count):
+        lead = {}
+        for field, values in options.items():
+            value = rng.choice(values)
+            if value is not None:
+                lead[field] = value
+        leads.append(lead)
+    return leads
+
+class TestColumnarScoring(unittest.TestCase):
+    """Testes para LeadQualifier.qualify_dataframe"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        def handler(request):
+            return httpx.Response(200 if request.url.host == 'vivo.com.br' else 404)
+        
+        self.qualifier = LeadQualifier()
+        self.qualifier.website_checker = WebsiteChecker(session=HttpClient(transport=httpx.MockTransport(handler)))
+    
+    def test_scores_identical_to_per_lead_path(self):
+        """Teste: Cada coluna de qualificação deve bater com qualify_lead lead a lead"""
+        # Arrange
+        leads = _random_leads(500)
+        
+        # Act
+        expected = [self.qualifier.qualify_lead(lead) for lead in leads]
+        frame = self.qualifier.qualify_dataframe(pd.DataFrame(leads))
+        
+        # Assert
+        for field in QUALIFICATION_FIELDS:
+            self.assertEqual(frame[field].tolist(), [lead[field] for lead in expected], field)
+        self.assertIn('data_qualificacao', frame.columns)
+    
+    def test_batch_dispatches_dataframe_and_respects_match_level(self):
+        """Teste: qualify_leads_batch com DataFrame deve usar o modo em colunas e o nível de CNAE configurado"""
+        # Arrange
+        leads = [{'nome': 'Mercado Vizinho', 'cnae': '4729-6/99'}, {'nome': 'Mercado Bom', 'cnae': '4721-1/02'}]
+        
+        # Act
+        by_class = self.qualifier.qualify_leads_batch(pd.DataFrame(leads))
+        self.qualifier.cnae_index.level = 'grupo'
+        by_group = self.qualifier.qualify_leads_batch(pd.DataFrame(leads))
+        
+        # Assert
+        self.assertIsInstance(by_class, pd.DataFrame)
+        self.assertEqual(by_class['score'].tolist(), [1, 3])
+        self.assertEqual(by_group['score'].tolist(), [3, 3])
+
+if __name__ == '__main__':
+    unittest.main()
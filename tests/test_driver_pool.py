@@ -0,0 +1,135 @@
+"""
+Testes para o pool de navegadores do Instagram
+TDD: Navegadores devem ser reaproveitados, verificados e reciclados
+"""
+import unittest
+from unittest.mock import MagicMock
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+class TestDriverPool(unittest.TestCase):
+    """Testes para a classe DriverPool"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.created = []
+        
+        def factory():
+            driver = MagicMock()
+            self.created.append(driver)
+            return driver
+        
+        self.factory = factory
+    
+    def test_driver_is_reused_between_leases(self):
+        """Teste: O mesmo navegador deve ser emprestado de novo após a devolução"""
+        # Arrange
+        from driver_pool import DriverPool
+        pool = DriverPool(size=2, driver_factory=self.factory)
+        
+        # Act
+        with pool.lease() as first:
+            first.get('https://www.instagram.com/')
+        with pool.lease() as second:
+            pass
+        
+        # Assert
+        self.assertIs(first, second)
+        self.assertEqual(len(self.created), 1)
+    
+    def test_driver_is_recycled_after_max_pages(self):
+        """Teste: Navegador que passou de max_pages deve ser fechado e substituído"""
+        # Arrange
+        from driver_pool import DriverPool
+        pool = DriverPool(size=1, max_pages=2, driver_factory=self.factory)
+        
+        # Act
+        with pool.lease() as driver:
+            driver.get('https://www.instagram.com/a')
+            driver.get('https://www.instagram.com/b')
+        with pool.lease():
+            pass
+        
+        # Assert
+        self.assertEqual(len(self.created), 2)
+        self.created[0].quit.assert_called_once()
+    
+    def test_unhealthy_driver_is_replaced(self):
+        """Teste: Navegador que não responde deve ser descartado no empréstimo"""
+        # Arrange
+        from driver_pool import DriverPool
+        pool = DriverPool(size=1, driver_factory=self.factory)
+        pool.warm_up()
+        type(self.created[0]).current_url = property(lambda _: (_ for _ in ()).throw(RuntimeError('morto')))
+        
+        # Act
+        with pool.lease():
+            pass
+        
+        # Assert
+        self.assertEqual(len(self.created), 2)
+    
+    def test_lease_times_out_when_pool_is_exhausted(self):
+        """Teste: Sem navegadores livres o empréstimo deve expirar"""
+        # Arrange
+        from driver_pool import DriverPool
+        pool = DriverPool(size=1, driver_factory=self.factory, lease_timeout=0.05)
+        
+        # Act & Assert
+        with pool.lease():
+            with self.assertRaises(TimeoutError):
+                with pool.lease():
+                    pass
+    
+    def test_waiter_wakes_when_driver_is_discarded(self):
+        """Teste: Quem espera deve abrir um navegador novo assim que o emprestado for descartado"""
+        # Arrange
+        import threading
+        import time
+        from driver_pool import DriverPool
+        pool = DriverPool(size=1, max_pages=1, driver_factory=self.factory, lease_timeout=5)
+        leased = threading.Event()
+        waited = {}
+        
+        def waiter():
+            leased.wait()
+            start = time.monotonic()
+            with pool.lease() as driver:
+                waited['driver'] = driver
+            waited['tempo'] = time.monotonic() - start
+        
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        
+        # Act
+        with pool.lease() as driver:
+            driver.get('https://www.instagram.com/')
+            leased.set()
+            time.sleep(0.1)
+        thread.join(timeout=10)
+        
+        # Assert
+        self.assertLess(waited['tempo'], 2)
+        self.assertEqual(len(self.created), 2)
+        self.created[0].quit.assert_called_once()
+    
+    def test_fast_profile_options(self):
+        """Teste: Perfil rápido deve usar carregamento eager e bloquear imagens"""
+        # Arrange
+        from driver_pool import build_chrome_options
+        
+        # Act
+        fast = build_chrome_options(headless=True, fast=True)
+        normal = build_chrome_options(headless=True, fast=False)
+        
+        # Assert
+        self.assertEqual(fast.page_load_strategy, 'eager')
+        self.assertEqual(fast.experimental_options['prefs']['profile.managed_default_content_settings.images'], 2)
+        self.assertEqual(normal.page_load_strategy, 'normal')
+        self.assertNotIn('prefs', normal.experimental_options)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Testes para a busca do Google Places por tiles
+TDD: Tiles que atingem o limite devem ser subdivididos e os lugares deduplicados
+"""
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+import geo_tiling
+
+class TestGeoTiling(unittest.TestCase):
+    """Testes para as funções de divisão geográfica"""
+    
+    def test_split_bbox_covers_area(self):
+        """Teste: A grade deve cobrir a área sem sobreposição"""
+        # Arrange
+        bbox = (-24.0, -47.0, -23.0, -46.0)
+        
+        # Act
+        tiles = geo_tiling.split_bbox(bbox, 2, 2)
+        
+        # Assert
+        self.assertEqual(len(tiles), 4)
+        self.assertEqual(tiles[0], (-24.0, -47.0, -23.5, -46.5))
+        self.assertEqual(tiles[-1], (-23.5, -46.5, -23.0, -46.0))
+        self.assertEqual(sum(geo_tiling.contains(t, -23.5, -46.5) for t in tiles), 1)
+    
+    def test_center_and_radius_reaches_corner(self):
+        """Teste: O raio deve alcançar os cantos do tile e respeitar o máximo da API"""
+        # Arrange
+        small = (-23.6, -46.7, -23.5, -46.6)
+        huge = (-30.0, -50.0, -20.0, -40.0)
+        
+        # Act
+        lat, lng, radius = geo_tiling.center_and_radius(small)
+        _, _, huge_radius = geo_tiling.center_and_radius(huge)
+        
+        # Assert
+        self.assertAlmostEqual(lat, -23.55)
+        self.assertAlmostEqual(lng, -46.65)
+        self.assertGreaterEqual(radius, geo_tiling.haversine_m(lat, lng, -23.6, -46.7) - 1)
+        self.assertEqual(huge_radius, geo_tiling.MAX_SEARCH_RADIUS)
+
+class TestTiledCollection(unittest.TestCase):
+    """Testes para LeadCollector.collect_from_google_places_tiled"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        from lead_collector import LeadCollector
+        self.collector = LeadCollector()
+        self.collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+        self.collector.places_cache = None
+        self.collector.seen_index = None
+    
+    @staticmethod
+    def _place(place_id, lat, lng):
+        return {
+            'place_id': place_id,
+            'name': f'Lugar {place_id}',
+            'formatted_address': 'São Paulo, SP',
+            'geometry': {'location': {'lat': lat, 'lng': lng}}
+        }
+    
+    def test_saturated_tile_is_subdivided_and_deduplicated(self):
+        """Teste: Tile no limite deve ser subdividido e lugares repetidos ignorados"""
+        # Arrange
+        bounds = (-24.0, -47.0, -23.0, -46.0)
+        saturated = (-24.0, -47.0, -23.5, -46.5)
+        crowded = [self._place(f'p{i}', -23.9, -46.9) for i in range(geo_tiling.PLACES_RESULT_CAP)]
+        calls = []
+        
+        def search_tile(keyword, tile):
+            calls.append(tile)
+            if tile == saturated:
+                return crowded, True
+            if geo_tiling.contains(tile, -23.9, -46.9):
+                # Subtile repete os mesmos lugares e traz um novo
+                return crowded[:5] + [self._place('novo', -23.9, -46.9)], False
+            return [self._place('fora', -10.0, -10.0)], False
+        
+        # Act
+        with patch.object(self.collector, '_geocode_city_bounds', return_value=bounds), \
+             patch.object(self.collector, '_search_tile', side_effect=search_tile), \
+             patch.object(self.collector, '_enrich_with_place_details'):
+            leads = self.collector.collect_from_google_places_tiled('supermercado', 'São Paulo, SP')
+        
+        # Assert
+        self.assertEqual(len(calls), 4 + 4)
+        place_ids = [lead['place_id'] for lead in leads]
+        self.assertEqual(len(place_ids), len(set(place_ids)))
+        self.assertEqual(len(place_ids), geo_tiling.PLACES_RESULT_CAP + 1)
+        self.assertNotIn('fora', place_ids)
+    
+    def test_max_depth_stops_subdivision(self):
+        """Teste: A subdivisão deve parar na profundidade máxima"""
+        # Arrange
+        self.collector.config.GEO_TILE_GRID = 1
+        self.collector.config.GEO_TILE_MAX_DEPTH = 1
+        bounds = (-24.0, -47.0, -23.0, -46.0)
+        
+        # Act
+        with patch.object(self.collector, '_geocode_city_bounds', return_value=bounds), \
+             patch.object(self.collector, '_search_tile', return_value=([], True)) as search_tile:
+            leads = self.collector.collect_from_google_places_tiled('supermercado', 'São Paulo, SP')
+        
+        # Assert
+        self.assertEqual(leads, [])
+        self.assertEqual(search_tile.call_count, 1 + 4)
+
+if __name__ == '__main__':
+    unittest.main()
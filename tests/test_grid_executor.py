@@ -0,0 +1,204 @@
+"""
+Testes para o executor paralelo de campanhas
+TDD: Células devem rodar em paralelo respeitando os limites por fonte
+"""
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+class TestGridExecutor(unittest.TestCase):
+    """Testes para a classe GridExecutor"""
+    
+    def test_source_limit_is_respected(self):
+        """Teste: Uma fonte com limite 1 nunca deve ter duas células simultâneas"""
+        # Arrange
+        from grid_executor import GridExecutor
+        executor = GridExecutor(max_workers=4, source_limits={'instagram': 1})
+        lock = threading.Lock()
+        state = {'ativos': 0, 'maximo': 0}
+        
+        def cell_fn(keyword, city):
+            with executor.source_slot('instagram'):
+                with lock:
+                    state['ativos'] += 1
+                    state['maximo'] = max(state['maximo'], state['ativos'])
+                time.sleep(0.02)
+                with lock:
+                    state['ativos'] -= 1
+            return [{'nome': keyword}]
+        
+        cells = [(f"kw{i}", 'São Paulo, SP') for i in range(6)]
+        
+        # Act
+        results = list(executor.run(cells, cell_fn))
+        
+        # Assert
+        self.assertEqual(len(results), 6)
+        self.assertEqual(state['maximo'], 1)
+    
+    def test_cells_record_timing_and_errors(self):
+        """Teste: Cada célula deve registrar tempo, total de leads e erro"""
+        # Arrange
+        from grid_executor import GridExecutor
+        executor = GridExecutor(max_workers=2)
+        
+        def cell_fn(keyword, city):
+            if keyword == 'falha':
+                raise RuntimeError('upstream fora do ar')
+            return [{'nome': 'A'}, {'nome': 'B'}]
+        
+        # Act
+        results = {cell['keyword']: cell for cell in executor.run([('ok', 'X'), ('falha', 'X')], cell_fn)}
+        
+        # Assert
+        self.assertEqual(results['ok']['total_leads'], 2)
+        self.assertIsNone(results['ok']['erro'])
+        self.assertGreaterEqual(results['ok']['tempo'], 0)
+        self.assertEqual(results['falha']['total_leads'], 0)
+        self.assertIn('upstream', results['falha']['erro'])
+    
+    def test_campaign_keeps_grid_order(self):
+        """Teste: Campanha paralela deve manter a ordem da grade no resultado"""
+        # Arrange
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        
+        def fake_places(keyword, city, max_results=20, mark_seen=True):
+            time.sleep(0.05 if keyword == 'supermercado' else 0)
+            return [{'nome': keyword, 'endereco': city, 'fonte': 'Google Places'}]
+        
+        # Act
+        with patch.object(collector, 'collect_from_google_places', side_effect=fake_places), \
+             patch.object(collector, 'collect_from_instagram', return_value=[]):
+            leads = collector.run_collection_campaign(['supermercado', 'padaria'], ['São Paulo, SP'])
+        
+        # Assert
+        self.assertEqual([lead['nome'] for lead in leads], ['supermercado', 'padaria'])
+    
+    def test_cell_sources_run_concurrently(self):
+        """Teste: Fontes da célula devem rodar juntas e uma fonte nova deve entrar por plugin"""
+        # Arrange
+        from grid_executor import GridExecutor
+        from lead_collector import LeadCollector, LeadSource
+        collector = LeadCollector()
+        
+        class DirectorySource(LeadSource):
+            name = 'guia_local'
+            optional = True
+            
+            @property
+            def rate_limits(self):
+                return {'guia.exemplo.com.br': (5, 1)}
+            
+            def collect(self, keyword, city):
+                time.sleep(0.2)
+                raise RuntimeError('guia fora do ar')
+        
+        def slow(value):
+            def fn(*args, **kwargs):
+                time.sleep(0.2)
+                return [{'nome': value}]
+            return fn
+        
+        collector.register_source(DirectorySource(collector))
+        executor = GridExecutor(source_limits={source.name: source.concurrency for source in collector.sources})
+        
+        # Act
+        with patch.object(collector, 'collect_from_google_places', side_effect=slow('places')), \
+             patch.object(collector, 'collect_from_instagram', side_effect=slow('instagram')):
+            start_time = time.time()
+            leads = collector._collect_cell('supermercado', 'São Paulo, SP', executor)
+            elapsed = time.time() - start_time
+        
+        # Assert
+        self.assertEqual(sorted(lead['nome'] for lead in leads), ['instagram', 'places'])
+        self.assertLess(elapsed, 0.35)
+        self.assertIsNotNone(collector.rate_limiter.bucket_for('https://guia.exemplo.com.br/busca'))
+    
+    def test_requeue_waits_in_dispatcher_not_in_worker(self):
+        """Teste: Espera do reenfileiramento não deve ocupar o worker nem somar entre células"""
+        # Arrange
+        from grid_executor import GridExecutor
+        from resilience import TransientError
+        executor = GridExecutor(max_workers=1, max_requeues=1, requeue_delay=0.001)
+        calls = {}
+        
+        def cell_fn(keyword, city):
+            calls.setdefault(keyword, []).append(time.monotonic())
+            if len(calls[keyword]) == 1 and keyword != 'ok':
+                raise TransientError('OVER_QUERY_LIMIT', retry_after=0.4)
+            return [{'nome': keyword}]
+        
+        # Act
+        start_time = time.monotonic()
+        cells = list(executor.run([('a', 'X'), ('b', 'X'), ('ok', 'X')], cell_fn))
+        elapsed = time.monotonic() - start_time
+        
+        # Assert
+        self.assertEqual(sorted(cell['keyword'] for cell in cells if cell['erro'] is None), ['a', 'b', 'ok'])
+        self.assertLess(calls['ok'][0] - start_time, 0.2)
+        self.assertGreaterEqual(calls['a'][1] - calls['a'][0], 0.39)
+        self.assertLess(elapsed, 0.75)
+    
+    def test_requeue_reruns_only_failed_source(self):
+        """Teste: Célula refeita deve repetir só a fonte que falhou e manter os leads das outras"""
+        # Arrange
+        from lead_collector import LeadCollector
+        from resilience import TransientError
+        collector = LeadCollector()
+        collector.config.CAMPAIGN_MAX_REQUEUES = 1
+        collector.config.RETRY_BASE_DELAY = 0.01
+        attempts = {'places': 0}
+        
+        def flaky_places(keyword, city, max_results=20, mark_seen=True):
+            attempts['places'] += 1
+            if attempts['places'] == 1:
+                raise TransientError('OVER_QUERY_LIMIT')
+            return [{'nome': 'Mercado', 'endereco': city, 'fonte': 'Google Places'}]
+        
+        # Act
+        with patch.object(collector, 'collect_from_google_places', side_effect=flaky_places), \
+             patch.object(collector, 'collect_from_instagram',
+                          return_value=[{'nome': 'Perfil', 'fonte': 'Instagram'}]) as instagram:
+            cells = list(collector.iter_collection_campaign(['supermercado'], ['São Paulo, SP'], max_workers=1))
+        
+        # Assert
+        self.assertEqual(instagram.call_count, 1)
+        self.assertEqual(attempts['places'], 2)
+        self.assertIsNone(cells[0]['erro'])
+        self.assertEqual(cells[0]['tentativas'], 2)
+        self.assertEqual(sorted(lead['nome'] for lead in cells[0]['leads']), ['Mercado', 'Perfil'])
+    
+    def test_failed_cell_keeps_partial_leads(self):
+        """Teste: Célula que falha na última tentativa deve manter os leads das fontes que terminaram"""
+        # Arrange
+        from lead_collector import LeadCollector
+        from resilience import TransientError
+        collector = LeadCollector()
+        collector.config.CAMPAIGN_MAX_REQUEUES = 1
+        collector.config.RETRY_BASE_DELAY = 0.01
+        
+        def down_places(keyword, city, max_results=20, mark_seen=True):
+            raise TransientError('OVER_QUERY_LIMIT')
+        
+        # Act
+        with patch.object(collector, 'collect_from_google_places', side_effect=down_places), \
+             patch.object(collector, 'collect_from_instagram',
+                          return_value=[{'nome': 'Perfil', 'fonte': 'Instagram'}]) as instagram:
+            cells = list(collector.iter_collection_campaign(['supermercado'], ['São Paulo, SP'], max_workers=1))
+        
+        # Assert
+        self.assertEqual(instagram.call_count, 1)
+        self.assertIsNotNone(cells[0]['erro'])
+        self.assertEqual(cells[0]['tentativas'], 2)
+        self.assertEqual([lead['nome'] for lead in cells[0]['leads']], ['Perfil'])
+        self.assertEqual(cells[0]['total_leads'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
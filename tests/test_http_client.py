@@ -0,0 +1,100 @@
+"""
+Testes para o cliente HTTP compartilhado
+TDD: Requisições devem respeitar o limite por host e registrar a latência
+"""
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from http_client import AsyncHttpClient, HttpClient, LatencyMetrics
+
+class TestHttpClient(unittest.TestCase):
+    """Testes para HttpClient e AsyncHttpClient"""
+    
+    def test_metrics_and_default_timeout(self):
+        """Teste: Cada requisição deve entrar nas métricas do host, inclusive as que falham"""
+        # Arrange
+        seen_timeouts = []
+        
+        def handler(request):
+            seen_timeouts.append(request.extensions['timeout'])
+            if request.url.path == '/erro':
+                raise httpx.ConnectError("recusado", request=request)
+            return httpx.Response(200, json={'status': 'OK'})
+        
+        client = HttpClient(timeout=12, connect_timeout=3, transport=httpx.MockTransport(handler))
+        
+        # Act
+        response = client.get('https://maps.googleapis.com/ok', params={'q': 'x'})
+        with self.assertRaises(httpx.ConnectError):
+            client.get('https://maps.googleapis.com/erro')
+        metrics = client.metrics.snapshot()
+        client.close()
+        
+        # Assert
+        self.assertEqual(response.json(), {'status': 'OK'})
+        self.assertEqual(seen_timeouts[0]['read'], 12)
+        self.assertEqual(seen_timeouts[0]['connect'], 3)
+        self.assertEqual(metrics['maps.googleapis.com']['requisicoes'], 2)
+        self.assertEqual(metrics['maps.googleapis.com']['erros'], 1)
+        self.assertGreaterEqual(metrics['maps.googleapis.com']['latencia_max_ms'], 0)
+    
+    def test_per_host_limit(self):
+        """Teste: No máximo per_host_limit requisições simultâneas para o mesmo host"""
+        # Arrange
+        active = {'agora': 0, 'pico': 0}
+        lock = threading.Lock()
+        
+        def handler(request):
+            with lock:
+                active['agora'] += 1
+                active['pico'] = max(active['pico'], active['agora'])
+            time.sleep(0.02)
+            with lock:
+                active['agora'] -= 1
+            return httpx.Response(200)
+        
+        client = HttpClient(per_host_limit=2, transport=httpx.MockTransport(handler))
+        
+        # Act
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(lambda i: client.get(f'https://receitaws.com.br/v1/cnpj/{i}'), range(12)))
+        client.close()
+        
+        # Assert
+        self.assertEqual(active['pico'], 2)
+    
+    def test_async_facade(self):
+        """Teste: Fachada assíncrona deve compartilhar métricas e responder em paralelo"""
+        # Arrange
+        metrics = LatencyMetrics()
+        
+        async def handler(request):
+            await asyncio.sleep(0.01)
+            return httpx.Response(204)
+        
+        async def run():
+            client = AsyncHttpClient(metrics=metrics, transport=httpx.MockTransport(handler))
+            try:
+                return await asyncio.gather(*(client.head(f'https://exemplo.com.br/{i}') for i in range(5)))
+            finally:
+                await client.aclose()
+        
+        # Act
+        responses = asyncio.run(run())
+        
+        # Assert
+        self.assertEqual([r.status_code for r in responses], [204] * 5)
+        self.assertEqual(metrics.snapshot()['exemplo.com.br']['requisicoes'], 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+"""
+Testes para o tempo de importação (cold start da API e da CLI)
+TDD: Importar o coletor e o qualificador não deve carregar navegador nem pandas
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+
+# Orçamento (segundos) para importar os módulos usados pela API em um interpretador novo
+COLD_START_BUDGET = float(os.getenv('IMPORT_TIME_BUDGET', 1.5))
+
+HEAVY_MODULES = ['selenium', 'webdriver_manager', 'bs4', 'pandas']
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import lead_collector, lead_qualifier
+elapsed = time.perf_counter() - start
+print(json.dumps({{'tempo': elapsed, 'modulos': sorted(m.split('.')[0] for m in sys.modules)}}))
+"""
+
+class TestImportTime(unittest.TestCase):
+    """Testes para o custo de importação de lead_collector e lead_qualifier"""
+
+    def _probe(self):
+        with tempfile.TemporaryDirectory() as cwd:
+            # cwd temporário: o coletor cria lead_collection.log ao ser importado
+            output = subprocess.run(
+                [sys.executable, '-c', PROBE.format(src=str(SRC_DIR))],
+                cwd=cwd, capture_output=True, text=True, check=True
+            ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def test_heavy_dependencies_are_lazy(self):
+        """Teste: selenium, webdriver_manager, bs4 e pandas só devem carregar quando usados"""
+        # Act
+        result = self._probe()
+
+        # Assert
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, result['modulos'])
+
+    def test_cold_start_budget(self):
+        """Teste: Importação a frio deve caber no orçamento de cold start da API"""
+        # Act
+        result = self._probe()
+
+        # Assert
+        self.assertLess(result['tempo'], COLD_START_BUDGET)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,8 @@ import unittest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 import json
+import threading
+import time
 
 # Importar módulos do sistema
 import sys
@@ -86,8 +88,7 @@ class TestLeadCollector(unittest.TestCase):
             self.assertIn('fonte', first_lead)
             self.assertEqual(first_lead['fonte'], 'Google Places')
     
-    @patch('lead_collector.requests.get')
-    def test_google_places_error_handling(self, mock_get):
+    def test_google_places_error_handling(self):
         """Teste: Erros da API devem ser tratados corretamente"""
         # Arrange
         from lead_collector import LeadCollector
@@ -96,10 +97,10 @@ class TestLeadCollector(unittest.TestCase):
         mock_response = MagicMock()
         mock_response.status_code = 400
         mock_response.text = 'Bad Request'
-        mock_get.return_value = mock_response
         
         # Act - Usar o método que realmente faz a chamada HTTP
-        leads = collector.collect_from_google_places('supermercado', 'São Paulo, SP')
+        with patch.object(collector.session, 'get', return_value=mock_response):
+            leads = collector.collect_from_google_places('supermercado', 'São Paulo, SP')
         
         # Assert - Verificar se o sistema não quebra com erros
         self.assertIsInstance(leads, list)
@@ -215,7 +216,7 @@ class TestLeadCollector(unittest.TestCase):
         # Mock da API do Google Places
         with patch.object(collector, 'search_google_places') as mock_search:
             mock_search.return_value = self.expected_leads
-            
+                    
                     # Act
         leads = collector.run_collection_campaign(keywords, cities)
         
@@ -226,6 +227,157 @@ class TestLeadCollector(unittest.TestCase):
             self.assertIn('nome', lead)
             self.assertIn('endereco', lead)
             self.assertIn('fonte', lead)
+    
+    def test_place_details_concurrent_merge(self):
+        """Teste: Detalhes buscados em paralelo devem voltar para o lead correto"""
+        # Arrange
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        collector.config.PLACES_DETAILS_CONCURRENCY = 4
+        
+        leads = collector._process_google_places_results(
+            self.sample_google_places_response['results']
+        )
+        
+        def fake_details(place_id):
+            return {'telefone': f"tel-{place_id}", 'website': f"https://{place_id}.com"}
+        
+        # Act
+        with patch.object(collector, '_get_place_details', side_effect=fake_details):
+            enriched = collector._enrich_with_place_details(leads)
+        
+        # Assert
+        self.assertEqual([lead['place_id'] for lead in enriched], ['test_place_id_1', 'test_place_id_2'])
+        for lead in enriched:
+            self.assertEqual(lead['telefone'], f"tel-{lead['place_id']}")
+            self.assertEqual(lead['website'], f"https://{lead['place_id']}.com")
+    
+    def test_iter_google_places_follows_next_page_token(self):
+        """Teste: Iterador deve seguir o next_page_token até max_results"""
+        # Arrange
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+        collector.config.PLACES_PAGE_TOKEN_DELAY = 0
+        collector.places_cache = None
+        collector.seen_index = None
+        
+        def page(prefix, token=None):
+            data = {
+                'status': 'OK',
+                'results': [{'name': f"{prefix}{i}", 'place_id': f"{prefix}{i}"} for i in range(20)]
+            }
+            if token:
+                data['next_page_token'] = token
+            response = MagicMock()
+            response.json.return_value = data
+            return response
+        
+        warming_up = MagicMock()
+        warming_up.json.return_value = {'status': 'INVALID_REQUEST'}
+        
+        responses = [page('a', 'tok1'), warming_up, page('b', 'tok2'), page('c')]
+        
+        # Act
+        with patch.object(collector.session, 'get', side_effect=responses) as mock_get, \
+             patch.object(collector, '_enrich_with_place_details'):
+            leads = list(collector.iter_google_places('supermercado', 'São Paulo, SP', max_results=50))
+        
+        # Assert
+        self.assertEqual(len(leads), 50)
+        self.assertEqual(leads[0]['place_id'], 'a0')
+        self.assertEqual(leads[-1]['place_id'], 'c9')
+        self.assertEqual(mock_get.call_args_list[1].kwargs['params']['pagetoken'], 'tok1')
+        self.assertEqual(mock_get.call_args_list[3].kwargs['params']['pagetoken'], 'tok2')
+    
+    def test_cached_first_page_refreshes_expired_page_token(self):
+        """Teste: Página 1 do cache com token expirado deve ser refeita ao vivo para buscar a página 2"""
+        # Arrange
+        import tempfile, shutil
+        from lead_collector import LeadCollector
+        from response_cache import ResponseCache
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        
+        collector = LeadCollector()
+        collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+        collector.config.PLACES_PAGE_TOKEN_DELAY = 0
+        collector.places_cache = ResponseCache(str(Path(temp_dir) / 'places.sqlite'), ttls={'textsearch': 3600})
+        collector.seen_index = None
+        collector.cassette = None
+        
+        def page(prefix, token=None):
+            data = {
+                'status': 'OK',
+                'results': [{'name': f"{prefix}{i}", 'place_id': f"{prefix}{i}"} for i in range(20)]
+            }
+            if token:
+                data['next_page_token'] = token
+            return data
+        
+        collector.places_cache.set('textsearch', {'query': 'supermercado São Paulo, SP', 'key': 'test_key', 'language': 'pt-BR', 'region': 'BR'}, page('a', 'expirado'))
+        
+        responses = []
+        for data in (page('a', 'novo'), page('b')):
+            response = MagicMock()
+            response.json.return_value = data
+            responses.append(response)
+        
+        # Act
+        with patch.object(collector.session, 'get', side_effect=responses) as mock_get, \
+             patch.object(collector, '_enrich_with_place_details'):
+            leads = list(collector.iter_google_places('supermercado', 'São Paulo, SP', max_results=40))
+        
+        # Assert
+        self.assertEqual(len(leads), 40)
+        self.assertEqual(leads[-1]['place_id'], 'b19')
+        self.assertNotIn('pagetoken', mock_get.call_args_list[0].kwargs['params'])
+        self.assertEqual(mock_get.call_args_list[1].kwargs['params']['pagetoken'], 'novo')
+    
+    def test_warm_up_opens_instagram_browsers_unless_replaying(self):
+        """Teste: Aquecer as fontes deve abrir os navegadores do Instagram, exceto reproduzindo um cassete"""
+        # Arrange
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        collector.cassette = None
+        collector.driver_pool = MagicMock()
+        warmed = threading.Event()
+        collector.driver_pool.warm_up.side_effect = lambda count: warmed.set()
+        
+        replaying = LeadCollector()
+        replaying.cassette = MagicMock(replaying=True)
+        replaying.driver_pool = MagicMock()
+        
+        # Act
+        collector.warm_up_sources()
+        replaying.warm_up_sources()
+        
+        # Assert
+        self.assertTrue(warmed.wait(1))
+        collector.driver_pool.warm_up.assert_called_once_with(collector.config.CAMPAIGN_SOURCE_LIMITS['instagram'])
+        replaying.driver_pool.warm_up.assert_not_called()
+    
+    def test_instagram_fast_mode_waits_by_condition(self):
+        """Teste: Modo rápido deve esperar pelo elemento e parar de rolar quando não há posts novos"""
+        # Arrange
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        collector.config.INSTAGRAM_FAST_MODE = True
+        collector.config.INSTAGRAM_WAIT_TIMEOUT = 0.1
+        
+        driver = MagicMock()
+        driver.find_elements.return_value = [MagicMock()] * 12
+        
+        # Act
+        start_time = time.time()
+        found = collector._wait_for_element(driver, ('css selector', 'header a'), legacy_delay=2)
+        collector._scroll_for_more_posts(driver, scrolls=5)
+        elapsed = time.time() - start_time
+        
+        # Assert
+        self.assertTrue(found)
+        self.assertLess(elapsed, 1.5)
+        self.assertEqual(driver.execute_script.call_count, 1)
 
 if __name__ == '__main__':
     unittest.main()
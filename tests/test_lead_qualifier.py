@@ -187,6 +187,57 @@ class TestLeadQualifier(unittest.TestCase):
         self.assertEqual(report['total_leads'], len(self.sample_leads))
         self.assertGreaterEqual(report['taxa_qualificacao'], 0)
         self.assertLessEqual(report['taxa_qualificacao'], 100)
+    
+    def test_qualify_leads_parallel_matches_batch(self):
+        """Teste: Qualificação em processos deve dar os mesmos leads, na mesma ordem, e o mesmo relatório"""
+        # Arrange
+        from lead_qualifier import LeadQualifier
+        qualifier = LeadQualifier()
+        qualifier.website_checker = MagicMock()
+        qualifier.website_checker.is_alive.side_effect = lambda url: 'academia' in url
+        qualifier.website_checker.check_many.side_effect = lambda urls: {url: 'academia' in url for url in urls}
+        leads = []
+        for i in range(40):
+            lead = dict(self.sample_leads[i % len(self.sample_leads)], id=i)
+            if i % 4 == 0:
+                lead['nome'] = 'N/A'
+            if i % 5 == 0:
+                lead.pop('telefone')
+            leads.append(lead)
+        
+        # Act
+        expected = qualifier.qualify_leads_batch(leads)
+        expected_report = qualifier.generate_qualification_report(expected)
+        qualified, report = qualifier.qualify_leads_parallel(leads, workers=2, chunk_size=7)
+        
+        # Assert
+        ignore = lambda lead: {k: v for k, v in lead.items() if k not in ('data_qualificacao', 'data_geracao')}
+        self.assertEqual([lead['id'] for lead in qualified], list(range(40)))
+        self.assertEqual([ignore(lead) for lead in qualified], [ignore(lead) for lead in expected])
+        self.assertEqual(ignore(report), ignore(expected_report))
+    
+    def test_enrich_leads_with_cnpj_batch(self):
+        """Teste: Enriquecimento em lote deve consultar os CNPJs de uma vez"""
+        # Arrange
+        from unittest.mock import Mock
+        from lead_qualifier import LeadQualifier
+        qualifier = LeadQualifier()
+        receita = {'status': 'OK', 'nome': 'Supermercado Teste Ltda', 'atividade_principal': [{'code': '47.11-3-01'}]}
+        qualifier.cnpj_lookup = Mock()
+        qualifier.cnpj_lookup.lookup_batch.return_value = {'12345678000199': receita}
+        leads = [
+            {'nome': 'Supermercado 12.345.678/0001-99', 'endereco': ''},
+            {'nome': 'Padaria sem CNPJ', 'endereco': ''}
+        ]
+        
+        # Act
+        enriched = qualifier.enrich_leads_with_cnpj(leads)
+        
+        # Assert
+        qualifier.cnpj_lookup.lookup_batch.assert_called_once_with(['12.345.678/0001-99'])
+        qualifier.cnpj_lookup.lookup.assert_not_called()
+        self.assertEqual(enriched[0]['razao_social'], 'Supermercado Teste Ltda')
+        self.assertNotIn('razao_social', enriched[1])
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,148 @@
+"""
+Testes para os gravadores de leads em fluxo
+TDD: Cada lead deve ir para o disco assim que é produzido, com rotação por tamanho
+"""
+import csv
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from lead_writers import CSVLeadWriter, JSONLeadWriter, JSONLLeadWriter, open_lead_writer
+
+def _leads(count):
+    for i in range(count):
+        yield {'nome': f'Supermercado {i}', 'telefone': f'(11) 9999-{i:04d}', 'score': i % 7}
+
+class TestLeadWriters(unittest.TestCase):
+    """Testes para JSONLLeadWriter, JSONLeadWriter e CSVLeadWriter"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_jsonl_is_readable_before_close(self):
+        """Teste: Leads sincronizados devem estar no disco mesmo sem fechar o arquivo"""
+        # Arrange
+        path = self.temp_dir / 'leads.jsonl'
+        writer = JSONLLeadWriter(path, fsync_every=10)
+        
+        # Act
+        written = writer.write_all(_leads(25))
+        lines = path.read_text(encoding='utf-8').splitlines()
+        writer.close()
+        
+        # Assert
+        self.assertEqual(written, 25)
+        self.assertEqual(len(lines), 20)
+        self.assertEqual(json.loads(lines[0])['nome'], 'Supermercado 0')
+        self.assertEqual(len(path.read_text(encoding='utf-8').splitlines()), 25)
+    
+    def test_rotation_by_size(self):
+        """Teste: Ao passar do tamanho máximo a gravação deve seguir em um novo arquivo"""
+        # Arrange
+        path = self.temp_dir / 'leads.jsonl'
+        
+        # Act
+        with JSONLLeadWriter(path, max_bytes=500) as writer:
+            writer.write_all(_leads(30))
+        
+        # Assert
+        self.assertGreater(len(writer.files), 1)
+        self.assertEqual(Path(writer.files[1]).name, 'leads_001.jsonl')
+        total = sum(len(Path(f).read_text(encoding='utf-8').splitlines()) for f in writer.files)
+        self.assertEqual(total, 30)
+    
+    def test_json_writer_matches_json_dump(self):
+        """Teste: Lista JSON gravada em fluxo deve ser igual a json.dump(indent=2)"""
+        # Arrange
+        leads = list(_leads(3)) + [{'nome': 'Padaria', 'criterios': ['Site ativo'], 'extra': {'a': 1}}]
+        path = self.temp_dir / 'leads.json'
+        empty_path = self.temp_dir / 'vazio.json'
+        
+        # Act
+        with JSONLeadWriter(path) as writer:
+            writer.write_all(iter(leads))
+        JSONLeadWriter(empty_path).close()
+        
+        # Assert
+        self.assertEqual(path.read_text(encoding='utf-8'), json.dumps(leads, ensure_ascii=False, indent=2))
+        self.assertEqual(json.loads(empty_path.read_text(encoding='utf-8')), [])
+    
+    def test_csv_header_and_rows(self):
+        """Teste: CSV deve ter cabeçalho (com BOM) e uma linha por lead"""
+        # Arrange
+        path = self.temp_dir / 'leads.csv'
+        
+        # Act
+        with open_lead_writer(str(path)) as writer:
+            writer.write_all(_leads(5))
+            writer.write({'nome': 'Padaria', 'campo_novo': 'x'})
+        
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+        
+        # Assert
+        self.assertIsInstance(writer, CSVLeadWriter)
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(list(rows[0].keys()), ['nome', 'telefone', 'score'])
+        self.assertEqual(rows[5]['nome'], 'Padaria')
+        self.assertTrue(path.read_bytes().startswith(b'\xef\xbb\xbf'))
+    
+    def test_save_replaces_existing_file_and_stream_appends(self):
+        """Teste: Salvar de novo deve substituir o arquivo; o fluxo da campanha deve continuar o existente"""
+        # Arrange
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        csv_path = self.temp_dir / 'leads.csv'
+        stream_path = self.temp_dir / 'campanha.jsonl'
+        
+        # Act
+        collector.save_leads_to_csv(list(_leads(3)), str(csv_path))
+        collector.save_leads_to_csv([{'nome': 'Padaria', 'cidade': 'Santos'}], str(csv_path))
+        with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+        
+        for lead in _leads(2):
+            with collector.open_leads_stream(stream_path) as sink:
+                sink.write(lead)
+        
+        # Assert
+        self.assertEqual(rows, [{'nome': 'Padaria', 'cidade': 'Santos'}])
+        self.assertEqual(csv_path.read_bytes().count(b'\xef\xbb\xbf'), 1)
+        self.assertEqual(len(stream_path.read_text(encoding='utf-8').splitlines()), 2)
+    
+    def test_campaign_streams_unique_leads_per_cell(self):
+        """Teste: Campanha deve gravar no sink os leads únicos de cada célula concluída"""
+        # Arrange
+        from unittest.mock import patch
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        path = self.temp_dir / 'campanha.jsonl'
+        
+        def fake_places(keyword, city, max_results=20, mark_seen=True):
+            return [{'nome': keyword.title(), 'endereco': city}, {'nome': 'Mercado Central', 'endereco': city}]
+        
+        # Act
+        with patch.object(collector, 'collect_from_google_places', side_effect=fake_places), \
+             patch.object(collector, 'collect_from_instagram', return_value=[]):
+            with collector.open_leads_stream(path) as sink:
+                leads = collector.run_collection_campaign(['supermercado', 'padaria'], ['São Paulo, SP'], sink=sink)
+        
+        streamed = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+        
+        # Assert
+        self.assertEqual(len(streamed), 3)
+        self.assertEqual(sorted(lead['nome'] for lead in streamed), sorted(lead['nome'] for lead in leads))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Testes para as regras de qualificação declarativas
+TDD: Critérios, pesos e níveis devem vir do arquivo e valer sem reiniciar
+"""
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from qualification_rules import QualificationRules, RuleEngine, RuleError
+
+RULES = {
+    'score_qualificado': 2,
+    'criterios': [
+        {'nome': 'Telefone', 'peso': 1, 'todas': [{'campo': 'telefone', 'tipo': 'min_digitos', 'valor': 10}]},
+        {'nome': 'Academia', 'peso': 3, 'qualquer': [
+            {'campo': 'nome', 'tipo': 'contem', 'valor': 'academia', 'ignorar_caixa': True},
+            {'campo': 'cnae', 'tipo': 'cnae_alto_consumo', 'nivel': 'divisao'}
+        ]},
+    ],
+    'niveis': [
+        {'nome': 'Quente', 'score_minimo': 4, 'observacao': 'Score {score}: {criterios}'},
+        {'nome': 'Frio', 'score_minimo': 0, 'observacao': 'Pouco interesse'},
+    ],
+}
+
+class TestQualificationRules(unittest.TestCase):
+    """Testes para RuleEngine e QualificationRules"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / 'regras.json'
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _qualifier(self, spec):
+        from lead_qualifier import LeadQualifier
+        qualifier = LeadQualifier()
+        qualifier.website_checker = MagicMock()
+        qualifier.rules = QualificationRules(spec=spec)
+        return qualifier
+    
+    def test_custom_rules_drive_score_levels_and_stats(self):
+        """Teste: Pesos, limite, níveis e observações devem vir das regras e contar acertos"""
+        # Arrange
+        qualifier = self._qualifier(RULES)
+        leads = [
+            {'nome': 'ACADEMIA Forma', 'telefone': '(11) 99999-9999'},
+            {'nome': 'Padaria', 'telefone': '(11) 99999-9999', 'cnae': '9313-1/00'},
+            {'nome': 'Loja', 'telefone': '1234'},
+        ]
+        
+        # Act
+        qualified = [qualifier.qualify_lead(lead) for lead in leads]
+        frame = qualifier.qualify_dataframe(pd.DataFrame(leads))
+        stats = qualifier.rules.get_stats()
+        
+        # Assert
+        self.assertEqual([lead['score'] for lead in qualified], [4, 4, 0])
+        self.assertEqual(qualified[0]['nivel_qualificacao'], 'Quente')
+        self.assertEqual(qualified[0]['observacoes_qualificacao'], 'Score 4: Telefone, Academia')
+        self.assertEqual(qualified[2]['observacoes_qualificacao'], 'Pouco interesse')
+        self.assertFalse(qualified[2]['qualificado'])
+        self.assertEqual(frame['score'].tolist(), [4, 4, 0])
+        self.assertEqual(frame['nivel_qualificacao'].tolist(), ['Quente', 'Quente', 'Frio'])
+        self.assertEqual(stats['avaliacoes'], 6)
+        self.assertEqual([rule['acertos'] for rule in stats['criterios']], [4, 4])
+        self.assertGreater(stats['criterios'][0]['tempo_total_ms'], 0)
+    
+    def test_hot_reload_keeps_last_valid_rules(self):
+        """Teste: Arquivo alterado deve valer sem reiniciar; arquivo inválido mantém as regras anteriores"""
+        # Arrange
+        now = {'t': 0.0}
+        self.path.write_text(json.dumps(RULES), encoding='utf-8')
+        rules = QualificationRules(str(self.path), reload_interval=5, clock=lambda: now['t'])
+        lead = {'nome': 'Academia', 'telefone': '(11) 99999-9999'}
+        
+        # Act
+        before = rules.current().evaluate(lead, None)[0]
+        
+        changed = dict(RULES, criterios=[dict(RULES['criterios'][0], peso=10)])
+        self.path.write_text(json.dumps(changed, indent=2), encoding='utf-8')
+        within_interval = rules.current().evaluate(lead, None)[0]
+        now['t'] = 6
+        after = rules.current().evaluate(lead, None)[0]
+        
+        self.path.write_text('{"criterios": [{"nome": "Quebrado", "todas": [{"campo": "x", "tipo": "?"}]}]}', encoding='utf-8')
+        now['t'] = 12
+        broken = rules.current().evaluate(lead, None)[0]
+        
+        # Assert
+        self.assertEqual(before, 4)
+        self.assertEqual(within_interval, 4)
+        self.assertEqual(after, 10)
+        self.assertEqual(broken, 10)
+        self.assertEqual(rules.reloads, 1)
+        self.assertIn('nível', rules.get_stats()['erro'])
+    
+    def test_invalid_rules_rejected(self):
+        """Teste: Definições inválidas devem gerar RuleError na carga"""
+        invalid = [
+            {'criterios': [], 'niveis': RULES['niveis']},
+            dict(RULES, criterios=[{'nome': 'X', 'todas': [{'campo': 'nome', 'tipo': 'desconhecido'}]}]),
+            dict(RULES, criterios=[{'nome': 'X', 'todas': [{'campo': 'nome', 'tipo': 'regex', 'padrao': '('}]}]),
+            dict(RULES, criterios=[{'nome': 'X', 'todas': [{'campo': 'nome', 'tipo': 'min_caracteres'}]}]),
+            dict(RULES, niveis=[{'nome': 'A', 'score_minimo': 0, 'observacao': '{inexistente}'}]),
+        ]
+        for spec in invalid:
+            with self.assertRaises(RuleError):
+                RuleEngine(spec)
+
+if __name__ == '__main__':
+    unittest.main()
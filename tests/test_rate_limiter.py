@@ -0,0 +1,67 @@
+"""
+Testes para o limitador de taxa compartilhado
+TDD: Chamadas devem esperar apenas o necessário para respeitar o orçamento do host
+"""
+import unittest
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+class TestRateLimiter(unittest.TestCase):
+    """Testes para TokenBucket e RateLimiter"""
+    
+    def test_burst_is_free_then_paced(self):
+        """Teste: Rajada não espera; chamadas seguintes saem espaçadas pela taxa"""
+        # Arrange
+        from rate_limiter import TokenBucket
+        bucket = TokenBucket(rate=10, burst=3)
+        
+        # Act
+        waits = [bucket.reserve() for _ in range(5)]
+        
+        # Assert
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.1, delta=0.02)
+        self.assertAlmostEqual(waits[4], 0.2, delta=0.02)
+    
+    def test_subdomain_uses_configured_host(self):
+        """Teste: URLs de subdomínios devem usar o bucket do domínio configurado"""
+        # Arrange
+        from rate_limiter import RateLimiter
+        limiter = RateLimiter({'instagram.com': (1, 1)})
+        
+        # Act
+        bucket = limiter.bucket_for('https://www.instagram.com/p/abc/')
+        
+        # Assert
+        self.assertIsNotNone(bucket)
+        self.assertIs(bucket, limiter.bucket_for('instagram.com'))
+        self.assertIsNone(limiter.bucket_for('https://exemplo.com.br'))
+    
+    def test_unknown_host_is_not_limited(self):
+        """Teste: Hosts sem limite configurado não devem esperar"""
+        # Arrange
+        from rate_limiter import RateLimiter
+        limiter = RateLimiter({'receitaws.com.br': (0.01, 1)})
+        
+        # Act & Assert
+        for _ in range(3):
+            self.assertEqual(limiter.acquire('https://exemplo.com.br'), 0.0)
+    
+    def test_shared_limiter_is_singleton(self):
+        """Teste: Coletor e consultas de CNPJ do qualificador devem compartilhar o mesmo limitador"""
+        # Arrange
+        from lead_collector import LeadCollector
+        from lead_qualifier import LeadQualifier
+        
+        # Act
+        collector = LeadCollector()
+        qualifier = LeadQualifier()
+        
+        # Assert
+        self.assertIs(collector.rate_limiter, qualifier.cnpj_lookup.rate_limiter)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Testes para novas tentativas e circuit breaker das fontes de coleta
+TDD: Falhas passageiras devem ser repetidas e células perdidas devem voltar para a fila
+"""
+import unittest
+from unittest.mock import MagicMock, patch
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, TransientError
+
+class TestResilience(unittest.TestCase):
+    """Testes para RetryPolicy, CircuitBreaker e o reenfileiramento de células"""
+    
+    def test_retry_with_jittered_backoff(self):
+        """Teste: Falhas passageiras devem ser repetidas com espera crescente e limitada"""
+        # Arrange
+        sleeps = []
+        policy = RetryPolicy(max_attempts=4, base_delay=1, max_delay=3, sleep=sleeps.append)
+        calls = {'total': 0}
+        
+        def flaky():
+            calls['total'] += 1
+            if calls['total'] < 4:
+                raise TransientError('OVER_QUERY_LIMIT')
+            return 'ok'
+        
+        # Act
+        result = policy.call(flaky)
+        
+        # Assert
+        self.assertEqual(result, 'ok')
+        self.assertEqual(len(sleeps), 3)
+        for attempt, delay in enumerate(sleeps):
+            self.assertLessEqual(delay, min(3, 2 ** attempt))
+        with self.assertRaises(ValueError):
+            policy.call(lambda: (_ for _ in ()).throw(ValueError('erro da requisição')))
+    
+    def test_circuit_breaker_opens_and_recovers(self):
+        """Teste: Circuito deve abrir após falhas seguidas e liberar uma chamada de teste depois do timeout"""
+        # Arrange
+        now = {'t': 0.0}
+        breaker = CircuitBreaker('google_places', failure_threshold=2, reset_timeout=10, clock=lambda: now['t'])
+        policy = RetryPolicy(max_attempts=1, sleep=lambda _: None)
+        
+        def failing():
+            raise TransientError('503')
+        
+        # Act
+        for _ in range(2):
+            with self.assertRaises(TransientError):
+                policy.call(failing, breaker=breaker)
+        
+        with self.assertRaises(CircuitOpenError) as raised:
+            policy.call(lambda: 'não chamado', breaker=breaker)
+        
+        now['t'] = 11
+        allowed_first = breaker.allow()
+        allowed_second = breaker.allow()
+        breaker.record_success()
+        
+        # Assert
+        self.assertEqual(raised.exception.retry_after, 10)
+        self.assertTrue(allowed_first)
+        self.assertFalse(allowed_second)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+    
+    def test_places_over_query_limit_is_retried_and_not_cached(self):
+        """Teste: OVER_QUERY_LIMIT deve ser repetido; circuito aberto deve pular a chamada"""
+        # Arrange
+        from lead_collector import LeadCollector
+        collector = LeadCollector()
+        collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+        collector.places_cache = None
+        collector.seen_index = None
+        collector.retry_policy = RetryPolicy(max_attempts=3, sleep=lambda _: None)
+        collector.places_breaker = CircuitBreaker('google_places', failure_threshold=5, reset_timeout=60)
+        
+        def response(data):
+            mock = MagicMock()
+            mock.json.return_value = data
+            return mock
+        
+        responses = [
+            response({'status': 'OVER_QUERY_LIMIT'}),
+            response({'status': 'OK', 'results': [{'name': 'Mercado', 'place_id': 'p1'}]}),
+        ]
+        
+        # Act
+        with patch.object(collector.session, 'get', side_effect=responses) as mock_get, \
+             patch.object(collector, '_enrich_with_place_details'):
+            leads = collector.collect_from_google_places('supermercado', 'São Paulo, SP')
+            
+            for _ in range(5):
+                collector.places_breaker.record_failure()
+            with self.assertRaises(CircuitOpenError):
+                collector.collect_from_google_places('padaria', 'São Paulo, SP')
+        
+        # Assert
+        self.assertEqual([lead['place_id'] for lead in leads], ['p1'])
+        self.assertEqual(mock_get.call_count, 2)
+    
+    def test_grid_requeues_transient_failures(self):
+        """Teste: Célula que falha por instabilidade deve voltar para a fila e ser concluída"""
+        # Arrange
+        from grid_executor import GridExecutor
+        executor = GridExecutor(max_workers=2, max_requeues=2, requeue_delay=0.01)
+        failures = {'supermercado': 1, 'padaria': 5}
+        
+        def cell_fn(keyword, city):
+            if failures[keyword] > 0:
+                failures[keyword] -= 1
+                raise TransientError('OVER_QUERY_LIMIT')
+            return [{'nome': keyword}]
+        
+        # Act
+        cells = {cell['keyword']: cell for cell in executor.run([('supermercado', 'X'), ('padaria', 'X')], cell_fn)}
+        
+        # Assert
+        self.assertIsNone(cells['supermercado']['erro'])
+        self.assertEqual(cells['supermercado']['tentativas'], 2)
+        self.assertEqual(cells['supermercado']['total_leads'], 1)
+        self.assertEqual(cells['padaria']['tentativas'], 3)
+        self.assertIsNotNone(cells['padaria']['erro'])
+    
+    def test_details_failure_requeues_cell_without_marking_place(self):
+        """Teste: Falha passageira nos detalhes deve refazer a célula sem dar o lugar como coletado"""
+        # Arrange
+        import shutil
+        import tempfile
+        import httpx
+        from http_client import HttpClient
+        from lead_collector import LeadCollector
+        from seen_index import SeenPlaceIndex
+        
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        details_failures = {'restantes': 1}
+        
+        def upstream(request):
+            if 'details' in request.url.path:
+                if details_failures['restantes'] > 0:
+                    details_failures['restantes'] -= 1
+                    return httpx.Response(200, json={'status': 'OVER_QUERY_LIMIT'})
+                return httpx.Response(200, json={'status': 'OK', 'result': {'formatted_phone_number': '(11) 3333-4444'}})
+            return httpx.Response(200, json={'status': 'OK', 'results': [
+                {'name': 'Mercado Bom', 'place_id': 'p1', 'formatted_address': 'Rua A, 1'}
+            ]})
+        
+        collector = LeadCollector()
+        collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+        collector.config.PLACES_SEARCH_MODE = 'text'
+        collector.config.PLACES_DETAILS_CONCURRENCY = 1
+        collector.config.SEEN_INDEX_MODE = 'skip'
+        collector.config.CAMPAIGN_MAX_REQUEUES = 1
+        collector.config.RETRY_BASE_DELAY = 0.01
+        collector.places_cache = None
+        collector.cassette = None
+        collector.seen_index = SeenPlaceIndex(str(Path(temp_dir) / 'seen.sqlite'))
+        collector.session = HttpClient(transport=httpx.MockTransport(upstream))
+        collector.retry_policy = RetryPolicy(max_attempts=1, sleep=lambda _: None)
+        collector.places_breaker = CircuitBreaker('google_places', failure_threshold=5, reset_timeout=60)
+        
+        # Act
+        with self.assertRaises(TransientError):
+            collector.collect_from_google_places('supermercado', 'São Paulo, SP')
+        known_after_failure = collector.seen_index.is_known('p1')
+        
+        details_failures['restantes'] = 1
+        with patch.object(collector, 'collect_from_instagram', return_value=[]):
+            cells = list(collector.iter_collection_campaign(['supermercado'], ['São Paulo, SP'], max_workers=1))
+        
+        # Assert
+        self.assertFalse(known_after_failure)
+        self.assertEqual(len(cells), 1)
+        self.assertIsNone(cells[0]['erro'])
+        self.assertEqual(cells[0]['tentativas'], 2)
+        self.assertEqual([lead['telefone'] for lead in cells[0]['leads']], ['(11) 3333-4444'])
+        self.assertTrue(collector.seen_index.is_known('p1'))
+
+if __name__ == '__main__':
+    unittest.main()
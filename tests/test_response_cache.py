@@ -0,0 +1,106 @@
+"""
+Testes para o cache persistente de respostas
+TDD: Respostas repetidas devem vir do disco, respeitando TTL e tamanho
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+class TestResponseCache(unittest.TestCase):
+    """Testes para a classe ResponseCache"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'cache.sqlite')
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _cache(self, **kwargs):
+        from response_cache import ResponseCache
+        options = {'ttls': {'textsearch': 3600, 'details': 3600}}
+        options.update(kwargs)
+        return ResponseCache(self.path, **options)
+    
+    def test_hit_after_set_with_normalized_params(self):
+        """Teste: Busca igual (com outra API key e caixa) deve ser um hit"""
+        # Arrange
+        cache = self._cache()
+        data = {'status': 'OK', 'results': [{'name': 'Supermercado'}]}
+        
+        # Act
+        cache.set('textsearch', {'query': 'Supermercado  São Paulo', 'key': 'a'}, data)
+        cached = cache.get('textsearch', {'query': 'supermercado são paulo', 'key': 'b'})
+        
+        # Assert
+        self.assertEqual(cached, data)
+        self.assertEqual(cache.get_stats()['hits'], 1)
+    
+    def test_opaque_ids_keep_their_case(self):
+        """Teste: place_id e pagetoken que diferem só na caixa devem ser chaves diferentes"""
+        # Arrange
+        cache = self._cache()
+        
+        # Act
+        cache.set('details', {'place_id': 'ChIJabc'}, {'status': 'OK', 'result': {'name': 'A'}})
+        other_place = cache.get('details', {'place_id': 'ChIJABC'})
+        same_place = cache.get('details', {'place_id': 'ChIJabc'})
+        
+        # Assert
+        self.assertIsNone(other_place)
+        self.assertEqual(same_place['result']['name'], 'A')
+        self.assertNotEqual(cache.make_key('textsearch', {'pagetoken': 'AbC'}),
+                            cache.make_key('textsearch', {'pagetoken': 'abc'}))
+    
+    def test_negative_and_error_responses(self):
+        """Teste: ZERO_RESULTS deve ser guardado e erros nunca"""
+        # Arrange
+        cache = self._cache()
+        
+        # Act
+        stored_zero = cache.set('textsearch', {'query': 'nada'}, {'status': 'ZERO_RESULTS', 'results': []})
+        stored_error = cache.set('textsearch', {'query': 'limite'}, {'status': 'OVER_QUERY_LIMIT'})
+        
+        # Assert
+        self.assertTrue(stored_zero)
+        self.assertFalse(stored_error)
+        self.assertEqual(cache.get('textsearch', {'query': 'nada'})['status'], 'ZERO_RESULTS')
+        self.assertIsNone(cache.get('textsearch', {'query': 'limite'}))
+        self.assertEqual(cache.get_stats()['misses'], 1)
+    
+    def test_expired_entry_is_a_miss(self):
+        """Teste: Entrada expirada não deve ser retornada"""
+        # Arrange
+        cache = self._cache(ttls={'details': -1})
+        
+        # Act
+        cache.set('details', {'place_id': 'x'}, {'status': 'OK', 'result': {}})
+        
+        # Assert
+        self.assertIsNone(cache.get('details', {'place_id': 'x'}))
+    
+    def test_size_based_eviction(self):
+        """Teste: Ao passar do tamanho máximo as entradas mais antigas saem"""
+        # Arrange
+        cache = self._cache(max_bytes=2000)
+        payload = 'x' * 400
+        
+        # Act
+        for i in range(10):
+            cache.set('details', {'place_id': str(i)}, {'status': 'OK', 'result': payload})
+        
+        # Assert
+        self.assertLessEqual(cache.get_stats()['bytes'], 2000)
+        self.assertIsNone(cache.get('details', {'place_id': '0'}))
+        self.assertIsNotNone(cache.get('details', {'place_id': '9'}))
+
+if __name__ == '__main__':
+    unittest.main()
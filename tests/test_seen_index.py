@@ -0,0 +1,155 @@
+"""
+Testes para o índice de lugares já coletados
+TDD: Lugares conhecidos devem ser filtrados antes da busca de detalhes
+"""
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+class TestSeenPlaceIndex(unittest.TestCase):
+    """Testes para BloomFilter e SeenPlaceIndex"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'seen.sqlite')
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_bloom_filter_has_no_false_negatives(self):
+        """Teste: Todo item adicionado deve ser encontrado no filtro"""
+        # Arrange
+        from seen_index import BloomFilter
+        bloom = BloomFilter(capacity=1000)
+        items = [f"place_{i}" for i in range(1000)]
+        
+        # Act
+        for item in items:
+            bloom.add(item)
+        false_positives = sum(1 for i in range(1000) if f"outro_{i}" in bloom)
+        
+        # Assert
+        self.assertTrue(all(item in bloom for item in items))
+        self.assertLess(false_positives, 50)
+    
+    def test_index_persists_between_instances(self):
+        """Teste: Lugares registrados devem continuar conhecidos após reabrir o índice"""
+        # Arrange
+        from seen_index import SeenPlaceIndex
+        SeenPlaceIndex(self.path, capacity=10).mark_refreshed(['abc', 'def'])
+        
+        # Act
+        index = SeenPlaceIndex(self.path, capacity=10)
+        
+        # Assert
+        self.assertTrue(index.is_known('abc'))
+        self.assertFalse(index.is_known('xyz'))
+        self.assertEqual(len(index), 2)
+    
+    def test_collector_skips_fresh_and_refreshes_stale(self):
+        """Teste: Modo refresh deve pular conhecidos recentes e manter os antigos"""
+        # Arrange
+        from lead_collector import LeadCollector
+        from seen_index import SeenPlaceIndex
+        collector = LeadCollector()
+        collector.seen_index = SeenPlaceIndex(self.path)
+        collector.seen_index.mark_refreshed(['recente', 'antigo'])
+        collector.config.SEEN_INDEX_MODE = 'refresh'
+        collector.config.SEEN_INDEX_REFRESH_DAYS = 30
+        leads = [{'place_id': 'novo'}, {'place_id': 'recente'}, {'place_id': 'antigo'}]
+        
+        # Act
+        with patch('seen_index.time.time', return_value=time.time() - 40 * 86400):
+            collector.seen_index.mark_refreshed(['antigo'])
+        refreshed = collector._filter_seen_places(leads)
+        collector.config.SEEN_INDEX_MODE = 'skip'
+        skipped = collector._filter_seen_places(leads)
+        
+        # Assert
+        self.assertEqual([lead['place_id'] for lead in refreshed], ['novo', 'antigo'])
+        self.assertEqual([lead['place_id'] for lead in skipped], ['novo'])
+    
+    def test_collector_populates_empty_index(self):
+        """Teste: Partindo de um índice vazio, a segunda coleta deve pular os lugares da primeira"""
+        # Arrange
+        import httpx
+        from http_client import HttpClient
+        from lead_collector import LeadCollector
+        from seen_index import SeenPlaceIndex
+        
+        def upstream(request):
+            return httpx.Response(200, json={'status': 'OK', 'results': [
+                {'name': 'Mercado Bom', 'place_id': 'p1', 'formatted_address': 'Rua A, 1'},
+                {'name': 'Padaria Boa', 'place_id': 'p2', 'formatted_address': 'Rua B, 2'}
+            ]})
+        
+        collector = LeadCollector()
+        collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+        collector.config.SEEN_INDEX_MODE = 'skip'
+        collector.places_cache = None
+        collector.cassette = None
+        collector.seen_index = SeenPlaceIndex(self.path)
+        collector.session = HttpClient(transport=httpx.MockTransport(upstream))
+        
+        # Act
+        first = collector.collect_from_google_places('supermercado', 'São Paulo, SP')
+        second = collector.collect_from_google_places('supermercado', 'São Paulo, SP')
+        
+        # Assert
+        self.assertEqual(len(SeenPlaceIndex(self.path)), 2)
+        self.assertEqual([lead['place_id'] for lead in first], ['p1', 'p2'])
+        self.assertEqual(second, [])
+    
+    def test_places_marked_only_when_journal_commits_cell(self):
+        """Teste: Célula interrompida antes de ir para o journal deve trazer os mesmos lugares ao ser retomada"""
+        # Arrange
+        import httpx
+        from campaign_journal import CampaignJournal
+        from http_client import HttpClient
+        from lead_collector import LeadCollector
+        from seen_index import SeenPlaceIndex
+        
+        def upstream(request):
+            return httpx.Response(200, json={'status': 'OK', 'results': [
+                {'name': 'Mercado Bom', 'place_id': 'p1', 'formatted_address': 'Rua A, 1'}
+            ]})
+        
+        collector = LeadCollector()
+        collector.config.GOOGLE_PLACES_API_KEY = 'test_key'
+        collector.config.PLACES_SEARCH_MODE = 'text'
+        collector.config.SEEN_INDEX_MODE = 'skip'
+        collector.places_cache = None
+        collector.cassette = None
+        collector.seen_index = SeenPlaceIndex(self.path)
+        collector.session = HttpClient(transport=httpx.MockTransport(upstream))
+        journal_dir = os.path.join(self.temp_dir, 'campanhas')
+        
+        # Act
+        with patch.object(collector, 'collect_from_instagram', return_value=[]):
+            journal = CampaignJournal('camp', journal_dir)
+            with patch.object(journal, 'record_cell', side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    list(collector.iter_collection_campaign(['supermercado'], ['São Paulo, SP'], journal=journal))
+            known_after_crash = collector.seen_index.is_known('p1')
+            
+            resumed = list(collector.iter_collection_campaign(
+                ['supermercado'], ['São Paulo, SP'], journal=CampaignJournal('camp', journal_dir)
+            ))
+        
+        # Assert
+        self.assertFalse(known_after_crash)
+        self.assertEqual([lead['place_id'] for lead in resumed[0]['leads']], ['p1'])
+        self.assertTrue(collector.seen_index.is_known('p1'))
+
+if __name__ == '__main__':
+    unittest.main()
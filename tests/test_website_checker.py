@@ -0,0 +1,141 @@
+"""
+Testes para a verificação concorrente de sites
+TDD: Sites devem ser verificados em paralelo e uma vez só por domínio
+"""
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+import httpx
+
+# Importar módulos do sistema
+import sys
+sys.path.append(str(Path(__file__).parent.parent / "src"))
+
+from http_client import HttpClient
+from response_cache import ResponseCache
+from website_checker import WebsiteChecker, normalize_domain
+
+class TestWebsiteChecker(unittest.TestCase):
+    """Testes para WebsiteChecker"""
+    
+    def setUp(self):
+        """Configuração inicial para cada teste"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.requests = []
+        self.lock = threading.Lock()
+    
+    def tearDown(self):
+        """Limpeza após cada teste"""
+        shutil.rmtree(self.temp_dir)
+    
+    def _client(self, handler):
+        def recording(request):
+            with self.lock:
+                self.requests.append((request.method, request.url.host))
+            return handler(request)
+        return HttpClient(per_host_limit=10, transport=httpx.MockTransport(recording))
+    
+    def test_normalize_domain(self):
+        """Teste: Domínio deve ignorar caixa, www e caminho"""
+        self.assertEqual(normalize_domain('https://www.Mercado.com.br/contato'), 'mercado.com.br')
+        self.assertEqual(normalize_domain('http://mercado.com.br'), 'mercado.com.br')
+        self.assertEqual(normalize_domain('sem-url'), '')
+    
+    def test_checks_sites_concurrently(self):
+        """Teste: Sites lentos devem ser verificados em paralelo, não em sequência"""
+        # Arrange
+        def slow(request):
+            time.sleep(0.2)
+            return httpx.Response(200)
+        
+        checker = WebsiteChecker(session=self._client(slow), max_in_flight=10)
+        urls = [f'https://site{i}.com.br' for i in range(10)]
+        
+        # Act
+        start = time.time()
+        results = checker.check_many(urls)
+        elapsed = time.time() - start
+        
+        # Assert
+        self.assertTrue(all(results.values()))
+        self.assertEqual(len(self.requests), 10)
+        self.assertLess(elapsed, 1.0)
+    
+    def test_falls_back_to_get_when_head_refused(self):
+        """Teste: 405 no HEAD deve gerar um GET; erros de conexão contam como fora do ar"""
+        # Arrange
+        def handler(request):
+            if request.url.host == 'offline.com.br':
+                raise httpx.ConnectError('sem rota', request=request)
+            if request.method == 'HEAD':
+                return httpx.Response(405)
+            return httpx.Response(200)
+        
+        checker = WebsiteChecker(session=self._client(handler))
+        
+        # Act
+        alive = checker.is_alive('https://semhead.com.br')
+        offline = checker.is_alive('https://offline.com.br')
+        
+        # Assert
+        self.assertTrue(alive)
+        self.assertFalse(offline)
+        self.assertIn(('GET', 'semhead.com.br'), self.requests)
+    
+    def test_caches_result_per_domain(self):
+        """Teste: URLs do mesmo domínio devem gerar uma verificação só, inclusive entre execuções"""
+        # Arrange
+        def handler(request):
+            return httpx.Response(200 if request.url.host == 'mercado.com.br' else 404)
+        
+        def cache():
+            return ResponseCache(str(self.temp_dir / 'websites.sqlite'), ttls={'website': 3600},
+                                 negative_ttl=3600, negative_statuses=('OFFLINE',))
+        
+        first = WebsiteChecker(session=self._client(handler), cache=cache())
+        
+        # Act
+        results = first.check_many([
+            'https://mercado.com.br', 'https://www.mercado.com.br/contato', 'http://MERCADO.com.br',
+            'https://fechado.com.br', 'https://fechado.com.br/loja'
+        ])
+        second = WebsiteChecker(session=self._client(handler), cache=cache())
+        again = second.is_alive('https://mercado.com.br/sobre')
+        
+        # Assert
+        self.assertEqual(sorted(host for _, host in self.requests), ['fechado.com.br', 'mercado.com.br'])
+        self.assertTrue(results['http://MERCADO.com.br'])
+        self.assertFalse(results['https://fechado.com.br/loja'])
+        self.assertTrue(again)
+    
+    def test_qualifier_prefetches_websites(self):
+        """Teste: qualify_leads_batch deve verificar os sites antes e qualify_lead usar o resultado"""
+        # Arrange
+        from lead_qualifier import LeadQualifier
+        
+        def handler(request):
+            time.sleep(0.2)
+            return httpx.Response(200)
+        
+        qualifier = LeadQualifier()
+        qualifier.website_checker = WebsiteChecker(session=self._client(handler), max_in_flight=10)
+        leads = [{'nome': f'Mercado {i}', 'website': f'https://mercado{i}.com.br'} for i in range(8)]
+        leads.append({'nome': 'Sem site', 'website': 'mercado.com.br'})
+        
+        # Act
+        start = time.time()
+        qualified = qualifier.qualify_leads_batch(leads)
+        elapsed = time.time() - start
+        
+        # Assert
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(len(self.requests), 8)
+        self.assertTrue(all('Site ativo' in lead['criterios_atingidos'] for lead in qualified[:8]))
+        self.assertNotIn('Site ativo', qualified[8]['criterios_atingidos'])
+
+if __name__ == '__main__':
+    unittest.main()